@@ -0,0 +1,48 @@
+"""Generators of realistic, heterogeneous layers of sediment."""
+import numpy as np
+
+SAND = {"c": 1e-8, "porosity_min": 0.05, "porosity_max": 0.45, "rho_grain": 2650.0}
+SHALE = {"c": 5e-8, "porosity_min": 0.02, "porosity_max": 0.65, "rho_grain": 2700.0}
+
+
+def lithology(layers, columns, sand_fraction=0.4, seed=1945):
+    """Sand (True) and shale (False) layers that come in beds."""
+    rng = np.random.default_rng(seed)
+    beds = rng.geometric(0.2, size=(layers, columns)).cumsum(axis=0)
+    return np.take(rng.random(beds.max() + 1) < sand_fraction, beds)
+
+
+def layers(layers, columns, seed=1945, dtype=float, order="C"):
+    """Layer thicknesses and porosities of interbedded sand and shale."""
+    rng = np.random.default_rng(seed)
+    is_sand = lithology(layers, columns, seed=seed)
+
+    dz = rng.lognormal(mean=0.0, sigma=0.75, size=(layers, columns))
+    porosity = np.where(
+        is_sand,
+        rng.normal(SAND["porosity_max"], 0.02, size=(layers, columns)),
+        rng.normal(SHALE["porosity_max"], 0.03, size=(layers, columns)),
+    ).clip(0.1, 0.7)
+
+    return (
+        np.asarray(dz, dtype=dtype, order=order),
+        np.asarray(porosity, dtype=dtype, order=order),
+    )
+
+
+def params(layers, columns, seed=1945):
+    """Array-valued compaction parameters of interbedded sand and shale."""
+    is_sand = lithology(layers, columns, seed=seed)
+    return {
+        name: np.where(is_sand, SAND[name], SHALE[name])
+        for name in ("c", "porosity_min", "porosity_max", "rho_grain")
+    }
+
+
+def deposit(grid, rng, mean_thickness=1.0):
+    """Add a layer of spatially variable thickness to a landlab grid."""
+    n_cells = grid.number_of_cells
+    grid.event_layers.add(
+        rng.lognormal(np.log(mean_thickness), 0.5, size=n_cells),
+        porosity=rng.uniform(0.4, 0.65, size=n_cells),
+    )
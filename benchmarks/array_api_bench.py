@@ -0,0 +1,46 @@
+import numpy as np
+
+from compaction.array_api import compacted_layers
+from compaction.compaction import compact
+
+from . import _data
+
+
+def _namespace(backend):
+    if backend == "numpy":
+        return np
+    try:
+        if backend == "array-api-strict":
+            import array_api_strict as xp
+        else:
+            import jax
+
+            jax.config.update("jax_enable_x64", True)
+            import jax.numpy as xp
+    except ImportError:
+        raise NotImplementedError(f"{backend} is not installed")
+    return xp
+
+
+class TimeArrayApi:
+    param_names = ["layers", "columns", "backend"]
+    params = [[100, 1000], [100, 1000], ["numpy", "array-api-strict", "jax"]]
+
+    def setup(self, layers, columns, backend):
+        xp = _namespace(backend)
+        dz, porosity = _data.layers(layers, columns)
+        self.dz, self.porosity = xp.asarray(dz), xp.asarray(porosity)
+
+        if backend == "jax":
+            import jax
+
+            jitted = jax.jit(compacted_layers)
+            self.func = lambda dz, porosity, **kwds: jitted(dz, porosity, **kwds)[
+                0
+            ].block_until_ready()
+            self.func(self.dz, self.porosity, porosity_max=0.7)
+        else:
+            self.func = compact
+
+    def time_compact(self, layers, columns, backend):
+        self.func(self.dz, self.porosity, porosity_max=0.7)
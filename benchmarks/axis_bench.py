@@ -0,0 +1,50 @@
+import numpy as np
+
+from compaction.compaction import compact
+
+from . import _data
+
+
+class TimeLayerAxis:
+    """Compact cubes of layers stacked along an axis other than the first."""
+
+    param_names = ["layout"]
+    params = [["(ny, nx, layers)", "(ny, layers, nx)", "(layers, ny, nx) F"]]
+
+    def setup(self, layout):
+        dz, phi = _data.layers(200, 300 * 300)
+        dz, phi = dz.reshape((200, 300, 300)), phi.reshape((200, 300, 300))
+        if layout == "(ny, nx, layers)":
+            self.axis = 2
+            self.dz, self.phi = (np.moveaxis(a, 0, 2).copy() for a in (dz, phi))
+        elif layout == "(ny, layers, nx)":
+            self.axis = 1
+            self.dz, self.phi = (np.moveaxis(a, 0, 1).copy() for a in (dz, phi))
+        else:
+            self.axis = 0
+            self.dz, self.phi = (np.asfortranarray(a) for a in (dz, phi))
+        self.dz_new = np.empty_like(self.dz)
+
+    def time_axis(self, layout):
+        compact(
+            self.dz, self.phi, porosity_max=0.7, return_dz=self.dz_new, axis=self.axis
+        )
+
+    def time_transpose_and_copy(self, layout):
+        dz_new = np.empty(np.moveaxis(self.dz, self.axis, 0).shape)
+        phi_new = compact(
+            np.moveaxis(self.dz, self.axis, 0).copy(),
+            np.moveaxis(self.phi, self.axis, 0).copy(),
+            porosity_max=0.7,
+            return_dz=dz_new,
+        )
+        self.dz_new[...] = np.moveaxis(dz_new, 0, self.axis)
+        np.moveaxis(phi_new, 0, self.axis).copy()
+
+    def peakmem_axis(self, layout):
+        compact(
+            self.dz, self.phi, porosity_max=0.7, return_dz=self.dz_new, axis=self.axis
+        )
+
+    def peakmem_transpose_and_copy(self, layout):
+        self.time_transpose_and_copy(layout)
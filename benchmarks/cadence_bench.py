@@ -0,0 +1,29 @@
+import numpy as np
+from landlab import RasterModelGrid
+
+from compaction.landlab import Compact
+
+from . import _data
+
+
+class TimeAdaptiveCadence:
+    param_names = ["tolerance"]
+    params = [[None, 1e-4, 1e-3]]
+
+    def setup(self, tolerance):
+        self.grid = RasterModelGrid((100, 100))
+        self.rng = np.random.default_rng(1945)
+        for _ in range(200):
+            _data.deposit(self.grid, self.rng, mean_thickness=0.01)
+        self.compact = Compact(
+            self.grid, porosity_min=0.02, porosity_max=0.65, tolerance=tolerance
+        )
+
+    def time_deposit_and_compact(self, tolerance):
+        for _ in range(50):
+            _data.deposit(self.grid, self.rng, mean_thickness=0.01)
+            self.compact.run_one_step()
+
+    def track_skipped_steps(self, tolerance):
+        self.time_deposit_and_compact(tolerance)
+        return self.compact.skipped_steps
@@ -0,0 +1,112 @@
+import os
+import tempfile
+
+import numpy as np
+
+from compaction.cli import load_config, load_config_file, load_layers, run_compaction
+from compaction.stages import save_table
+
+from . import _data
+
+
+class TimeRunCompaction:
+    param_names = ["layers", "format"]
+    params = [[1000, 100000, 1000000], ["csv", "npy"]]
+
+    def setup(self, layers, format):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self._tmpdir.name, f"porosity.{format}")
+        self.dest = os.path.join(self._tmpdir.name, f"porosity-out.{format}")
+
+        dz, porosity = _data.layers(layers, 1)
+        data = np.column_stack((dz[:, 0], porosity[:, 0]))
+        if format == "npy":
+            np.save(self.src, data)
+        else:
+            np.savetxt(
+                self.src,
+                data,
+                delimiter=",",
+                header="Layer Thickness [m], Porosity [-]",
+            )
+
+    def teardown(self, layers, format):
+        self._tmpdir.cleanup()
+
+    def time_run_compaction(self, layers, format):
+        run_compaction(self.src, self.dest, porosity_max=0.7)
+
+    def peakmem_run_compaction(self, layers, format):
+        run_compaction(self.src, self.dest, porosity_max=0.7)
+
+
+class TimeStartup:
+    def timeraw_import_cli(self):
+        return "import compaction.cli"
+
+
+class TimeLoadConfig:
+    param_names = ["how"]
+    params = [["tomlkit", "load_config", "load_config_file"]]
+
+    def setup(self, how):
+        import tomlkit
+
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmpdir.name, "compaction.toml")
+        with open(self.path, "w") as fp:
+            print(
+                tomlkit.dumps(
+                    {
+                        "compaction": {
+                            "constants": _data.SHALE,
+                            "lithology": {"sand": _data.SAND, "shale": _data.SHALE},
+                        }
+                    }
+                ),
+                file=fp,
+            )
+
+    def teardown(self, how):
+        self._tmpdir.cleanup()
+
+    def time_load_config(self, how):
+        if how == "tomlkit":
+            import tomlkit
+
+            from compaction.cli import _tomlkit_to_popo
+
+            with open(self.path) as fp:
+                _tomlkit_to_popo(tomlkit.parse(fp.read()))
+        elif how == "load_config":
+            with open(self.path) as fp:
+                load_config(fp)
+        else:
+            load_config_file(self.path)
+
+
+class TimeLoadLayers:
+    param_names = ["layers", "how"]
+    params = [[10, 1000, 100000], ["pandas", "numpy"]]
+
+    def setup(self, layers, how):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self._tmpdir.name, "porosity.csv")
+
+        dz, porosity = _data.layers(layers, 1)
+        save_table(
+            self.src,
+            np.column_stack((dz[:, 0], porosity[:, 0])),
+            header="Layer Thickness [m], Porosity [-]",
+        )
+
+    def teardown(self, layers, how):
+        self._tmpdir.cleanup()
+
+    def time_load_layers(self, layers, how):
+        if how == "pandas":
+            import pandas
+
+            pandas.read_csv(self.src, header=None, dtype=float, comment="#").values
+        else:
+            load_layers(self.src)
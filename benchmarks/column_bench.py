@@ -0,0 +1,49 @@
+import numpy as np
+
+from compaction import SedimentColumn
+from compaction.compaction import compact
+
+
+class TimeDepositAndCompact:
+    """Deposit a layer and then compact, over and over."""
+
+    param_names = ["steps", "columns"]
+    params = [[100, 1000], [1, 1000]]
+
+    def time_sediment_column(self, steps, columns):
+        column = SedimentColumn(shape=columns)
+        for _ in range(steps):
+            column.add(1.0, porosity=0.5)
+            column.compact(porosity_max=0.5)
+
+    def time_concatenate(self, steps, columns):
+        dz = np.empty((0, columns))
+        porosity = np.empty((0, columns))
+        for _ in range(steps):
+            dz = np.vstack((np.full((1, columns), 1.0), dz))
+            porosity = np.vstack((np.full((1, columns), 0.5), porosity))
+            porosity = compact(dz, porosity, porosity_max=0.5, return_dz=dz)
+
+
+class TimeDeposit:
+    param_names = ["steps", "columns"]
+    params = [[1000, 3000], [1, 1000]]
+
+    def time_add(self, steps, columns):
+        column = SedimentColumn(shape=columns)
+        for _ in range(steps):
+            column.add(1.0, porosity=0.5)
+
+    def time_concatenate(self, steps, columns):
+        dz = np.empty((0, columns))
+        porosity = np.empty((0, columns))
+        for _ in range(steps):
+            dz = np.vstack((np.full((1, columns), 1.0), dz))
+            porosity = np.vstack((np.full((1, columns), 0.5), porosity))
+
+    def time_erode(self, steps, columns):
+        column = SedimentColumn(shape=columns, capacity=steps)
+        for _ in range(steps):
+            column.add(1.0, porosity=0.5)
+        for _ in range(steps):
+            column.erode(0.5)
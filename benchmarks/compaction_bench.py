@@ -1,6 +1,10 @@
+import tracemalloc
+
 import numpy as np
 
-from compaction.compaction import compact
+from compaction.compaction import compact, compacted_thickness
+
+from . import _data
 
 
 class TimeCompaction:
@@ -17,3 +21,94 @@ class TimeCompaction:
 
     def time_with_dz(self, layers, columns):
         compact(self.dz, self.phi, porosity_max=0.5, return_dz=self.dz_new)
+
+    def time_compacted_thickness(self, layers, columns):
+        compacted_thickness(self.dz, self.phi, porosity_max=0.5)
+
+
+class MemCompaction:
+    param_names = ["layers", "columns"]
+    params = [[100, 1000], [100, 1000, 10000]]
+
+    def setup(self, layers, columns):
+        self.dz, self.phi = _data.layers(layers, columns)
+        self.dz_new = np.empty_like(self.dz)
+
+    def peakmem_without_dz(self, layers, columns):
+        compact(self.dz, self.phi, porosity_max=0.7)
+
+    def peakmem_with_dz(self, layers, columns):
+        compact(self.dz, self.phi, porosity_max=0.7, return_dz=self.dz_new)
+
+    def peakmem_compacted_thickness(self, layers, columns):
+        compacted_thickness(self.dz, self.phi, porosity_max=0.7)
+
+    def track_allocated_without_dz(self, layers, columns):
+        return _allocated_by(compact, self.dz, self.phi, porosity_max=0.7)
+
+    def track_allocated_with_dz(self, layers, columns):
+        return _allocated_by(
+            compact, self.dz, self.phi, porosity_max=0.7, return_dz=self.dz_new
+        )
+
+    def track_allocated_compacted_thickness(self, layers, columns):
+        return _allocated_by(compacted_thickness, self.dz, self.phi, porosity_max=0.7)
+
+    track_allocated_without_dz.unit = "bytes"
+    track_allocated_with_dz.unit = "bytes"
+    track_allocated_compacted_thickness.unit = "bytes"
+
+
+class TimeLayouts:
+    param_names = ["layout", "dtype"]
+    params = [["C", "F", "reversed"], ["float64", "float32"]]
+
+    def setup(self, layout, dtype):
+        order = "F" if layout == "F" else "C"
+        self.dz, self.phi = _data.layers(1000, 1000, dtype=dtype, order=order)
+        if layout == "reversed":
+            self.dz, self.phi = self.dz[::-1], self.phi[::-1]
+        self.dz_new = np.empty(self.dz.shape, dtype=float)
+
+    def time_without_dz(self, layout, dtype):
+        compact(self.dz, self.phi, porosity_max=0.7)
+
+    def time_with_dz(self, layout, dtype):
+        compact(self.dz, self.phi, porosity_max=0.7, return_dz=self.dz_new)
+
+    def peakmem_without_dz(self, layout, dtype):
+        compact(self.dz, self.phi, porosity_max=0.7)
+
+
+class TimeArrayParams:
+    param_names = ["layers", "columns", "shape"]
+    params = [[100, 1000], [100, 1000, 10000], ["scalar", "column", "layer"]]
+
+    def setup(self, layers, columns, shape):
+        self.dz, self.phi = _data.layers(layers, columns)
+        self.dz_new = np.empty_like(self.dz)
+        self.params = _data.params(layers, columns)
+        if shape == "scalar":
+            self.params = {
+                name: float(value.mean()) for name, value in self.params.items()
+            }
+        elif shape == "column":
+            self.params = {
+                name: value.mean(axis=0) for name, value in self.params.items()
+            }
+
+    def time_with_dz(self, layers, columns, shape):
+        compact(self.dz, self.phi, return_dz=self.dz_new, **self.params)
+
+    def peakmem_with_dz(self, layers, columns, shape):
+        compact(self.dz, self.phi, return_dz=self.dz_new, **self.params)
+
+
+def _allocated_by(func, *args, **kwds):
+    tracemalloc.start()
+    try:
+        func(*args, **kwds)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
@@ -1,6 +1,9 @@
-from landlab import RasterModelGrid
+import numpy as np
+from landlab import HexModelGrid, RasterModelGrid
 
-from compaction.landlab import Compact
+from compaction.landlab import Compact, CompactEnsemble
+
+from . import _data
 
 
 class TimeLandlabComponent:
@@ -15,3 +18,119 @@ class TimeLandlabComponent:
     def time_component(self, layers, columns):
         compact = Compact(self.grid, porosity_min=0.0, porosity_max=0.5)
         compact.calculate()
+
+
+class TimeLandlabManySteps:
+    param_names = ["steps", "grid"]
+    params = [[10, 100], ["raster", "hex"]]
+
+    def setup(self, steps, grid):
+        if grid == "raster":
+            self.grid = RasterModelGrid((100, 100))
+        else:
+            self.grid = HexModelGrid((100, 100))
+        self.rng = np.random.default_rng(1945)
+        for _ in range(100):
+            _data.deposit(self.grid, self.rng)
+        self.compact = Compact(self.grid, porosity_min=0.02, porosity_max=0.65)
+
+    def time_deposit_and_compact(self, steps, grid):
+        for _ in range(steps):
+            _data.deposit(self.grid, self.rng)
+            self.compact.run_one_step()
+
+    def peakmem_deposit_and_compact(self, steps, grid):
+        for _ in range(steps):
+            _data.deposit(self.grid, self.rng)
+            self.compact.run_one_step()
+
+
+class TimeLandlabMasked:
+    """Compact a grid where 40% of the cells are closed."""
+
+    param_names = ["grid", "mask"]
+    params = [["raster", "hex"], ["core", "all"]]
+
+    def setup(self, grid, mask):
+        if grid == "raster":
+            self.grid = RasterModelGrid((200, 200))
+        else:
+            self.grid = HexModelGrid((200, 200))
+        rng = np.random.default_rng(1945)
+        closed = rng.random(self.grid.number_of_cells) < 0.4
+        self.grid.status_at_node[
+            self.grid.node_at_cell[closed]
+        ] = self.grid.BC_NODE_IS_CLOSED
+        for _ in range(100):
+            _data.deposit(self.grid, rng)
+
+        self.compact = Compact(
+            self.grid,
+            porosity_min=0.02,
+            porosity_max=0.65,
+            mask=None if mask == "core" else np.full(self.grid.number_of_cells, True),
+        )
+
+    def time_run_one_step(self, grid, mask):
+        self.compact.run_one_step()
+
+
+class TimeLandlabEnsemble:
+    """Step many small grids, one at a time or as an ensemble."""
+
+    param_names = ["members", "shape", "how"]
+    params = [[10, 100, 500], [(5, 5), (10, 10)], ["components", "ensemble"]]
+
+    def setup(self, members, shape, how):
+        rng = np.random.default_rng(1945)
+        grids = [RasterModelGrid(shape) for _ in range(members)]
+        for grid in grids:
+            for _ in range(20):
+                _data.deposit(grid, rng)
+
+        if how == "ensemble":
+            self.ensemble = CompactEnsemble()
+            for grid in grids:
+                self.ensemble.add(grid, porosity_min=0.02, porosity_max=0.65)
+            self.components = [self.ensemble]
+        else:
+            self.components = [
+                Compact(grid, porosity_min=0.02, porosity_max=0.65) for grid in grids
+            ]
+
+    def time_run_one_step(self, members, shape, how):
+        for compact in self.components:
+            compact.run_one_step()
+
+
+class TimeLandlabFieldParams:
+    """Compact with parameters that vary by cell or by layer."""
+
+    param_names = ["params"]
+    params = [["scalar", "array", "at-cell", "event-layer"]]
+
+    def setup(self, params):
+        self.grid = RasterModelGrid((100, 100))
+        rng = np.random.default_rng(1945)
+        n_cells = self.grid.number_of_cells
+
+        c = rng.uniform(1e-8, 5e-8, size=n_cells)
+        self.grid.add_field("compaction_coefficient", c, at="cell")
+        for _ in range(100):
+            self.grid.event_layers.add(
+                rng.lognormal(0.0, 0.5, size=n_cells),
+                porosity=rng.uniform(0.4, 0.65, size=n_cells),
+                compaction_coefficient=c,
+            )
+
+        self.c = {
+            "scalar": 3e-8,
+            "array": c,
+            "at-cell": "compaction_coefficient",
+            "event-layer": "compaction_coefficient",
+        }[params]
+        if params == "event-layer":
+            self.grid.at_cell.pop("compaction_coefficient")
+
+    def time_run_one_step(self, params):
+        Compact(self.grid, c=self.c, porosity_max=0.65).run_one_step()
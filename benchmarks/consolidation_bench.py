@@ -0,0 +1,35 @@
+import numpy as np
+from landlab import RasterModelGrid
+
+from compaction.consolidation import diffuse_excess_pressure
+from compaction.landlab import Compact
+
+
+class TimeDiffuseExcessPressure:
+    param_names = ["layers", "columns"]
+    params = [[10, 100, 1000], [100, 1000, 10000, 100000]]
+
+    def setup(self, layers, columns):
+        rng = np.random.default_rng(1945)
+        self.pressure = rng.uniform(0.0, 1e6, size=(layers, columns))
+        self.dz = rng.uniform(0.1, 2.0, size=(layers, columns))
+        self.out = np.empty_like(self.pressure)
+
+    def time_diffuse(self, layers, columns):
+        diffuse_excess_pressure(self.pressure, self.dz, 1e9, 1e-7, out=self.out)
+
+
+class TimeConsolidatingComponent:
+    param_names = ["layers", "shape"]
+    params = [[10, 100, 1000], [(100, 100), (300, 300)]]
+
+    def setup(self, layers, shape):
+        self.grid = RasterModelGrid(shape)
+        for _ in range(layers):
+            self.grid.event_layers.add(1.0, porosity=0.5)
+        self.compact = Compact(
+            self.grid, porosity_min=0.0, porosity_max=0.5, diffusivity=1e-7
+        )
+
+    def time_run_one_step(self, layers, shape):
+        self.compact.run_one_step(dt=1e9)
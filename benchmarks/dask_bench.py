@@ -0,0 +1,28 @@
+import dask.array as da
+import numpy as np
+
+from compaction.dask import compact
+
+
+class TimeDaskCompaction:
+    param_names = ["chunk_columns", "scheduler"]
+    params = [[100, 1000, 10000], ["threads", "processes"]]
+
+    def setup(self, chunk_columns, scheduler):
+        rng = np.random.default_rng(1945)
+        shape = (1000, 10000)
+        self.dz = da.from_array(
+            rng.uniform(0.1, 2.0, size=shape), chunks=(shape[0], chunk_columns)
+        )
+        self.phi = da.from_array(
+            rng.uniform(0.3, 0.6, size=shape), chunks=(shape[0], chunk_columns)
+        )
+
+    def time_without_dz(self, chunk_columns, scheduler):
+        compact(self.dz, self.phi, porosity_max=0.6).compute(scheduler=scheduler)
+
+    def time_with_dz(self, chunk_columns, scheduler):
+        da.compute(
+            *compact(self.dz, self.phi, porosity_max=0.6, return_dz=True),
+            scheduler=scheduler,
+        )
@@ -0,0 +1,25 @@
+import numpy as np
+
+from compaction.compaction import compact
+from compaction.equilibrium import equilibrium_column
+
+
+class TimeEquilibriumColumn:
+    param_names = ["layers", "columns"]
+    params = [[100, 1000], [1, 1000]]
+
+    def setup(self, layers, columns):
+        self.thickness = np.full(columns, 3000.0)
+        self.c = np.full((layers, 1), 5e-8)
+
+    def time_closed_form(self, layers, columns):
+        equilibrium_column(self.thickness, layers, porosity_max=0.6)
+
+    def time_by_layer(self, layers, columns):
+        equilibrium_column(self.thickness, layers, c=self.c, porosity_max=0.6)
+
+    def time_spin_up(self, layers, columns):
+        dz = np.full((layers, columns), 3000.0 / layers / 0.6)
+        porosity = np.full((layers, columns), 0.6)
+        for _ in range(20):
+            porosity = compact(dz, porosity, porosity_max=0.6, return_dz=dz)
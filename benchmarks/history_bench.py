@@ -0,0 +1,47 @@
+import os
+import tempfile
+
+import numpy as np
+from landlab import RasterModelGrid
+
+from compaction.history import HistoryRecorder
+from compaction.landlab import Compact
+
+
+class TimeHistoryRecorder:
+    param_names = ["layers", "columns"]
+    params = [[100, 1000], [100, 10000]]
+
+    def setup(self, layers, columns):
+        self.grid = RasterModelGrid((3, columns + 2))
+        for _ in range(layers):
+            self.grid.event_layers.add(1.0, porosity=0.5)
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def teardown(self, layers, columns):
+        self.tmpdir.cleanup()
+
+    def _run(self, recorder=None, n_steps=10):
+        compact = Compact(self.grid, porosity_max=0.5, recorder=recorder)
+        for _ in range(n_steps):
+            self.grid.event_layers.add(1.0, porosity=0.5)
+            compact.run_one_step()
+        return compact
+
+    def time_without_recorder(self, layers, columns):
+        self._run()
+
+    def time_recorder(self, layers, columns):
+        with HistoryRecorder(os.path.join(self.tmpdir.name, "history.zarr")) as rec:
+            self._run(recorder=rec)
+
+    def time_full_snapshots(self, layers, columns):
+        compact = Compact(self.grid, porosity_max=0.5)
+        for step in range(10):
+            self.grid.event_layers.add(1.0, porosity=0.5)
+            compact.run_one_step()
+            np.savez_compressed(
+                os.path.join(self.tmpdir.name, f"snapshot-{step}.npz"),
+                dz=self.grid.event_layers.dz,
+                porosity=self.grid.event_layers["porosity"],
+            )
@@ -0,0 +1,41 @@
+import numpy as np
+from scipy.constants import g
+
+from compaction.compaction import OUTPUTS, compact
+
+from . import _data
+
+
+class TimeDerivedOutputs:
+    param_names = ["layers", "columns"]
+    params = [[100, 1000], [1000, 10000]]
+
+    def setup(self, layers, columns):
+        self.dz, self.phi = _data.layers(layers, columns)
+        self.dz_new = np.empty_like(self.dz)
+        self.outputs = {name: np.empty_like(self.dz) for name in OUTPUTS}
+
+    def time_with_outputs(self, layers, columns):
+        compact(
+            self.dz,
+            self.phi,
+            porosity_max=0.7,
+            return_dz=self.dz_new,
+            outputs=self.outputs,
+        )
+
+    def time_separate_passes(self, layers, columns):
+        phi_new = compact(self.dz, self.phi, porosity_max=0.7, return_dz=self.dz_new)
+        self.outputs["bulk_density"][...] = 2650.0 * (1.0 - phi_new) + 1000.0 * phi_new
+        load = (2650.0 - 1000.0) * self.dz * (1.0 - self.phi) * g
+        self.outputs["overburden_stress"][...] = np.cumsum(load, axis=0) - load
+        self.outputs["depth_to_bottom"][...] = np.cumsum(self.dz_new, axis=0)
+        self.outputs["depth_to_top"][...] = (
+            self.outputs["depth_to_bottom"] - self.dz_new
+        )
+
+    def peakmem_with_outputs(self, layers, columns):
+        self.time_with_outputs(layers, columns)
+
+    def peakmem_separate_passes(self, layers, columns):
+        self.time_separate_passes(layers, columns)
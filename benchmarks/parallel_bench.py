@@ -0,0 +1,26 @@
+import numpy as np
+
+from compaction import parallel
+
+
+class TimeParallelCompaction:
+    param_names = ["layers", "columns", "executor"]
+    params = [[100, 1000, 10000], [100, 1000, 10000], list(parallel.EXECUTORS)]
+
+    def setup(self, layers, columns, executor):
+        rng = np.random.default_rng(1945)
+        self.dz = rng.uniform(0.1, 2.0, size=(layers, columns))
+        self.phi = rng.uniform(0.3, 0.6, size=(layers, columns))
+        self.dz_new = np.empty_like(self.dz)
+
+    def time_without_dz(self, layers, columns, executor):
+        parallel.compact(self.dz, self.phi, porosity_max=0.6, executor=executor)
+
+    def time_with_dz(self, layers, columns, executor):
+        parallel.compact(
+            self.dz,
+            self.phi,
+            porosity_max=0.6,
+            return_dz=self.dz_new,
+            executor=executor,
+        )
@@ -0,0 +1,41 @@
+import os
+import tempfile
+
+import numpy as np
+
+from compaction.cli import run_compaction_batch
+from compaction.pipeline import run_pipeline
+from compaction.stages import save_table
+
+from . import _data
+
+
+class TimeBatch:
+    param_names = ["files", "layers", "how"]
+    params = [[100], [1000, 100000], ["serial", "pipeline"]]
+
+    def setup(self, files, layers, how):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        dz, porosity = _data.layers(layers, files)
+
+        self.srcs, self.dests = [], []
+        for i in range(files):
+            src = os.path.join(self._tmpdir.name, f"porosity-{i}.csv")
+            save_table(
+                src,
+                np.column_stack((dz[:, i], porosity[:, i])),
+                header="Layer Thickness [m], Porosity [-]",
+            )
+            self.srcs.append(src)
+            self.dests.append(os.path.join(self._tmpdir.name, f"porosity-{i}-out.csv"))
+
+    def teardown(self, files, layers, how):
+        self._tmpdir.cleanup()
+
+    def time_batch(self, files, layers, how):
+        if how == "pipeline":
+            run_pipeline(self.srcs, self.dests, workers=2, porosity_max=0.7)
+        else:
+            run_compaction_batch(
+                self.srcs, self.dests, executor="serial", porosity_max=0.7
+            )
@@ -0,0 +1,31 @@
+from compaction.compaction import compact
+
+from . import _data
+
+
+class CompactWithinMemory:
+    param_names = ["max_memory"]
+    params = [[None, "48 MB", "24 MB"]]
+
+    def setup(self, max_memory):
+        self.dz, self.porosity = _data.layers(1000, 2000)
+
+    def time_compact(self, max_memory):
+        compact(self.dz, self.porosity, max_memory=max_memory)
+
+    def peakmem_compact(self, max_memory):
+        compact(self.dz, self.porosity, max_memory=max_memory)
+
+
+class CompactDeepColumnWithinMemory:
+    param_names = ["max_memory"]
+    params = [[None, "32 MB", "12 MB"]]
+
+    def setup(self, max_memory):
+        self.dz, self.porosity = _data.layers(1000000, 1)
+
+    def time_compact(self, max_memory):
+        compact(self.dz, self.porosity, max_memory=max_memory)
+
+    def peakmem_compact(self, max_memory):
+        compact(self.dz, self.porosity, max_memory=max_memory)
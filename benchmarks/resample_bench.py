@@ -0,0 +1,32 @@
+import numpy as np
+
+from compaction.resample import resample_to_depth, resample_to_depth_by_chunk
+
+from . import _data
+
+
+class TimeResampleToDepth:
+    param_names = ["layers", "columns"]
+    params = [[100, 1000], [100, 10000]]
+
+    def setup(self, layers, columns):
+        self.dz, self.porosity = _data.layers(layers, columns)
+        self.depths = np.linspace(0.0, self.dz.sum(axis=0).max(), 101)
+        self.out = np.empty((100, columns))
+
+    def time_resample(self, layers, columns):
+        resample_to_depth(self.dz, self.porosity, self.depths, out=self.out)
+
+    def time_resample_by_chunk(self, layers, columns):
+        resample_to_depth_by_chunk(
+            self.dz, self.porosity, self.depths, out=self.out, chunk_size=1024
+        )
+
+    def time_interp_by_column(self, layers, columns):
+        for column in range(columns):
+            top = np.concatenate(([0.0], np.cumsum(self.dz[:, column])))
+            pores = np.concatenate(
+                ([0.0], np.cumsum(self.dz[:, column] * self.porosity[:, column]))
+            )
+            depth = np.clip(self.depths, 0.0, top[-1])
+            np.diff(np.interp(depth, top, pores))
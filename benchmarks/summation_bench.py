@@ -0,0 +1,62 @@
+import math
+
+import numpy as np
+
+from compaction.compaction import compact
+from compaction.summation import exclusive_cumsum
+
+from . import _data
+
+
+class TimeExclusiveCumsum:
+    param_names = ["method", "layers", "dtype"]
+    params = [
+        ["cumsum", "pairwise", "kahan"],
+        [1000, 100000, 1000000],
+        ["float32", "float64"],
+    ]
+
+    def setup(self, method, layers, dtype):
+        self.load = np.random.default_rng(1945).lognormal(size=layers).astype(dtype)
+        self.out = np.empty_like(self.load)
+
+    def time_exclusive_cumsum(self, method, layers, dtype):
+        exclusive_cumsum(self.load, method=method, out=self.out)
+
+
+class TrackExclusiveCumsumError:
+    """Relative error of the load at the base of a column."""
+
+    param_names = ["method", "layers", "dtype"]
+    params = [
+        ["cumsum", "pairwise", "kahan"],
+        [1000, 100000, 1000000],
+        ["float32", "float64"],
+    ]
+    unit = "relative error"
+
+    def setup(self, method, layers, dtype):
+        self.load = np.random.default_rng(1945).lognormal(size=layers).astype(dtype)
+        self.expected = math.fsum(self.load[:-1].astype(float))
+
+    def track_error(self, method, layers, dtype):
+        actual = float(exclusive_cumsum(self.load, method=method)[-1])
+        return abs(actual - self.expected) / self.expected
+
+
+class TimeCompactSummation:
+    param_names = ["summation", "shape"]
+    params = [["cumsum", "pairwise", "kahan"], [(100000, 1), (1000, 100)]]
+
+    def setup(self, summation, shape):
+        self.dz, self.porosity = _data.layers(*shape)
+        self.dz_new = np.empty_like(self.dz)
+
+    def time_compact(self, summation, shape):
+        compact(
+            self.dz,
+            self.porosity,
+            porosity_max=0.65,
+            return_dz=self.dz_new,
+            summation=summation,
+        )
@@ -0,0 +1,8 @@
+import importlib.util
+
+collect_ignore = []
+
+if importlib.util.find_spec("dask") is None:
+    collect_ignore.append("src/compaction/dask.py")
+if importlib.util.find_spec("bmipy") is None:
+    collect_ignore.append("src/compaction/bmi.py")
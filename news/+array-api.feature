@@ -0,0 +1,7 @@
+*compact* now accepts arrays of any library that supports the Python array
+API standard (for example, *array-api-strict* or *JAX*) and compacts them with
+that library's functions, without converting them to NumPy arrays. NumPy
+arrays still take the existing NumPy code path. The new
+*compaction.array_api.compacted_layers* returns both porosities and
+thicknesses without writing to its arguments, so it can be compiled whole
+(for example, with ``jax.jit``).
@@ -0,0 +1,6 @@
+Added an *axis* option to ``compact`` for layers that are stacked along any
+axis of an N-dimensional array, such as stratigraphic cubes stored as
+``(ny, nx, layers)``. Layers are compacted in cache-sized blocks of columns,
+taken in the order that they are laid out in memory, without first copying
+them so that they are stacked along the first axis. New porosities are laid
+out in memory as the layer thicknesses are.
@@ -0,0 +1,3 @@
+Added *compaction.bmi.BmiCompaction*, a Basic Model Interface for compaction
+that updates its layer arrays in place so that pointers returned by
+*get_value_ptr* remain valid and no arrays are copied when exchanging data.
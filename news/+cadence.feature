@@ -0,0 +1,5 @@
+Added a *tolerance* option to the *Compact* component that skips time steps
+until the load added since layers were last compacted could change porosity by
+more than the tolerance. Porosities then stay within the tolerance of those
+compacted every time step, and the number of time steps skipped is given by
+*skipped_steps*.
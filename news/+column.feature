@@ -0,0 +1,4 @@
+Added *compaction.SedimentColumn*, a growable stack of sediment layers for use
+outside of Landlab. Layers are stored in arrays that grow by doubling, so
+adding and eroding layers at the top of a column is cheap, and the column can
+be compacted in place.
@@ -0,0 +1,4 @@
+Added a time-dependent mode to the *Compact* component. If a *diffusivity*
+is provided, excess pore pressure generated by loading dissipates over each
+time step through an implicit solve of the consolidation equation that is
+assembled and solved for all columns at once.
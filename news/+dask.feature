@@ -0,0 +1,3 @@
+Added *compaction.dask*, which compacts layers stored as chunked dask arrays
+by mapping the compaction over chunks of columns and returns lazy outputs
+that can be written directly to Zarr.
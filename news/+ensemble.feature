@@ -0,0 +1,5 @@
+Added *compaction.landlab.CompactEnsemble*, which steps many Landlab grids
+together. Columns of all grids are gathered into cache-sized batches, padded
+to a common number of layers, compacted with one call per batch, and
+scattered back, removing most of the per-grid overhead of stepping many small
+realizations.
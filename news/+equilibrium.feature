@@ -0,0 +1,5 @@
+Added ``compaction.equilibrium.equilibrium_column``, which builds columns of
+layers already compacted to equilibrium from a closed-form solution of the
+porosity profile, and ``compaction.landlab.add_equilibrium_layers``, which adds
+such layers to a grid. Models can start from these layers rather than spinning
+up by repeatedly depositing and compacting sediment.
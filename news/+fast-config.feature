@@ -0,0 +1,5 @@
+Sped up starting the command line program for many small runs. Config files
+are parsed with the standard library's *tomllib* (*tomlkit* is now only used
+to write files), and *load_config_file* reuses a parsed file until its
+modification time or size changes. Input and output CSV files are read and
+written with NumPy, so *pandas* is no longer imported, nor required.
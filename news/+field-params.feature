@@ -0,0 +1,5 @@
+The compaction parameters of *compaction.landlab.Compact* can now be arrays,
+whose values are checked all at once, or the names of at-cell or event-layer
+fields. Fields are read through views of the grid's arrays at every time step,
+without being copied or broadcast to every layer. Their values are checked when
+the parameter is set and, for event-layer fields, as layers are added.
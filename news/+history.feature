@@ -0,0 +1,5 @@
+Added ``compaction.history.HistoryRecorder``, which records the history of a
+grid's event layers in a compressed Zarr store. After each step it stores only
+new layers and values that changed by more than a tolerance, writes them on a
+background thread, and can reconstruct the layers after any past step. Attach
+one to the *Compact* component with its new *recorder* option.
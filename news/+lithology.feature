@@ -0,0 +1,9 @@
+Added compaction of layers that are mixtures of lithologies. Given the
+compaction parameters of each lithology and the fraction of each layer made
+up of each, *compact* and *compacted_thickness* mix the parameters layer by
+layer. *compact* weights the parameters by their fractions within the
+expressions for the load and the porosity, and so needs no more memory for a
+mixture than for a single lithology. The Landlab component takes lithology fractions from event-layer
+fields, and the command line program from extra input columns, with the
+parameters of each lithology read from ``[compaction.lithology.<name>]``
+tables in the config file.
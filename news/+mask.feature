@@ -0,0 +1,5 @@
+The *Compact* component now compacts only the columns of a grid's core cells,
+or of the cells given by a new *mask* keyword (a boolean array or the name of a
+boolean at-cell field). Columns of active cells are gathered into reusable
+buffers, compacted, and scattered back so that closed and inactive cells are
+skipped.
@@ -0,0 +1,7 @@
+Added a *max_memory* option to ``compact`` (and ``--max-memory`` to the
+``compact run`` and ``compact batch`` commands, or *max_memory* in the
+*compaction* table of a configuration file) that keeps peak memory within a
+budget. ``compaction.planning.plan`` estimates the memory needed and, if all
+layers do not fit at once, compacts blocks of columns or, for very deep
+columns, blocks of layers from the top down, carrying the load of the layers
+above from one block to the next.
@@ -0,0 +1,6 @@
+Added a ``--metrics`` option to the ``run`` and ``batch`` commands, and a
+``[compaction.metrics]`` config table, that report metrics of each run as JSON
+lines: input size, layers and columns, seconds spent reading, computing and
+writing, layers per second, and peak resident set size. With ``--summary``
+(or ``summary = true``), ``batch`` adds a last line that summarizes the batch.
+*run_compaction* and *run_compaction_batch* now return these metrics.
@@ -0,0 +1,6 @@
+Added an *outputs* option to ``compact`` and to the *Compact* component that
+calculates any of the bulk density, effective overburden stress, and depths to
+the top and bottom of each compacted layer along with the new porosities.
+These reuse the intermediate values of the compaction (the load of overlying
+layers and the new porosities and thicknesses) rather than recalculating them,
+and can be written into arrays provided by the caller.
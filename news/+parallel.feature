@@ -0,0 +1,4 @@
+Added *compaction.parallel*, which compacts ranges of columns with a pool of
+thread or process workers. The process pool places inputs and outputs in
+shared memory. Added a ``compaction batch`` command that runs many input files
+with a pool of workers.
@@ -0,0 +1,7 @@
+Added a *pipeline* executor to ``compaction batch`` (and
+*compaction.pipeline.run_pipeline*) that reads, compacts and writes files in
+separate stages that run at the same time, connected by bounded queues. The
+number of workers of each stage (``--readers``, ``-j``, ``--writers``) and the
+number of files that can wait between stages (``--queue-size``) are
+configurable, and the utilization of each stage is reported in the batch
+summary of ``--metrics --summary``.
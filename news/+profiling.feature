@@ -0,0 +1,5 @@
+Added opt-in instrumentation of the time spent, and memory allocated, by each
+stage of compaction. Profiles are available through the
+*compaction.profiling.profile* context manager, the *stats* property of a
+*Compact* component created with ``profile=True``, and the ``--profile`` option
+of ``compaction run``.
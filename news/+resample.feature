@@ -0,0 +1,6 @@
+Added ``compaction.resample.resample_to_depth``, which resamples the porosity
+of every column of layers onto a fixed grid of depths at once using
+thickness-weighted means, and ``resample_to_depth_by_chunk``, which does the
+same a chunk of columns at a time for memory-mapped stacks of layers. The
+*Compact* component has a new *depths* option that stores resampled porosities
+in *porosity_at_depth* after each time step.
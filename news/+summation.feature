@@ -0,0 +1,5 @@
+Added a *summation* keyword to *compact* and *compacted_thickness* that selects
+how the load of overlying layers is summed. The new *pairwise* and *kahan*
+methods calculate the overlying load directly, rather than by subtracting each
+layer's load from a running total, so that rounding errors no longer grow with
+the depth of a column.
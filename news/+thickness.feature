@@ -0,0 +1,4 @@
+Added *compacted_thickness*, which calculates the total thickness of columns
+after compaction without storing the per-layer results, and
+*Compact.calc_compacted_thickness* for Landlab users that only need the change
+in surface elevation.
@@ -1,3 +1,4 @@
 from ._version import __version__
+from .column import SedimentColumn
 
-__all__ = ["__version__"]
+__all__ = ["__version__", "SedimentColumn"]
@@ -0,0 +1,175 @@
+"""Compact sediment stored in arrays of any library that supports the array API.
+
+:func:`compaction.compaction.compact` dispatches to this module when it is
+given arrays that are not NumPy arrays but that support the `Python array
+API standard <https://data-apis.org/array-api/>`_ (for example, arrays of
+*array-api-strict*, *JAX*, or, through *array-api-compat*, *PyTorch*).
+Operations then use the namespace of the input arrays, so the arrays are
+never converted to NumPy arrays.
+"""
+from __future__ import annotations
+
+import functools
+from collections.abc import Sequence
+
+import numpy as np  # type: ignore
+from scipy.constants import g  # type: ignore
+
+
+@functools.cache
+def _array_api_compat():
+    """The *array-api-compat* package, if installed, imported when first needed."""
+    try:
+        import array_api_compat  # type: ignore
+    except ModuleNotFoundError:  # pragma: no cover
+        return None
+    return array_api_compat
+
+
+def is_array_api_obj(x) -> bool:
+    """Check if an object is a non-NumPy array of an array API library.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from compaction.array_api import is_array_api_obj
+    >>> is_array_api_obj(np.ones(3)), is_array_api_obj([1.0, 2.0])
+    (False, False)
+    """
+    if isinstance(x, (np.ndarray, np.generic)):
+        return False
+    if (array_api_compat := _array_api_compat()) is not None:
+        return array_api_compat.is_array_api_obj(x)
+    return hasattr(x, "__array_namespace__")  # pragma: no cover
+
+
+def array_namespace(*arrays):
+    """Find the array API namespace shared by a set of arrays.
+
+    Arguments that are not arrays (for example, Python numbers) are
+    ignored.
+
+    Raises
+    ------
+    TypeError
+        If arrays are from more than one library.
+    """
+    arrays = tuple(x for x in arrays if is_array_api_obj(x))
+    if (array_api_compat := _array_api_compat()) is not None:
+        return array_api_compat.array_namespace(*arrays)
+
+    namespaces = {x.__array_namespace__() for x in arrays}  # pragma: no cover
+    if len(namespaces) != 1:  # pragma: no cover
+        raise TypeError(f"arrays must come from a single array library ({namespaces})")
+    return namespaces.pop()  # pragma: no cover
+
+
+def compacted_layers(
+    dz,
+    porosity,
+    c=5e-8,
+    rho_grain=2650.0,
+    excess_pressure=0.0,
+    porosity_min=0.0,
+    porosity_max=1.0,
+    rho_void=1000.0,
+    gravity: float = g,
+    lithologies: Sequence[dict[str, float]] | None = None,
+    fractions=None,
+):
+    """Compact a column of sediment using only array API operations.
+
+    Unlike :func:`~compaction.compaction.compact`, which writes thicknesses
+    into an output array, this function returns them. It does not modify
+    its arguments or branch on their values and so can be compiled whole
+    by libraries that trace functions (for example, with ``jax.jit``).
+
+    Parameters
+    ----------
+    dz : array
+        Array of sediment thicknesses with depth (the first element is
+        the top of the sediment column) [meters].
+    porosity : array or number
+        Sediment porosity [-].
+    c, rho_grain, excess_pressure, porosity_min, porosity_max, rho_void : array or number, optional
+        Compaction parameters (see :func:`~compaction.compaction.compact`).
+    gravity : float, optional
+        Acceleration due to gravity [m / s^2].
+    lithologies : sequence of dict, optional
+        Compaction parameters of each of a set of lithologies.
+    fractions : sequence of array, optional
+        Fraction of each layer made up of each lithology.
+
+    Returns
+    -------
+    tuple of array
+        New porosities and thicknesses of each layer after compaction.
+
+    Examples
+    --------
+    >>> import array_api_strict as xp
+    >>> from compaction.array_api import compacted_layers
+
+    >>> dz = xp.full(3, 100.0)
+    >>> porosity, dz = compacted_layers(dz, 0.5, porosity_max=0.5)
+    >>> type(porosity).__module__.startswith("array_api_strict")
+    True
+    >>> [round(float(phi), 6) for phi in porosity]
+    [0.5, 0.480177, 0.461141]
+    """
+    xp = array_namespace(dz, porosity)
+
+    if not xp.isdtype(dz.dtype, "real floating"):
+        dz = xp.astype(dz, xp.float64)
+    if not is_array_api_obj(porosity):
+        porosity = xp.full(dz.shape, porosity, dtype=dz.dtype)
+
+    if lithologies is None:
+        porosity_range = porosity_max - porosity_min
+    else:
+        c, rho_grain, porosity_min, porosity_range = _mix_lithologies(
+            lithologies,
+            fractions,
+            c=c,
+            rho_grain=rho_grain,
+            porosity_min=porosity_min,
+            porosity_max=porosity_max,
+        )
+
+    load = (rho_grain - rho_void) * dz * (1.0 - porosity) * gravity
+    overlying_load = xp.cumulative_sum(load, axis=0) - load - excess_pressure
+
+    porosity_new = xp.minimum(
+        porosity_min + porosity_range * xp.exp(-c * overlying_load), porosity
+    )
+
+    contains_sediment = porosity_new < 1.0
+    dz_new = xp.where(
+        contains_sediment,
+        dz * (1.0 - porosity) / xp.where(contains_sediment, 1.0 - porosity_new, 1.0),
+        0.0,
+    )
+
+    return porosity_new, dz_new
+
+
+def _mix_lithologies(lithologies, fractions, **defaults):
+    """Fraction-weighted means of the parameters of a set of lithologies."""
+    if is_array_api_obj(fractions):
+        fractions = [fractions[i, ...] for i in range(fractions.shape[0])]
+    if fractions is None or len(fractions) != len(lithologies):
+        raise ValueError("fractions must be given for each lithology")
+
+    mixed = {"c": 0.0, "rho_grain": 0.0, "porosity_min": 0.0, "porosity_range": 0.0}
+    for lithology, fraction in zip(lithologies, fractions):
+        params = defaults | lithology
+        params["porosity_range"] = params["porosity_max"] - params["porosity_min"]
+        for name in mixed:
+            mixed[name] = mixed[name] + fraction * params[name]
+
+    return (
+        mixed["c"],
+        mixed["rho_grain"],
+        mixed["porosity_min"],
+        mixed["porosity_range"],
+    )
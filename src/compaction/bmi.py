@@ -0,0 +1,219 @@
+"""Basic Model Interface for compaction."""
+from __future__ import annotations
+
+import os
+from typing import Any
+
+import numpy as np  # type: ignore
+from bmipy import Bmi  # type: ignore
+
+from compaction.cli import load_config, load_layers
+from compaction.compaction import compact
+from compaction.stages import example_layers
+
+
+class BmiCompaction(Bmi):
+    """Compact a column of sediment through the Basic Model Interface.
+
+    The thickness and porosity of each layer are held in arrays that are
+    allocated once, when the model is initialized, and are then updated in
+    place. Pointers returned by *get_value_ptr* therefore remain valid, and
+    reflect the current state of the model, for the life of the model.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from compaction.bmi import BmiCompaction
+
+    >>> model = BmiCompaction()
+    >>> model.initialize()
+    >>> porosity = model.get_value_ptr("sediment_layer__porosity")
+    >>> porosity
+    array([0.5, 0.5, 0.5])
+    >>> model.update()
+    >>> porosity.round(6)
+    array([0.5     , 0.480177, 0.461141])
+    """
+
+    _name = "Compaction"
+    _input_var_names = ("sediment_layer__thickness", "sediment_layer__porosity")
+    _output_var_names = ("sediment_layer__thickness", "sediment_layer__porosity")
+    _var_units = {"sediment_layer__thickness": "m", "sediment_layer__porosity": "1"}
+
+    def __init__(self):
+        self._params: dict[str, Any] = {}
+        self._values: dict[str, np.ndarray] = {}
+        self._time = 0.0
+        self._time_step = 1.0
+
+    def initialize(self, config_file: str | None = None) -> None:
+        """Initialize the model.
+
+        Parameters
+        ----------
+        config_file : str, optional
+            Path to a *compaction.toml* file. Layers are read from the file
+            *porosity.csv* in the same folder. If not provided, use default
+            parameters and the example layers of ``compaction generate``.
+        """
+        if config_file is None:
+            params = load_config()
+            dz, porosity = example_layers().T
+        else:
+            with open(config_file) as fp:
+                params = load_config(fp)
+            dz, porosity = load_layers(
+                os.path.join(os.path.dirname(config_file), "porosity.csv")
+            )
+
+        self._params = dict(params["constants"])
+        self._values = {
+            "sediment_layer__thickness": np.array(dz, dtype=float),
+            "sediment_layer__porosity": np.array(porosity, dtype=float),
+        }
+        self._time = 0.0
+
+    def update(self) -> None:
+        dz = self._values["sediment_layer__thickness"]
+        porosity = self._values["sediment_layer__porosity"]
+
+        porosity[:] = compact(dz, porosity, return_dz=dz, **self._params)
+
+        self._time += self._time_step
+
+    def update_until(self, time: float) -> None:
+        while self._time < time:
+            self.update()
+
+    def finalize(self) -> None:
+        self._values.clear()
+
+    def get_component_name(self) -> str:
+        return self._name
+
+    def get_input_item_count(self) -> int:
+        return len(self._input_var_names)
+
+    def get_output_item_count(self) -> int:
+        return len(self._output_var_names)
+
+    # bmipy annotates these as returning a tuple of a single name.
+    def get_input_var_names(self) -> tuple[str, ...]:  # type: ignore[override]
+        return self._input_var_names
+
+    def get_output_var_names(self) -> tuple[str, ...]:  # type: ignore[override]
+        return self._output_var_names
+
+    def get_var_grid(self, name: str) -> int:
+        self._check_var_name(name)
+        return 0
+
+    def get_var_type(self, name: str) -> str:
+        return str(self._values[name].dtype)
+
+    def get_var_units(self, name: str) -> str:
+        return self._var_units[name]
+
+    def get_var_itemsize(self, name: str) -> int:
+        return self._values[name].itemsize
+
+    def get_var_nbytes(self, name: str) -> int:
+        return self._values[name].nbytes
+
+    def get_var_location(self, name: str) -> str:
+        self._check_var_name(name)
+        return "node"
+
+    def get_current_time(self) -> float:
+        return self._time
+
+    def get_start_time(self) -> float:
+        return 0.0
+
+    def get_end_time(self) -> float:
+        return float(np.finfo(float).max)
+
+    def get_time_units(self) -> str:
+        return "s"
+
+    def get_time_step(self) -> float:
+        return self._time_step
+
+    def get_value_ptr(self, name: str) -> np.ndarray:
+        return self._values[name]
+
+    def get_value(self, name: str, dest: np.ndarray) -> np.ndarray:
+        dest[:] = self._values[name].reshape(-1)
+        return dest
+
+    def get_value_at_indices(
+        self, name: str, dest: np.ndarray, inds: np.ndarray
+    ) -> np.ndarray:
+        dest[:] = self._values[name].reshape(-1)[inds]
+        return dest
+
+    def set_value(self, name: str, src: np.ndarray) -> None:
+        self._values[name].reshape(-1)[:] = src
+
+    def set_value_at_indices(
+        self, name: str, inds: np.ndarray, src: np.ndarray
+    ) -> None:
+        self._values[name].reshape(-1)[inds] = src
+
+    def get_grid_rank(self, grid: int) -> int:
+        return 1
+
+    def get_grid_size(self, grid: int) -> int:
+        return self._values["sediment_layer__thickness"].size
+
+    def get_grid_type(self, grid: int) -> str:
+        return "rectilinear"
+
+    def get_grid_shape(self, grid: int, shape: np.ndarray) -> np.ndarray:
+        shape[:] = self._values["sediment_layer__thickness"].shape
+        return shape
+
+    def get_grid_x(self, grid: int, x: np.ndarray) -> np.ndarray:
+        """Depth to the middle of each layer [m]."""
+        dz = self._values["sediment_layer__thickness"]
+        x[:] = np.cumsum(dz) - 0.5 * dz
+        return x
+
+    def get_grid_node_count(self, grid: int) -> int:
+        return self.get_grid_size(grid)
+
+    def get_grid_spacing(self, grid: int, spacing: np.ndarray) -> np.ndarray:
+        raise NotImplementedError("get_grid_spacing")
+
+    def get_grid_origin(self, grid: int, origin: np.ndarray) -> np.ndarray:
+        raise NotImplementedError("get_grid_origin")
+
+    def get_grid_y(self, grid: int, y: np.ndarray) -> np.ndarray:
+        raise NotImplementedError("get_grid_y")
+
+    def get_grid_z(self, grid: int, z: np.ndarray) -> np.ndarray:
+        raise NotImplementedError("get_grid_z")
+
+    def get_grid_edge_count(self, grid: int) -> int:
+        raise NotImplementedError("get_grid_edge_count")
+
+    def get_grid_face_count(self, grid: int) -> int:
+        raise NotImplementedError("get_grid_face_count")
+
+    def get_grid_edge_nodes(self, grid: int, edge_nodes: np.ndarray) -> np.ndarray:
+        raise NotImplementedError("get_grid_edge_nodes")
+
+    def get_grid_face_edges(self, grid: int, face_edges: np.ndarray) -> np.ndarray:
+        raise NotImplementedError("get_grid_face_edges")
+
+    def get_grid_face_nodes(self, grid: int, face_nodes: np.ndarray) -> np.ndarray:
+        raise NotImplementedError("get_grid_face_nodes")
+
+    def get_grid_nodes_per_face(
+        self, grid: int, nodes_per_face: np.ndarray
+    ) -> np.ndarray:
+        raise NotImplementedError("get_grid_nodes_per_face")
+
+    def _check_var_name(self, name: str) -> None:
+        if name not in self._var_units:
+            raise KeyError(name)
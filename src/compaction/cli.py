@@ -1,17 +1,31 @@
+import contextlib
+import copy
+import json
 import os
 import pathlib
 import sys
+import time
 import warnings
+from collections.abc import Iterator
 from functools import partial
 from io import StringIO
-from typing import TextIO
+from types import ModuleType
+from typing import Any, TextIO
 
 import click
 import numpy as np  # type: ignore
-import pandas  # type: ignore
-import tomlkit as toml  # type: ignore
 
-from compaction.compaction import compact as _compact
+from compaction import profiling, stages
+from compaction.planning import MemoryBudgetError, parse_memory
+
+tomllib: ModuleType | None
+try:
+    import tomllib
+except ModuleNotFoundError:  # pragma: no cover
+    tomllib = None
+
+# Executors of compaction.parallel, which is only imported to run a batch.
+BATCH_EXECUTORS = ("serial", "thread", "process", "pipeline")
 
 out = partial(click.secho, bold=True, err=True)
 err = partial(click.secho, fg="red", err=True)
@@ -57,6 +71,8 @@ def _tomlkit_to_popo(d):
     >>> isinstance(popo["test"][0]["bool_value"], tomlkit.items.Item)
     False
     """
+    import tomlkit as toml  # type: ignore
+
     try:
         result = d.value
     except AttributeError:
@@ -100,36 +116,96 @@ def load_config(stream: TextIO | None = None):
     Returns
     -------
     dict
-        Config parameters.
+        Config parameters. If the file has a *lithology* table, its
+        sub-tables give the compaction parameters of each lithology of
+        which layers are a mixture. If the file has a *metrics* table,
+        it says whether to report metrics for each run (*enabled*), a
+        summary of a batch of runs (*summary*), and the file to append
+        them to (*path*, by default standard output). If the file sets
+        *max_memory*, a memory budget in bytes or as a string with units
+        (for example, ``"2 GiB"``), runs that would use more memory
+        compact layers in blocks (see :func:`~compaction.planning.plan`).
     """
-    conf = {
-        "compaction": {
-            "constants": {
-                "c": 5e-8,
-                "porosity_min": 0.0,
-                "porosity_max": 0.5,
-                "rho_grain": 2650.0,
-                "rho_void": 1000.0,
-            }
+    conf: dict[str, Any] = {
+        "constants": {
+            "c": 5e-8,
+            "porosity_min": 0.0,
+            "porosity_max": 0.5,
+            "rho_grain": 2650.0,
+            "rho_void": 1000.0,
         }
     }
     if stream is not None:
-        try:
-            local_params = toml.parse(stream.read()).value["compaction"]
-        except KeyError:
-            local_params = {"constants": {}}
+        local_params = _parse_toml(stream.read()).get("compaction", {})
+
+        conf["constants"].update(local_params.get("constants", {}))
+
+        if "lithology" in local_params:
+            conf["lithology"] = local_params["lithology"]
+
+        if "metrics" in local_params:
+            conf["metrics"] = {"enabled": True, "summary": False} | (
+                local_params["metrics"]
+            )
+
+        if "max_memory" in local_params:
+            try:
+                conf["max_memory"] = parse_memory(local_params["max_memory"])
+            except ValueError as error:
+                raise ValueError(f"max_memory: {error}") from error
+
+    return conf
 
-        try:
-            local_constants = local_params["constants"]
-        except KeyError:
-            local_constants = {}
 
-        conf["compaction"]["constants"].update(local_constants)
+def _parse_toml(contents: str) -> dict:
+    """Parse a toml document into plain-old-python objects."""
+    if tomllib is None:  # pragma: no cover
+        import tomlkit as toml  # type: ignore
 
-    return _tomlkit_to_popo(conf).pop("compaction")
+        return _tomlkit_to_popo(toml.parse(contents))
+    return tomllib.loads(contents)
+
+
+_CONFIG_CACHE: dict[str, tuple[tuple[int, int], dict]] = {}
+
+
+def load_config_file(path: str | os.PathLike) -> dict:
+    """Load a compaction config file, reusing the result if it is unchanged.
+
+    Files are only parsed if they have not been loaded before or their
+    modification time or size has changed since they were last loaded,
+    which saves parsing the same file for each of many small runs.
+
+    Parameters
+    ----------
+    path : str or path-like
+        Path to a config file.
+
+    Returns
+    -------
+    dict
+        Config parameters, as returned by :func:`load_config`.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+
+    try:
+        cached_key, params = _CONFIG_CACHE[path]
+    except KeyError:
+        cached_key = None
+
+    if cached_key != key:
+        with open(path) as fp:
+            params = load_config(fp)
+        _CONFIG_CACHE[path] = (key, params)
+
+    return copy.deepcopy(params)
 
 
 def _contents_of_input_file(infile: str) -> str:
+    import tomlkit as toml  # type: ignore
+
     params = load_config()
 
     def as_csv(data, header=None):
@@ -141,27 +217,203 @@ def _contents_of_input_file(infile: str) -> str:
     contents = {
         "compaction.toml": toml.dumps({"compacton": params}),
         "porosity.csv": as_csv(
-            [[100.0, 0.5], [100.0, 0.5], [100.0, 0.5]],
-            header="Layer Thickness [m], Porosity [-]",
+            stages.example_layers(), header="Layer Thickness [m], Porosity [-]"
         ),
     }
 
     return contents[infile]
 
 
-def run_compaction(src: str, dest: str, **kwds) -> None:
-    init = pandas.read_csv(src, names=("dz", "porosity"), dtype=float, comment="#")
+def load_layers(src) -> tuple[np.ndarray, np.ndarray]:
+    """Load layer thicknesses and porosities from a file.
+
+    Parameters
+    ----------
+    src : str or file-like
+        Path to, or opened, CSV file of layer thickness and porosity
+        with one row for each layer (the first row is the top of the
+        column). Paths that end with *.npy* are read as binary NumPy
+        files that contain an array with the same two columns.
+
+    Returns
+    -------
+    tuple of ndarray
+        Layer thicknesses and porosities.
+    """
+    data = stages.load_table(src)
+    return data[:, 0], data[:, 1]
+
+
+def run_compaction(
+    src: str, dest: str, lithologies: dict | None = None, **kwds
+) -> dict:
+    """Compact the layers of a file and write them to another.
 
-    dz_new = np.empty_like(init.dz)
-    porosity_new = _compact(
-        init.dz.values, init.porosity.values, return_dz=dz_new, **kwds
+    Parameters
+    ----------
+    src : str
+        Path to the input file.
+    dest : str
+        Path to the output file.
+    lithologies : dict, optional
+        Compaction parameters of each lithology, keyed by name. If given,
+        input files have a column for each lithology, after thickness and
+        porosity, with the fraction of each layer made of that lithology.
+    **kwds
+        Compaction parameters.
+
+    Returns
+    -------
+    dict
+        Metrics of the run: the input file and its size in bytes, the
+        number of layers and columns, seconds spent reading, computing
+        and writing, layers compacted per second, and the peak resident
+        set size, in bytes, of the process that did the run.
+    """
+    timer = profiling.timer()
+    times = [time.perf_counter()]
+
+    data, params = stages.read_stage(src, lithologies)
+    if timer is not None:
+        timer("read", nbytes=data.nbytes)
+    times.append(time.perf_counter())
+
+    result = stages.compute_stage(data, **params, **kwds)
+    if timer is not None:
+        timer("compute", nbytes=result.nbytes)
+    times.append(time.perf_counter())
+
+    stages.write_stage(dest, result, lithologies)
+    if timer is not None:
+        timer("write")
+    times.append(time.perf_counter())
+
+    return stages.run_metrics(
+        src, data.shape[:1] + data.shape[2:], *np.diff(times).tolist()
     )
 
-    result = pandas.DataFrame.from_dict({"dz": dz_new, "porosity": porosity_new})
 
-    with open(dest, "w") as fp:
-        print("# Layer Thickness [m], Porosity [-]", file=fp)
-        result.to_csv(fp, index=False, header=False)
+def summarize_metrics(metrics: list[dict], seconds: float | None = None) -> dict:
+    """Summarize the metrics of a batch of runs.
+
+    Parameters
+    ----------
+    metrics : list of dict
+        Metrics of each run, as returned by :func:`run_compaction`.
+    seconds : float, optional
+        Wall-clock time of the batch. If not provided, the sum of the
+        times of each run.
+
+    Returns
+    -------
+    dict
+        Number of runs; total bytes, layers and seconds spent in each
+        stage; layers compacted per second; the largest peak resident
+        set size of any run; and the input file of the slowest run.
+
+    Examples
+    --------
+    >>> from compaction.cli import summarize_metrics
+    >>> summary = summarize_metrics(
+    ...     [
+    ...         {"src": "a.csv", "bytes": 10, "layers": 100, "seconds": 1.0},
+    ...         {"src": "b.csv", "bytes": 30, "layers": 300, "seconds": 2.0},
+    ...     ]
+    ... )
+    >>> summary["runs"], summary["layers"], summary["layers_per_second"]
+    (2, 400, 133.33333333333334)
+    >>> summary["slowest"]
+    'b.csv'
+    """
+    totals = {
+        key: sum(run.get(key) or 0 for run in metrics)
+        for key in ("bytes", "layers", "read", "compute", "write")
+    }
+    if seconds is None:
+        seconds = sum(run["seconds"] for run in metrics)
+    peak_rss = [run["peak_rss"] for run in metrics if run.get("peak_rss") is not None]
+
+    return {
+        "summary": True,
+        "runs": len(metrics),
+        **totals,
+        "seconds": seconds,
+        "layers_per_second": totals["layers"] / seconds if seconds > 0.0 else None,
+        "peak_rss": max(peak_rss, default=None),
+        "slowest": (
+            max(metrics, key=lambda run: run["seconds"])["src"] if metrics else None
+        ),
+    }
+
+
+def _write_metrics(lines: list[dict], path: str | None = None) -> None:
+    """Write metrics as JSON lines to a file or standard output."""
+    contents = "".join(json.dumps(line) + "\n" for line in lines)
+    if path is None:
+        sys.stdout.write(contents)
+    else:
+        with open(path, "a") as fp:
+            fp.write(contents)
+
+
+def run_compaction_batch(
+    srcs, dests, executor: str = "process", workers: int | None = None, **kwds
+) -> list[dict]:
+    """Run compaction for each of a set of input files.
+
+    Parameters
+    ----------
+    srcs : iterable of str
+        Paths to input files.
+    dests : iterable of str
+        Paths to output files, one for each input file.
+    executor : {"process", "thread", "serial", "pipeline"}, optional
+        How to run the workers. The *pipeline* executor overlaps reading,
+        compacting and writing files (see
+        :func:`~compaction.pipeline.run_pipeline`).
+    workers : int, optional
+        Number of workers. The default is the number of CPUs. For the
+        *pipeline* executor, this is the number of workers that compact
+        layers.
+    **kwds
+        Compaction parameters.
+
+    Returns
+    -------
+    list of dict
+        Metrics of each run, in the order of the input files.
+    """
+    if executor not in BATCH_EXECUTORS:
+        raise ValueError(
+            f"{executor!r}: executor not understood"
+            f" (not one of {', '.join(BATCH_EXECUTORS)})"
+        )
+
+    srcs, dests = list(srcs), list(dests)
+    if len(srcs) != len(dests):
+        raise ValueError("number of input and output files must match")
+
+    if executor == "pipeline":
+        from compaction.pipeline import run_pipeline
+
+        return run_pipeline(
+            srcs, dests, workers=workers or os.cpu_count() or 1, **kwds
+        ).metrics
+
+    if executor == "serial":
+        return [run_compaction(src, dest, **kwds) for src, dest in zip(srcs, dests)]
+
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    Executor = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    with Executor(max_workers=workers) as pool:
+        return [
+            future.result()
+            for future in [
+                pool.submit(run_compaction, src, dest, **kwds)
+                for src, dest in zip(srcs, dests)
+            ]
+        ]
 
 
 @click.group(chain=True)
@@ -194,21 +446,271 @@ def compaction(cd) -> None:
 @click.version_option()
 @click.option("-v", "--verbose", is_flag=True, help="Emit status messages to stderr.")
 @click.option("--dry-run", is_flag=True, help="Do not actually run the model")
-def run(dry_run: bool, verbose: bool) -> None:
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Print time spent in each stage of the run, as JSON, to stdout.",
+)
+@click.option(
+    "--metrics",
+    is_flag=True,
+    help="Print metrics of the run, as a JSON line, to stdout.",
+)
+@click.option(
+    "--max-memory",
+    default=None,
+    callback=lambda ctx, param, value: _parse_memory_option(value),
+    help="Memory budget for compacting the layers of a file (for example, 2GiB).",
+)
+def run(
+    dry_run: bool,
+    verbose: bool,
+    profile: bool,
+    metrics: bool,
+    max_memory: int | None,
+) -> None:
     """Run a simulation."""
-    with open("compaction.toml") as fp:
-        params = load_config(fp)
+    with _reporting_config_errors("compaction.toml"):
+        params = load_config_file("compaction.toml")
+    metrics_conf = _metrics_config(params, metrics)
+    if max_memory is None:
+        max_memory = params.get("max_memory")
 
     if verbose:
-        out(toml.dumps(params))
+        _dump_params(params)
 
     if dry_run:
         out("Nothing to do. 😴")
+        return
+
+    with _reporting_memory_errors(), (
+        profiling.profile() if profile else contextlib.nullcontext()
+    ) as stats:
+        run_metrics = run_compaction(
+            "porosity.csv",
+            "porosity-out.csv",
+            lithologies=params.get("lithology"),
+            max_memory=max_memory,
+            **params["constants"],
+        )
+    if stats is not None:
+        print(stats.to_json())
+    if metrics_conf["enabled"]:
+        _write_metrics([run_metrics], path=metrics_conf["path"])
+
+    out("💥 Finished! 💥")
+    out("Output written to {}".format("porosity-out.csv"))
+
+
+@compaction.command()
+@click.version_option()
+@click.option("-v", "--verbose", is_flag=True, help="Emit status messages to stderr.")
+@click.option("--dry-run", is_flag=True, help="Do not actually run the model")
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of workers [default: number of CPUs]",
+)
+@click.option(
+    "--executor",
+    type=click.Choice(BATCH_EXECUTORS),
+    default="process",
+    show_default=True,
+    help="How to run the workers",
+)
+@click.option(
+    "--readers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="With the pipeline executor, number of workers that read files",
+)
+@click.option(
+    "--writers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="With the pipeline executor, number of workers that write files",
+)
+@click.option(
+    "--queue-size",
+    type=click.IntRange(min=1),
+    default=2,
+    show_default=True,
+    help="With the pipeline executor, number of files that can wait between stages",
+)
+@click.option(
+    "--out-dir",
+    type=click.Path(file_okay=False, dir_okay=True, writable=True),
+    default=None,
+    help="Folder for output files [default: alongside each input file]",
+)
+@click.option(
+    "--metrics",
+    is_flag=True,
+    help="Print metrics of each run, as JSON lines, to stdout.",
+)
+@click.option(
+    "--summary",
+    is_flag=True,
+    help="With --metrics, also print a summary of the batch as a last line.",
+)
+@click.option(
+    "--max-memory",
+    default=None,
+    callback=lambda ctx, param, value: _parse_memory_option(value),
+    help="Memory budget for compacting the layers of a file (for example, 2GiB).",
+)
+@click.argument(
+    "src",
+    nargs=-1,
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
+)
+def batch(
+    src: tuple[str, ...],
+    out_dir: str | None,
+    executor: str,
+    readers: int,
+    writers: int,
+    queue_size: int,
+    jobs: int | None,
+    dry_run: bool,
+    verbose: bool,
+    metrics: bool,
+    summary: bool,
+    max_memory: int | None,
+) -> None:
+    """Run a simulation for each of a set of input files.
+
+    Output for each input file is written to a file of the same name but
+    with an "-out" suffix (for example, *porosity.csv* is written to
+    *porosity-out.csv*).
+
+    The pipeline executor reads, compacts and writes files in separate
+    stages that run at the same time. With --summary, the summary
+    includes how busy the workers of each stage were.
+    """
+    if os.path.isfile("compaction.toml"):
+        with _reporting_config_errors("compaction.toml"):
+            params = load_config_file("compaction.toml")
+    else:
+        params = load_config()
+    metrics_conf = _metrics_config(params, metrics, summary)
+    if max_memory is None:
+        max_memory = params.get("max_memory")
+
+    dests = [_output_path_for(path, out_dir) for path in src]
+
+    if verbose:
+        _dump_params(params)
+        for src_, dest in zip(src, dests):
+            out(f"{src_} -> {dest}")
+
+    if dry_run or not src:
+        out("Nothing to do. 😴")
     else:
-        run_compaction("porosity.csv", "porosity-out.csv", **params["constants"])
+        if out_dir is not None:
+            os.makedirs(out_dir, exist_ok=True)
+        start = time.perf_counter()
+        utilization = None
+        with _reporting_memory_errors():
+            if executor == "pipeline":
+                from compaction.pipeline import run_pipeline
+
+                report = run_pipeline(
+                    src,
+                    dests,
+                    readers=readers,
+                    workers=jobs or os.cpu_count() or 1,
+                    writers=writers,
+                    queue_size=queue_size,
+                    lithologies=params.get("lithology"),
+                    max_memory=max_memory,
+                    **params["constants"],
+                )
+                run_metrics, utilization = report.metrics, report.utilization
+            else:
+                run_metrics = run_compaction_batch(
+                    src,
+                    dests,
+                    executor=executor,
+                    workers=jobs,
+                    lithologies=params.get("lithology"),
+                    max_memory=max_memory,
+                    **params["constants"],
+                )
+        seconds = time.perf_counter() - start
+
+        if verbose and utilization is not None:
+            for stage, usage in utilization.items():
+                out(
+                    f"{stage}: {usage['workers']} worker(s),"
+                    f" {usage['utilization']:.0%} utilization"
+                )
+
+        if metrics_conf["enabled"]:
+            if metrics_conf["summary"]:
+                batch_summary = summarize_metrics(run_metrics, seconds=seconds)
+                if utilization is not None:
+                    batch_summary["utilization"] = utilization
+                run_metrics.append(batch_summary)
+            _write_metrics(run_metrics, path=metrics_conf["path"])
 
         out("💥 Finished! 💥")
-        out("Output written to {}".format("porosity-out.csv"))
+        out(f"Output written for {len(dests)} files")
+
+
+def _parse_memory_option(value: str | None) -> int | None:
+    """Parse a memory budget given on the command line."""
+    if value is None:
+        return None
+    try:
+        return parse_memory(value)
+    except ValueError as error:
+        raise click.BadParameter(str(error)) from error
+
+
+@contextlib.contextmanager
+def _reporting_memory_errors() -> Iterator[None]:
+    """Report a memory budget that is too small as a bad parameter."""
+    try:
+        yield
+    except MemoryBudgetError as error:
+        raise click.BadParameter(str(error), param_hint="'--max-memory'") from error
+
+
+@contextlib.contextmanager
+def _reporting_config_errors(path: str) -> Iterator[None]:
+    """Report an invalid config file as a usage error."""
+    try:
+        yield
+    except ValueError as error:
+        raise click.UsageError(f"{path}: {error}") from error
+
+
+def _dump_params(params: dict) -> None:
+    """Print config parameters, as toml, to stderr."""
+    import tomlkit as toml  # type: ignore
+
+    out(toml.dumps(params))
+
+
+def _metrics_config(params: dict, enabled: bool, summary: bool = False) -> dict:
+    """Metrics settings from a config file and command line flags."""
+    conf = params.get("metrics", {"enabled": False, "summary": False})
+    return {
+        "enabled": enabled or conf["enabled"],
+        "summary": summary or conf["summary"],
+        "path": conf.get("path"),
+    }
+
+
+def _output_path_for(src: str, out_dir: str | None = None) -> str:
+    path = pathlib.Path(src)
+    name = f"{path.stem}-out{path.suffix}"
+    return str((pathlib.Path(out_dir) if out_dir else path.parent) / name)
 
 
 @compaction.command()
@@ -0,0 +1,193 @@
+"""A growable stack of sediment layers."""
+from __future__ import annotations
+
+import numpy as np  # type: ignore
+
+from compaction.compaction import compact
+
+
+class SedimentColumn:
+    """Layers of sediment that can be added, eroded and compacted.
+
+    Layer thickness, porosity and (optionally) lithology are kept in
+    arrays that grow by doubling their capacity when they fill up, so
+    adding a layer does not copy the existing layers. Layers are stored
+    top-first, as expected by :func:`~compaction.compaction.compact`,
+    with free space ahead of the top layer. The current layers are
+    therefore always a contiguous block of memory that can be compacted
+    in place. Properties return views of the current layers, not copies.
+
+    Parameters
+    ----------
+    shape : int or tuple of int, optional
+        Shape of each layer, for a set of columns that share layers. By
+        default, a single column.
+    capacity : int, optional
+        Number of layers to allocate space for initially.
+    lithology : bool, optional
+        If ``True``, also track an integer lithology id for each layer.
+
+    Examples
+    --------
+    >>> from compaction import SedimentColumn
+
+    >>> column = SedimentColumn()
+    >>> for _ in range(3):
+    ...     column.add(100.0, porosity=0.5)
+    >>> column.dz
+    array([100., 100., 100.])
+
+    >>> column.compact(porosity_max=0.5)
+    >>> column.porosity.round(6)
+    array([0.5     , 0.480177, 0.461141])
+
+    Erode sediment from the top of the column.
+
+    >>> column.erode(150.0)
+    >>> column.number_of_layers
+    2
+    >>> column.dz.round(6)
+    array([46.186665, 92.788603])
+    """
+
+    def __init__(
+        self,
+        shape: int | tuple[int, ...] = (),
+        capacity: int = 16,
+        lithology: bool = False,
+    ):
+        self._shape = (shape,) if isinstance(shape, int) else tuple(shape)
+
+        capacity = max(capacity, 1)
+        self._top = capacity
+        self._dz = np.empty((capacity,) + self._shape)
+        self._porosity = np.empty((capacity,) + self._shape)
+        self._lithology = (
+            np.empty((capacity,) + self._shape, dtype=int) if lithology else None
+        )
+
+    def __len__(self) -> int:
+        return self.number_of_layers
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        """Shape of each layer."""
+        return self._shape
+
+    @property
+    def number_of_layers(self) -> int:
+        """Number of layers in the column."""
+        return self._dz.shape[0] - self._top
+
+    @property
+    def capacity(self) -> int:
+        """Number of layers that can be stored without reallocating."""
+        return self._dz.shape[0]
+
+    @property
+    def dz(self) -> np.ndarray:
+        """Thickness of each layer, top layer first [m]."""
+        return self._dz[self._top :]
+
+    @property
+    def porosity(self) -> np.ndarray:
+        """Porosity of each layer, top layer first [-]."""
+        return self._porosity[self._top :]
+
+    @property
+    def lithology(self) -> np.ndarray | None:
+        """Lithology id of each layer, top layer first."""
+        if self._lithology is None:
+            return None
+        return self._lithology[self._top :]
+
+    @property
+    def thickness(self) -> np.ndarray:
+        """Total thickness of the column [m]."""
+        return self.dz.sum(axis=0)
+
+    def reserve(self, capacity: int) -> None:
+        """Allocate space for at least some number of layers."""
+        if capacity > self.capacity:
+            n_layers = self.number_of_layers
+            self._dz = _resized(self._dz, capacity, n_layers)
+            self._porosity = _resized(self._porosity, capacity, n_layers)
+            if self._lithology is not None:
+                self._lithology = _resized(self._lithology, capacity, n_layers)
+            self._top = capacity - n_layers
+
+    def add(self, dz, porosity, lithology: int | None = None) -> None:
+        """Add a layer to the top of the column.
+
+        Parameters
+        ----------
+        dz : ndarray or number
+            Thickness of the new layer [m].
+        porosity : ndarray or number
+            Porosity of the new layer [-].
+        lithology : ndarray or int, optional
+            Lithology id of the new layer. Required if lithology is
+            tracked.
+        """
+        if self._lithology is not None and lithology is None:
+            raise ValueError("lithology is required for this column")
+        if self._lithology is None and lithology is not None:
+            raise ValueError("this column does not track lithology")
+
+        if self._top == 0:
+            self.reserve(2 * self.capacity)
+
+        self._top -= 1
+        self._dz[self._top] = dz
+        self._porosity[self._top] = porosity
+        if self._lithology is not None:
+            self._lithology[self._top] = lithology
+
+    def erode(self, thickness) -> None:
+        """Remove sediment from the top of the column.
+
+        Layers that are completely eroded in every column are removed.
+
+        Parameters
+        ----------
+        thickness : ndarray or number
+            Thickness of sediment to remove [m].
+        """
+        remaining = np.array(np.broadcast_to(thickness, self._shape), dtype=float)
+        if np.any(remaining < 0.0):
+            raise ValueError("erosion thickness must be non-negative")
+
+        layer = self._top
+        while layer < self.capacity and np.any(remaining > 0.0):
+            removed = np.minimum(self._dz[layer], remaining)
+            self._dz[layer] -= removed
+            remaining -= removed
+            layer += 1
+
+        while self._top < self.capacity and np.all(self._dz[self._top] <= 0.0):
+            self._top += 1
+
+    def compact(self, **kwds) -> None:
+        """Compact the layers of the column in place.
+
+        Parameters
+        ----------
+        **kwds
+            Compaction parameters passed to
+            :func:`~compaction.compaction.compact`. Parameters given for
+            each layer must be ordered top-first (for example, the result
+            of indexing an array of parameters with *lithology*).
+        """
+        if self.number_of_layers == 0:
+            return
+
+        dz, porosity = self.dz, self.porosity
+        porosity[:] = compact(dz, porosity, return_dz=dz, **kwds)
+
+
+def _resized(array: np.ndarray, capacity: int, n_layers: int) -> np.ndarray:
+    """Copy the layers of an array to the end of a new, larger, array."""
+    resized = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+    if n_layers > 0:
+        resized[-n_layers:] = array[-n_layers:]
+    return resized
@@ -1,21 +1,38 @@
 #! /usr/bin/env python
 from __future__ import annotations
 
+from collections.abc import Sequence
+
 import numpy as np  # type: ignore
 from scipy.constants import g  # type: ignore
 
+from compaction import array_api, planning, profiling
+from compaction.summation import exclusive_cumsum
+
+OUTPUTS = ("bulk_density", "overburden_stress", "depth_to_top", "depth_to_bottom")
+
+# Number of values in each block of layers stacked along an axis other
+# than the first.
+_BLOCK_SIZE = 1 << 16
+
 
 def compact(
     dz: np.ndarray,
-    porosity: np.ndarray,
-    c: float = 5e-8,
-    rho_grain: float = 2650.0,
-    excess_pressure: float = 0.0,
-    porosity_min: float = 0.0,
-    porosity_max: float = 1.0,
-    rho_void: float = 1000.0,
+    porosity: np.ndarray | float,
+    c: np.ndarray | float = 5e-8,
+    rho_grain: np.ndarray | float = 2650.0,
+    excess_pressure: np.ndarray | float = 0.0,
+    porosity_min: np.ndarray | float = 0.0,
+    porosity_max: np.ndarray | float = 1.0,
+    rho_void: np.ndarray | float = 1000.0,
     gravity: float = g,
     return_dz: np.ndarray | None = None,
+    summation: str = "cumsum",
+    lithologies: Sequence[dict[str, float]] | None = None,
+    fractions: Sequence[np.ndarray] | None = None,
+    max_memory: int | str | None = None,
+    axis: int = 0,
+    outputs: dict[str, np.ndarray | None] | None = None,
 ) -> np.ndarray:
     """Compact a column of sediment.
 
@@ -45,34 +62,277 @@ def compact(
         Acceleration due to gravity [m / s^2].
     return_dz : ndarray of float, optional
         If provided, an output array into which to place the calculated
-        compacted layer thicknesses.
+        compacted layer thicknesses. For arrays of other array API
+        libraries, this must be an array that supports item assignment
+        (and so, for example, cannot be a *JAX* array).
+    summation : {"cumsum", "pairwise", "kahan"}, optional
+        How to sum the load of overlying layers. For very deep columns,
+        *pairwise* and *kahan* are more accurate than the default but
+        are slower. See :func:`~compaction.summation.exclusive_cumsum`.
+    lithologies : sequence of dict, optional
+        Compaction parameters (*c*, *porosity_min*, *porosity_max* and
+        *rho_grain*) of each of a set of lithologies. Parameters that are
+        not given take the values passed to this function. Layers are
+        mixtures of these lithologies, in proportions given by
+        *fractions*, with each parameter the fraction-weighted mean of
+        those of the lithologies.
+    fractions : sequence of ndarray, optional
+        Fraction of each layer made up of each lithology, one array for
+        each of *lithologies*. Fractions of a layer should sum to one.
+    max_memory : int or str, optional
+        Memory budget, in bytes or as a string with units (for example,
+        ``"2 GiB"``). If compacting all layers at once would use more
+        than this, layers are compacted in blocks of columns or of
+        layers (see :func:`~compaction.planning.plan`).
+    axis : int, optional
+        Axis along which layers are stacked, with the top layer first.
+        Array-valued parameters broadcast against *dz* as it is laid
+        out. Unless layers are the outermost axis in memory (as they are
+        for the first axis of a C-ordered array), layers are compacted in
+        cache-sized blocks of columns, taken in the order that they are
+        laid out in memory, rather than first being copied so that they
+        are stacked along the first axis.
+    outputs : dict, optional
+        Quantities, derived from the compacted layers, to calculate
+        along with the new porosities, keyed by name (see *Notes*). Each
+        is written into its array, which must have the shape of *dz*,
+        or, if its array is ``None``, into a new array that replaces it.
 
     Returns
     -------
     porosity : ndarray
-        New porosities after compaction.
+        New porosities after compaction, laid out in memory as *dz* is.
+
+    Notes
+    -----
+    If *dz* is an array of a library other than NumPy that supports the
+    Python array API standard, layers are compacted with the functions of
+    that library (see :func:`~compaction.array_api.compacted_layers`) and
+    the new porosities are an array of that library. Only the default
+    *summation* and *axis*, and no *outputs*, are then supported.
+
+    Derived quantities that can be requested with *outputs* are
+    calculated from the intermediate values of the compaction and so
+    need no extra passes over the layers to recalculate them:
+
+    * *bulk_density*: density of each compacted layer, grains and
+      pore fluid [kg / m^3].
+    * *overburden_stress*: effective stress on the top of each layer
+      due to the buoyant weight of the sediment above, less any excess
+      pressure [Pa].
+    * *depth_to_top*, *depth_to_bottom*: depths to the top and bottom
+      of each compacted layer below the top of the column [m].
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from compaction.compaction import compact
+
+    >>> dz = np.full(3, 100.0)
+    >>> sand = {"c": 1e-8, "porosity_max": 0.45}
+    >>> shale = {"c": 5e-8, "porosity_max": 0.65}
+    >>> compact(
+    ...     dz,
+    ...     0.65,
+    ...     lithologies=[sand, shale],
+    ...     fractions=[[1.0, 0.5, 0.0], [0.0, 0.5, 1.0]],
+    ... ).round(6)
+    array([0.45    , 0.540734, 0.614211])
+
+    Layers of a cube of sediment stacked along its last axis.
+
+    >>> compact(np.full((2, 2, 3), 1000.0), 0.5, porosity_max=0.5, axis=-1).round(6)
+    array([[[0.5     , 0.333647, 0.222641],
+            [0.5     , 0.333647, 0.222641]],
+    <BLANKLINE>
+           [[0.5     , 0.333647, 0.222641],
+            [0.5     , 0.333647, 0.222641]]])
+
+    Calculate the depths of the compacted layers at the same time.
+
+    >>> outputs = {"depth_to_top": None, "depth_to_bottom": None}
+    >>> compact(np.full(3, 1000.0), 0.5, porosity_max=0.5, outputs=outputs).round(6)
+    array([0.5     , 0.333647, 0.222641])
+    >>> outputs["depth_to_top"].round(3)
+    array([   0.   , 1000.   , 1750.353])
+    >>> outputs["depth_to_bottom"].round(3)
+    array([1000.   , 1750.353, 2393.556])
     """
+    if not isinstance(dz, np.ndarray) and array_api.is_array_api_obj(dz):
+        if summation != "cumsum" or axis != 0 or outputs:
+            raise ValueError(
+                "summation, axis and outputs are only supported for NumPy arrays"
+                f" (not {type(dz).__name__})"
+            )
+        porosity_new, dz_new = array_api.compacted_layers(
+            dz,
+            porosity,
+            c=c,
+            rho_grain=rho_grain,
+            excess_pressure=excess_pressure,
+            porosity_min=porosity_min,
+            porosity_max=porosity_max,
+            rho_void=rho_void,
+            gravity=gravity,
+            lithologies=lithologies,
+            fractions=fractions,
+        )
+        if return_dz is not None:
+            if return_dz.dtype != dz_new.dtype or return_dz.shape != dz_new.shape:
+                raise TypeError(
+                    f"size and shape of return_dz ({return_dz.dtype}, {return_dz.shape})"
+                    f" must be that of dz ({dz_new.dtype}, {dz_new.shape})"
+                )
+            try:
+                return_dz[...] = dz_new
+            except (TypeError, NotImplementedError) as error:
+                raise TypeError(
+                    "return_dz must be an array that can be written to"
+                    f" ({type(return_dz).__name__} is immutable)"
+                ) from error
+        return porosity_new
+
+    if max_memory is not None and outputs:
+        # New arrays for outputs come out of the memory budget.
+        max_memory = planning.parse_memory(max_memory) - sum(
+            np.dtype(np.float64).itemsize * int(np.prod(np.shape(dz)))
+            for buffer in outputs.values()
+            if buffer is None
+        )
+        if max_memory < 0:
+            raise planning.MemoryBudgetError(
+                f"max_memory is too small to hold the outputs of layers of"
+                f" shape {np.shape(dz)}"
+            )
+    buffers = _output_buffers(outputs, np.shape(dz))
+
+    if np.ndim(dz) > 0:
+        if not -np.ndim(dz) <= axis < np.ndim(dz):
+            raise ValueError(
+                f"axis {axis} is out of bounds for layers of dimension {np.ndim(dz)}"
+            )
+        axis %= np.ndim(dz)
+    if axis != 0 or (np.size(dz) > _BLOCK_SIZE and not _is_outermost(dz, axis)):
+        return _compact_along_axis(
+            dz,
+            porosity,
+            axis,
+            params={
+                "c": c,
+                "rho_grain": rho_grain,
+                "excess_pressure": excess_pressure,
+                "porosity_min": porosity_min,
+                "porosity_max": porosity_max,
+                "rho_void": rho_void,
+            },
+            gravity=gravity,
+            return_dz=return_dz,
+            summation=summation,
+            lithologies=lithologies,
+            fractions=fractions,
+            max_memory=max_memory,
+            outputs=buffers,
+        )
+
+    if max_memory is not None:
+        memory_plan = planning.plan(
+            np.shape(dz),
+            max_memory,
+            dtype=getattr(dz, "dtype", float),
+            return_dz=return_dz is not None,
+            lithologies=lithologies is not None,
+            outputs=tuple(buffers),
+        )
+        if memory_plan.strategy != "whole":
+            return _compact_in_blocks(
+                memory_plan,
+                dz,
+                porosity,
+                params={
+                    "c": c,
+                    "rho_grain": rho_grain,
+                    "excess_pressure": excess_pressure,
+                    "porosity_min": porosity_min,
+                    "porosity_max": porosity_max,
+                    "rho_void": rho_void,
+                },
+                gravity=gravity,
+                return_dz=return_dz,
+                summation=summation,
+                lithologies=lithologies,
+                fractions=fractions,
+                outputs=buffers,
+            )
+
     dz, porosity = np.asarray(dz, dtype=float), np.asarray(porosity, dtype=float)
+    timer = profiling.start(dz.shape)
 
-    load = (rho_grain - rho_void) * dz * (1.0 - porosity) * gravity
-    overlying_load = np.cumsum(load, axis=0) - load - excess_pressure
+    if lithologies is None:
+        load = (rho_grain - rho_void) * dz * (1.0 - porosity) * gravity
+    else:
+        # Parameters of the lithologies are weighted by their fractions
+        # within each expression, rather than mixed into arrays of their
+        # own, with a single scratch array for the weighted terms.
+        values, layer_fractions = _lithologies_of(
+            lithologies,
+            fractions,
+            c=c,
+            rho_grain=rho_grain,
+            porosity_min=porosity_min,
+            porosity_max=porosity_max,
+        )
+        scratch = np.empty(
+            np.broadcast_shapes(
+                dz.shape, porosity.shape, *(f.shape for f in layer_fractions)
+            )
+        )
+        load = _weighted_sum(
+            layer_fractions, values[:, 1], out=np.empty_like(scratch), scratch=scratch
+        )
+        load -= rho_void
+        load *= dz
+        load *= np.subtract(1.0, porosity, out=scratch)
+        load *= gravity
+    if timer is not None:
+        timer("load", nbytes=load.nbytes)
 
-    porosity_new = porosity_min + (porosity_max - porosity_min) * np.exp(
-        -c * overlying_load
+    overlying_load = exclusive_cumsum(
+        load, method=summation, out=buffers.get("overburden_stress")
     )
+    overlying_load -= excess_pressure
+    if timer is not None:
+        timer("cumsum", nbytes=overlying_load.nbytes)
+
+    if lithologies is None:
+        porosity_new = porosity_min + (porosity_max - porosity_min) * np.exp(
+            -c * overlying_load
+        )
+    else:
+        # The load is no longer needed and so holds the exponential term.
+        decay = _weighted_sum(layer_fractions, values[:, 0], out=load, scratch=scratch)
+        np.negative(decay, out=decay)
+        decay *= overlying_load
+        np.exp(decay, out=decay)
+        del load, overlying_load
+
+        porosity_new = _weighted_sum(
+            layer_fractions, values[:, 3], out=np.empty_like(decay), scratch=scratch
+        )
+        porosity_new *= decay
+        porosity_new += _weighted_sum(
+            layer_fractions, values[:, 2], out=decay, scratch=scratch
+        )
+        del decay, scratch
 
     np.minimum(porosity_new, porosity, out=porosity_new)
+    if timer is not None:
+        timer("exp", nbytes=porosity_new.nbytes)
 
     if return_dz is not None:
         if return_dz.dtype is dz.dtype and return_dz.shape == dz.shape:
-            contains_sediment = porosity_new < 1.0
-            np.divide(
-                dz * (1.0 - porosity),
-                1.0 - porosity_new,
-                where=contains_sediment,
-                out=return_dz,
-            )
-            return_dz[~contains_sediment] = 0.0
+            _compacted_dz(dz, porosity, porosity_new, out=return_dz)
+            if timer is not None:
+                timer("dz", nbytes=return_dz.nbytes)
         else:
             raise TypeError(
                 "size and shape of return_dz ({}, {}) must be that of dz ({}, {})".format(
@@ -80,4 +340,537 @@ def compact(
                 )
             )
 
+    if "bulk_density" in buffers:
+        bulk_density = buffers["bulk_density"]
+        if lithologies is None:
+            np.multiply(porosity_new, rho_void - rho_grain, out=bulk_density)
+            bulk_density += rho_grain
+        else:
+            _weighted_sum(layer_fractions, values[:, 1], out=bulk_density)
+            bulk_density += porosity_new * (rho_void - bulk_density)
+    if "depth_to_top" in buffers or "depth_to_bottom" in buffers:
+        _layer_depths(
+            dz,
+            porosity,
+            porosity_new,
+            return_dz,
+            top=buffers.get("depth_to_top"),
+            bottom=buffers.get("depth_to_bottom"),
+            summation=summation,
+        )
+    if timer is not None and buffers:
+        timer("outputs")
+
+    return porosity_new
+
+
+def compacted_thickness(
+    dz: np.ndarray,
+    porosity: np.ndarray | float,
+    c: np.ndarray | float = 5e-8,
+    rho_grain: np.ndarray | float = 2650.0,
+    excess_pressure: np.ndarray | float = 0.0,
+    porosity_min: np.ndarray | float = 0.0,
+    porosity_max: np.ndarray | float = 1.0,
+    rho_void: np.ndarray | float = 1000.0,
+    gravity: float = g,
+    block_size: int | None = None,
+    summation: str = "cumsum",
+    lithologies: Sequence[dict[str, float]] | None = None,
+    fractions: Sequence[np.ndarray] | None = None,
+) -> np.ndarray:
+    """Calculate the total thickness of sediment columns after compaction.
+
+    Layers are compacted in blocks, from the top of the column downward,
+    carrying the overlying load from one block to the next. Only the
+    column totals are kept so the compacted porosity and thickness of
+    each layer are never stored in full.
+
+    Parameters
+    ----------
+    dz : ndarray of float
+        Array of sediment thicknesses with depth (the first element is
+        the top of the sediment column) [meters].
+    porosity : ndarray or number
+        Sediment porosity [-].
+    c : ndarray or number, optional
+        Compaction coefficient that describes how easily the sediment is to
+        compact [Pa^-1].
+    rho_grain : ndarray or number, optional
+        Grain density of the sediment [kg / m^3].
+    excess_pressure : ndarray or number, optional
+        Excess pressure with depth [Pa].
+    porosity_min : ndarray or number, optional
+        Minimum porosity that can be achieved by the sediment. This is the
+        porosity of the sediment in its closest-compacted state [-].
+    porosity_max : ndarray or number, optional
+        Maximum porosity of the sediment. This is the porosity of the sediment
+        without any compaction [-].
+    rho_void : ndarray or number, optional
+        Density of the interstitial fluid [kg / m^3].
+    gravity : float, optional
+        Acceleration due to gravity [m / s^2].
+    block_size : int, optional
+        Number of layers to compact at a time. The default is chosen so
+        that a block holds about 64k values.
+    summation : {"cumsum", "pairwise", "kahan"}, optional
+        How to sum the load of overlying layers. With *pairwise* or
+        *kahan*, the load carried from one block to the next is also
+        summed with compensated summation.
+    lithologies : sequence of dict, optional
+        Compaction parameters of each of a set of lithologies. See
+        :func:`compact`.
+    fractions : sequence of ndarray, optional
+        Fraction of each layer made up of each lithology.
+
+    Returns
+    -------
+    thickness : ndarray
+        Total thickness of each column after compaction.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from compaction.compaction import compact, compacted_thickness
+
+    >>> dz = np.full((100, 3), 1.0)
+    >>> porosity = np.full((100, 3), 0.5)
+    >>> compacted_thickness(dz, porosity, porosity_max=0.5).round(6)
+    array([98.074843, 98.074843, 98.074843])
+
+    >>> dz_new = np.empty_like(dz)
+    >>> _ = compact(dz, porosity, porosity_max=0.5, return_dz=dz_new)
+    >>> dz_new.sum(axis=0).round(6)
+    array([98.074843, 98.074843, 98.074843])
+    """
+    dz, porosity = np.broadcast_arrays(
+        np.asarray(dz, dtype=float), np.asarray(porosity, dtype=float)
+    )
+    params = {
+        "c": c,
+        "rho_grain": rho_grain,
+        "excess_pressure": excess_pressure,
+        "porosity_min": porosity_min,
+        "porosity_max": porosity_max,
+        "rho_void": rho_void,
+    }
+
+    n_layers = dz.shape[0] if dz.ndim > 0 else 1
+    if block_size is None:
+        block_size = max(1, 65536 // max(1, dz.size // max(1, n_layers)))
+
+    thickness = np.zeros(dz.shape[1:])
+    overlying_load = np.zeros(dz.shape[1:])
+    compensation = np.zeros(dz.shape[1:])
+    for start in range(0, n_layers, block_size):
+        stop = min(start + block_size, n_layers)
+        block = {
+            name: _layers_of(value, dz.ndim, start, stop)
+            for name, value in params.items()
+        }
+        if lithologies is None:
+            porosity_range = block["porosity_max"] - block["porosity_min"]
+        else:
+            (
+                block["c"],
+                block["rho_grain"],
+                block["porosity_min"],
+                porosity_range,
+            ) = _mix_lithologies(
+                lithologies,
+                (
+                    None
+                    if fractions is None
+                    else [_layers_of(f, dz.ndim, start, stop) for f in fractions]
+                ),
+                c=block["c"],
+                rho_grain=block["rho_grain"],
+                porosity_min=block["porosity_min"],
+                porosity_max=block["porosity_max"],
+            )
+
+        dz_solid = dz[start:stop] * (1.0 - porosity[start:stop])
+        load = (block["rho_grain"] - block["rho_void"]) * dz_solid * gravity
+
+        porosity_new = exclusive_cumsum(load, method=summation)
+        porosity_new += overlying_load - block["excess_pressure"]
+        porosity_new *= -block["c"]
+        np.exp(porosity_new, out=porosity_new)
+        porosity_new *= porosity_range
+        porosity_new += block["porosity_min"]
+        np.minimum(porosity_new, porosity[start:stop], out=porosity_new)
+
+        contains_sediment = porosity_new < 1.0
+        np.subtract(1.0, porosity_new, out=porosity_new)
+        np.divide(dz_solid, porosity_new, where=contains_sediment, out=dz_solid)
+        dz_solid[~contains_sediment] = 0.0
+
+        thickness += dz_solid.sum(axis=0)
+        if summation == "cumsum":
+            overlying_load += load.sum(axis=0)
+        else:
+            value = load.sum(axis=0) - compensation
+            total = overlying_load + value
+            compensation = (total - overlying_load) - value
+            overlying_load = total
+
+    return thickness
+
+
+def _compact_in_blocks(
+    memory_plan: planning.Plan,
+    dz,
+    porosity,
+    params: dict,
+    gravity: float,
+    return_dz: np.ndarray | None,
+    summation: str,
+    lithologies: Sequence[dict[str, float]] | None,
+    fractions: Sequence[np.ndarray] | None,
+    outputs: dict[str, np.ndarray],
+) -> np.ndarray:
+    """Compact blocks of columns, or of layers, as chosen by a memory plan."""
+    dz = np.asarray(dz)
+    porosity = np.broadcast_to(porosity, dz.shape)
+    if return_dz is not None and (
+        return_dz.dtype != np.float64 or return_dz.shape != dz.shape
+    ):
+        raise TypeError(
+            f"size and shape of return_dz ({return_dz.dtype}, {return_dz.shape})"
+            f" must be that of dz ({np.dtype(float)}, {dz.shape})"
+        )
+
+    porosity_new = np.empty(dz.shape)
+    overlying_load = np.zeros(dz.shape[1:])
+    compensation = np.zeros(dz.shape[1:])
+    depth_above = np.zeros(dz.shape[1:])
+
+    index: tuple
+    n = dz.shape[-1] if memory_plan.strategy == "columns" else dz.shape[0]
+    for start in range(0, n, memory_plan.block_size):
+        stop = min(start + memory_plan.block_size, n)
+        if memory_plan.strategy == "columns":
+            index = (Ellipsis, slice(start, stop))
+            block = {
+                name: _columns_of(value, start, stop) for name, value in params.items()
+            }
+            block_fractions = (
+                None
+                if fractions is None
+                else [_columns_of(f, start, stop) for f in fractions]
+            )
+        else:
+            index = (slice(start, stop),)
+            block = {
+                name: _layers_of(value, dz.ndim, start, stop)
+                for name, value in params.items()
+            }
+            block_fractions = (
+                None
+                if fractions is None
+                else [_layers_of(f, dz.ndim, start, stop) for f in fractions]
+            )
+            block["excess_pressure"] = block["excess_pressure"] - overlying_load
+
+        dz_block = np.asarray(dz[index], dtype=float)
+        if memory_plan.strategy == "layers":
+            # The load of the block, which is carried to the next, is taken
+            # before compaction as return_dz may be dz itself.
+            rho_grain = block["rho_grain"]
+            if lithologies is not None:
+                values, layer_fractions = _lithologies_of(
+                    lithologies,
+                    block_fractions,
+                    c=block["c"],
+                    rho_grain=rho_grain,
+                    porosity_min=block["porosity_min"],
+                    porosity_max=block["porosity_max"],
+                )
+                rho_grain = _weighted_sum(
+                    layer_fractions, values[:, 1], out=np.empty(dz_block.shape)
+                )
+            load = (
+                (rho_grain - block["rho_void"])
+                * dz_block
+                * (1.0 - porosity[index])
+                * gravity
+            ).sum(axis=0)
+            # Mixed grain densities are not held while the block is compacted.
+            del rho_grain
+
+        block_outputs = {name: buffer[index] for name, buffer in outputs.items()}
+        if memory_plan.strategy == "layers" and "depth_to_top" in outputs:
+            # The depth of the bottom of the block is carried to the next.
+            block_outputs.setdefault("depth_to_bottom", np.empty(dz_block.shape))
+        porosity_new[index] = compact(
+            dz_block,
+            porosity[index],
+            gravity=gravity,
+            return_dz=None if return_dz is None else return_dz[index],
+            summation=summation,
+            lithologies=lithologies,
+            fractions=block_fractions,
+            outputs=dict(block_outputs),
+            **block,
+        )
+
+        if memory_plan.strategy == "layers":
+            if "depth_to_bottom" in block_outputs:
+                for name in ("depth_to_top", "depth_to_bottom"):
+                    if name in block_outputs:
+                        block_outputs[name] += depth_above
+                depth_above = block_outputs["depth_to_bottom"][-1].copy()
+
+            if summation == "cumsum":
+                overlying_load += load
+            else:
+                load -= compensation
+                total = overlying_load + load
+                compensation = (total - overlying_load) - load
+                overlying_load = total
+
+    return porosity_new
+
+
+def _compact_along_axis(
+    dz,
+    porosity,
+    axis: int,
+    params: dict,
+    gravity: float,
+    return_dz: np.ndarray | None,
+    summation: str,
+    lithologies: Sequence[dict[str, float]] | None,
+    fractions: Sequence[np.ndarray] | None,
+    max_memory: int | str | None,
+    outputs: dict[str, np.ndarray],
+) -> np.ndarray:
+    """Compact layers stacked along an axis other than the first.
+
+    Arrays are viewed with the layer axis first, followed by the other
+    axes in the order that they are laid out in memory. Blocks of these
+    views, each of about ``_BLOCK_SIZE`` values, are then compacted one
+    after another so that temporary arrays stay in cache.
+    """
+    dz = np.asarray(dz)
+    if return_dz is not None and (
+        return_dz.dtype != np.float64 or return_dz.shape != dz.shape
+    ):
+        raise TypeError(
+            f"size and shape of return_dz ({return_dz.dtype}, {return_dz.shape})"
+            f" must be that of dz ({np.dtype(float)}, {dz.shape})"
+        )
+
+    porosity_new = np.empty_like(dz, dtype=float)
+
+    order = [axis] + sorted(
+        (i for i in range(dz.ndim) if i != axis), key=lambda i: -abs(dz.strides[i])
+    )
+
+    def stacked(value):
+        if np.ndim(value) == 0:
+            return value
+        return np.broadcast_to(value, dz.shape).transpose(order)
+
+    view = stacked(dz)
+    porosity = stacked(np.asarray(porosity))
+    params = {name: stacked(value) for name, value in params.items()}
+    if fractions is not None:
+        fractions = [stacked(np.asarray(f)) for f in fractions]
+    porosity_view = porosity_new.transpose(order)
+    dz_view = None if return_dz is None else return_dz.transpose(order)
+    outputs = {name: buffer.transpose(order) for name, buffer in outputs.items()}
+
+    # Block along the outermost axis whose inner axes fit within a block.
+    block_axis, inner = view.ndim - 1, view.shape[0]
+    while block_axis > 0 and inner * view.shape[block_axis] <= _BLOCK_SIZE:
+        inner *= view.shape[block_axis]
+        block_axis -= 1
+    if block_axis == 0:
+        blocks = [(Ellipsis,)]
+        block_size = view.size
+    else:
+        step = max(1, _BLOCK_SIZE // inner)
+        blocks = [
+            (slice(None),) + index + (slice(start, start + step),)
+            for index in np.ndindex(view.shape[1:block_axis])
+            for start in range(0, view.shape[block_axis], step)
+        ]
+        block_size = inner * min(step, view.shape[block_axis])
+
+    if max_memory is not None:
+        # Each block is compacted within what is left once the new
+        # porosities are allocated.
+        max_memory = planning.parse_memory(max_memory) - porosity_new.nbytes
+        if max_memory < 0:
+            raise planning.MemoryBudgetError(
+                f"max_memory is too small to hold the porosities of layers of"
+                f" shape {dz.shape}"
+            )
+        planning.plan(
+            (view.shape[0], block_size // max(1, view.shape[0])),
+            max_memory,
+            dtype=dz.dtype,
+            return_dz=return_dz is not None,
+            lithologies=lithologies is not None,
+            outputs=tuple(outputs),
+        )
+
+    for block in blocks:
+        porosity_view[block] = compact(
+            view[block],
+            _block_of(porosity, block),
+            gravity=gravity,
+            return_dz=None if dz_view is None else dz_view[block],
+            summation=summation,
+            lithologies=lithologies,
+            fractions=None if fractions is None else [f[block] for f in fractions],
+            max_memory=max_memory,
+            outputs={name: buffer[block] for name, buffer in outputs.items()},
+            **{name: _block_of(value, block) for name, value in params.items()},
+        )
+
     return porosity_new
+
+
+def _output_buffers(
+    outputs: dict[str, np.ndarray | None] | None, shape: tuple[int, ...]
+) -> dict[str, np.ndarray]:
+    """Check the arrays of derived outputs, allocating any that are missing."""
+    if outputs is None:
+        return {}
+
+    unknown = set(outputs) - set(OUTPUTS)
+    if unknown:
+        raise ValueError(
+            f"{', '.join(sorted(unknown))}: unknown outputs"
+            f" (not one of {', '.join(OUTPUTS)})"
+        )
+
+    buffers = {}
+    for name, buffer in outputs.items():
+        if buffer is None:
+            buffer = outputs[name] = np.empty(shape)
+        elif buffer.dtype != np.float64 or buffer.shape != shape:
+            raise TypeError(
+                f"size and shape of {name} ({buffer.dtype}, {buffer.shape})"
+                f" must be that of dz ({np.dtype(float)}, {shape})"
+            )
+        buffers[name] = buffer
+    return buffers
+
+
+def _compacted_dz(dz, porosity, porosity_new, out):
+    """Thickness of layers after compaction, conserving their solids."""
+    contains_sediment = porosity_new < 1.0
+    np.divide(
+        dz * (1.0 - porosity),
+        1.0 - porosity_new,
+        where=contains_sediment,
+        out=out,
+    )
+    out[~contains_sediment] = 0.0
+    return out
+
+
+def _layer_depths(dz, porosity, porosity_new, dz_new, top, bottom, summation):
+    """Depths to the top and bottom of each compacted layer.
+
+    If not given, thicknesses of the compacted layers are calculated
+    into the array for the depths to their bottoms.
+    """
+    if dz_new is None:
+        dz_new = _compacted_dz(
+            dz,
+            porosity,
+            porosity_new,
+            out=np.empty(dz.shape) if bottom is None else bottom,
+        )
+    top = exclusive_cumsum(dz_new, method=summation, out=top)
+    if bottom is not None:
+        np.add(top, dz_new, out=bottom)
+
+
+def _lithologies_of(
+    lithologies, fractions, **defaults
+) -> tuple[np.ndarray, list[np.ndarray]]:
+    """Parameters and fractions of a set of lithologies.
+
+    Returns the parameters of the lithologies, one row for each, with
+    columns of the compaction coefficient, grain density, minimum
+    porosity, and range of porosity (maximum minus minimum), along with
+    the fractions of each as arrays of float.
+    """
+    if fractions is None or len(fractions) != len(lithologies):
+        raise ValueError("fractions must be given for each lithology")
+
+    values = np.array(
+        [
+            [
+                params.get("c", defaults["c"]),
+                params.get("rho_grain", defaults["rho_grain"]),
+                params.get("porosity_min", defaults["porosity_min"]),
+                params.get("porosity_max", defaults["porosity_max"])
+                - params.get("porosity_min", defaults["porosity_min"]),
+            ]
+            for params in lithologies
+        ],
+        dtype=float,
+    )
+    if values.ndim != 2:
+        raise ValueError("parameters of lithologies must be numbers")
+
+    return values, [np.asarray(fraction, dtype=float) for fraction in fractions]
+
+
+def _weighted_sum(fractions, values, out, scratch=None):
+    """Sum of values weighted by fractions, written into *out*."""
+    np.multiply(fractions[0], values[0], out=out)
+    for fraction, value in zip(fractions[1:], values[1:]):
+        out += np.multiply(fraction, value, out=scratch)
+    return out
+
+
+def _mix_lithologies(lithologies, fractions, **defaults):
+    """Mix the parameters of lithologies by the fraction of each.
+
+    Returns the mixed compaction coefficient, grain density, minimum
+    porosity, and range of porosity (maximum minus minimum), each an
+    array the size of the fractions.
+    """
+    values, fractions = _lithologies_of(lithologies, fractions, **defaults)
+
+    shape = np.broadcast_shapes(*(fraction.shape for fraction in fractions))
+    scratch = np.empty(shape)
+    return tuple(
+        _weighted_sum(fractions, column, out=np.empty(shape), scratch=scratch)
+        for column in values.T
+    )
+
+
+def _is_outermost(value, axis: int) -> bool:
+    """Check if an axis of an array is the outermost in memory."""
+    if not isinstance(value, np.ndarray) or value.ndim < 2 or value.size == 0:
+        return True
+    return abs(value.strides[axis]) >= max(
+        abs(stride) for stride, dim in zip(value.strides, value.shape) if dim > 1
+    )
+
+
+def _block_of(value, block: tuple):
+    """Select a block from a parameter that may be a number."""
+    return value if np.ndim(value) == 0 else value[block]
+
+
+def _columns_of(value, start: int, stop: int):
+    """Select a block of columns (along the last axis) from a parameter."""
+    if np.ndim(value) > 0 and np.shape(value)[-1] > 1:
+        return value[..., start:stop]
+    return value
+
+
+def _layers_of(value, ndim: int, start: int, stop: int):
+    """Select a block of layers from a parameter that may be broadcast."""
+    if np.ndim(value) == ndim and np.shape(value)[0] > 1:
+        return value[start:stop]
+    return value
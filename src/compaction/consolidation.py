@@ -0,0 +1,155 @@
+"""Dissipate excess pore pressure within columns of sediment."""
+from __future__ import annotations
+
+import numpy as np  # type: ignore
+from scipy.constants import g  # type: ignore
+from scipy.linalg import solve_banded  # type: ignore
+
+_MIN_THICKNESS = 1e-6
+
+
+def overlying_load(
+    dz: np.ndarray,
+    porosity: np.ndarray,
+    rho_grain: float = 2650.0,
+    rho_void: float = 1000.0,
+    gravity: float = g,
+) -> np.ndarray:
+    """Calculate the load of sediment overlying each layer.
+
+    Parameters
+    ----------
+    dz : ndarray of float
+        Array of sediment thicknesses with depth (the first element is
+        the top of the sediment column) [meters].
+    porosity : ndarray or number
+        Sediment porosity [-].
+    rho_grain : ndarray or number, optional
+        Grain density of the sediment [kg / m^3].
+    rho_void : ndarray or number, optional
+        Density of the interstitial fluid [kg / m^3].
+    gravity : float, optional
+        Acceleration due to gravity [m / s^2].
+
+    Returns
+    -------
+    ndarray
+        Load overlying the top of each layer [Pa].
+
+    Examples
+    --------
+    >>> from compaction.consolidation import overlying_load
+    >>> overlying_load([1.0, 1.0, 1.0], 0.5, gravity=10.0)
+    array([   0., 8250., 16500.])
+    """
+    dz, porosity = np.asarray(dz, dtype=float), np.asarray(porosity, dtype=float)
+
+    load = (rho_grain - rho_void) * dz * (1.0 - porosity) * gravity
+    return np.cumsum(load, axis=0) - load
+
+
+def diffuse_excess_pressure(
+    excess_pressure: np.ndarray,
+    dz: np.ndarray,
+    dt: float,
+    diffusivity: np.ndarray | float,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """Dissipate excess pore pressure over a time step.
+
+    Solve the one-dimensional (Terzaghi) consolidation equation within
+    each column with an implicit (backward Euler) time step. Pressures
+    are located at the middle of each layer. The top of each column is
+    drained (the excess pressure is zero) and the base is impermeable.
+
+    The tridiagonal systems of all columns are assembled with array
+    operations and solved together as a single banded system.
+
+    Parameters
+    ----------
+    excess_pressure : ndarray of float
+        Excess pore pressure of each layer with depth (the first element
+        is the top of the sediment column) [Pa].
+    dz : ndarray of float
+        Array of sediment thicknesses with depth [meters].
+    dt : float
+        Time step [s].
+    diffusivity : ndarray or number
+        Coefficient of consolidation (the hydraulic diffusivity of the
+        sediment) [m^2 / s]. Either a single value or one value for each
+        column (an array that broadcasts to the shape of a layer).
+    out : ndarray of float, optional
+        If provided, an output array into which to place the new
+        excess pressures.
+
+    Returns
+    -------
+    ndarray
+        Excess pore pressures at the end of the time step [Pa].
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from compaction.consolidation import diffuse_excess_pressure
+
+    >>> pressure = np.full((4, 2), 100.0)
+    >>> dz = np.full((4, 2), 1.0)
+    >>> diffuse_excess_pressure(pressure, dz, 1.0, [0.0, 0.1]).round(2)
+    array([[100.  ,  84.52],
+           [100.  ,  98.7 ],
+           [100.  ,  99.89],
+           [100.  ,  99.99]])
+    """
+    excess_pressure = np.asarray(excess_pressure, dtype=float)
+    dz = np.maximum(
+        np.broadcast_to(np.asarray(dz, dtype=float), excess_pressure.shape),
+        _MIN_THICKNESS,
+    )
+    if excess_pressure.size == 0:
+        return excess_pressure.copy() if out is None else out
+
+    distance = np.empty_like(dz)
+    distance[0] = 0.5 * dz[0]
+    distance[1:] = 0.5 * (dz[:-1] + dz[1:])
+
+    coefficient = np.asarray(diffusivity, dtype=float)
+    try:
+        coefficient = np.broadcast_to(coefficient, dz.shape[1:])
+    except ValueError:
+        raise ValueError(
+            f"diffusivity must be a number or have one value for each column"
+            f" (shape {coefficient.shape} does not broadcast to {dz.shape[1:]})"
+        ) from None
+    rate = dt * coefficient
+
+    upper = np.zeros_like(dz)
+    upper[:-1] = rate / (dz[:-1] * distance[1:])
+    lower = np.zeros_like(dz)
+    lower[1:] = rate / (dz[1:] * distance[1:])
+    diagonal = 1.0 + upper + lower
+    diagonal[0] += rate / (dz[0] * distance[0])
+
+    banded = np.zeros((3, excess_pressure.size))
+    banded[0, 1:] = -_by_column(upper)[:-1]
+    banded[1] = _by_column(diagonal)
+    banded[2, :-1] = -_by_column(lower)[1:]
+
+    solution = solve_banded(
+        (1, 1),
+        banded,
+        _by_column(excess_pressure),
+        overwrite_ab=True,
+        overwrite_b=False,
+        check_finite=False,
+    )
+    solution = solution.reshape(excess_pressure.shape[::-1]).T
+
+    if out is not None:
+        out[...] = solution
+        return out
+    return solution
+
+
+def _by_column(array: np.ndarray) -> np.ndarray:
+    """Flatten an array so that the layers of each column are contiguous."""
+    return np.ravel(array, order="F")
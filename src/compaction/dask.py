@@ -0,0 +1,139 @@
+"""Compact chunked layers of sediment with dask."""
+from __future__ import annotations
+
+import dask.array as da  # type: ignore
+import numpy as np  # type: ignore
+from scipy.constants import g  # type: ignore
+
+from compaction.compaction import compact as _compact
+
+
+def compact(
+    dz,
+    porosity,
+    c=5e-8,
+    rho_grain=2650.0,
+    excess_pressure=0.0,
+    porosity_min=0.0,
+    porosity_max=1.0,
+    rho_void=1000.0,
+    gravity: float = g,
+    return_dz: bool = False,
+):
+    """Compact columns of sediment stored as chunked arrays.
+
+    Columns are independent of one another so the compaction is mapped
+    over chunks of columns. The layer axis (the first axis) is merged into
+    a single chunk so that the overlying load of each layer is calculated
+    within a chunk.
+
+    Parameters
+    ----------
+    dz : dask.array.Array or array_like
+        Array of sediment thicknesses with depth (the first element is
+        the top of the sediment column) [meters].
+    porosity : dask.array.Array or array_like
+        Sediment porosity [-].
+    c : array_like or number, optional
+        Compaction coefficient that describes how easily the sediment is to
+        compact [Pa^-1].
+    rho_grain : array_like or number, optional
+        Grain density of the sediment [kg / m^3].
+    excess_pressure : array_like or number, optional
+        Excess pressure with depth [Pa].
+    porosity_min : array_like or number, optional
+        Minimum porosity that can be achieved by the sediment. This is the
+        porosity of the sediment in its closest-compacted state [-].
+    porosity_max : array_like or number, optional
+        Maximum porosity of the sediment. This is the porosity of the sediment
+        without any compaction [-].
+    rho_void : array_like or number, optional
+        Density of the interstitial fluid [kg / m^3].
+    gravity : float, optional
+        Acceleration due to gravity [m / s^2].
+    return_dz : bool, optional
+        If ``True``, also return the compacted layer thicknesses.
+
+    Returns
+    -------
+    porosity : dask.array.Array
+        New porosities after compaction.
+    dz : dask.array.Array, optional
+        New layer thicknesses after compaction. Only returned if
+        *return_dz* is ``True``.
+
+    Examples
+    --------
+    >>> import dask.array as da
+    >>> from compaction.dask import compact
+
+    >>> dz = da.full((100, 10), 1.0, chunks=(10, 5))
+    >>> porosity = da.full((100, 10), 0.5, chunks=(10, 5))
+    >>> porosity_new = compact(dz, porosity, porosity_max=0.5)
+    >>> porosity_new.chunks
+    ((100,), (5, 5))
+    >>> bool((porosity_new[1:] < 0.5).all().compute())
+    True
+    """
+    dz, porosity = da.broadcast_arrays(
+        da.asarray(dz, dtype=float), da.asarray(porosity, dtype=float)
+    )
+    dz = dz.rechunk({0: -1})
+    porosity = porosity.rechunk(dz.chunks)
+
+    params = {
+        "c": c,
+        "rho_grain": rho_grain,
+        "excess_pressure": excess_pressure,
+        "porosity_min": porosity_min,
+        "porosity_max": porosity_max,
+        "rho_void": rho_void,
+        "gravity": gravity,
+    }
+    array_params = {
+        name: da.broadcast_to(da.asarray(value, dtype=float), dz.shape).rechunk(
+            dz.chunks
+        )
+        for name, value in params.items()
+        if np.ndim(value) > 0
+    }
+    for name in array_params:
+        params.pop(name)
+
+    if return_dz:
+        result = da.map_blocks(
+            _compact_block,
+            dz,
+            porosity,
+            *array_params.values(),
+            names=tuple(array_params),
+            return_dz=True,
+            new_axis=0,
+            chunks=((2,),) + dz.chunks,
+            dtype=float,
+            meta=np.array((), dtype=float),
+            **params,
+        )
+        return result[0], result[1]
+    else:
+        return da.map_blocks(
+            _compact_block,
+            dz,
+            porosity,
+            *array_params.values(),
+            names=tuple(array_params),
+            dtype=float,
+            meta=np.array((), dtype=float),
+            **params,
+        )
+
+
+def _compact_block(dz, porosity, *args, names=(), return_dz=False, **kwds):
+    """Compact a single block of columns."""
+    kwds.update(zip(names, args))
+    if return_dz:
+        dz_new = np.empty(dz.shape, dtype=float)
+        porosity_new = _compact(dz, porosity, return_dz=dz_new, **kwds)
+        return np.stack((porosity_new, dz_new))
+    else:
+        return _compact(dz, porosity, **kwds)
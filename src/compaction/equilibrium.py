@@ -0,0 +1,153 @@
+"""Columns of sediment that are already compacted to equilibrium."""
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np  # type: ignore
+from scipy.constants import g  # type: ignore
+
+from compaction.compaction import _mix_lithologies
+
+
+def equilibrium_column(
+    total_thickness,
+    layers: int,
+    c=5e-8,
+    rho_grain=2650.0,
+    porosity_min=0.0,
+    porosity_max=1.0,
+    rho_void=1000.0,
+    gravity: float = g,
+    lithologies: Sequence[dict[str, float]] | None = None,
+    fractions: Sequence[np.ndarray] | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Layers of sediment compacted to equilibrium under their own load.
+
+    The column is divided into layers of equal (compacted) thickness.
+    With depth, *z*, the load, *s*, of the sediment above satisfies
+    ``ds/dz = k (1 - phi(s))``, where ``k = (rho_grain - rho_void) g``
+    and ``phi(s) = phi_min + (phi_max - phi_min) exp(-c s)``, which has
+    the solution::
+
+        c s(z) = x + log(1 - b (1 - exp(-x)) / a)
+
+    where ``a = 1 - phi_min``, ``b = phi_max - phi_min`` and
+    ``x = a c k z``. The porosity of each layer is its mean porosity,
+    that is, one minus the thickness of solids between its top and
+    bottom, ``(s(bottom) - s(top)) / k``, divided by its thickness.
+
+    If compaction parameters are the same for every layer, layers are
+    calculated all at once from this closed form. If they vary from
+    layer to layer, the solution is instead stepped from each layer to
+    the one below, starting from the load at the layer's top.
+
+    Because the load on each layer is that of the solids above it, the
+    column is a steady state of :func:`~compaction.compaction.compact`,
+    which leaves its porosities and thicknesses unchanged.
+
+    Parameters
+    ----------
+    total_thickness : ndarray or number
+        Thickness of each column after compaction [m].
+    layers : int
+        Number of layers in each column.
+    c, rho_grain, porosity_min, porosity_max, rho_void : ndarray or number, optional
+        Compaction parameters (see :func:`~compaction.compaction.compact`).
+        Arrays with one more dimension than *total_thickness* give values
+        for each layer, top layer first.
+    gravity : float, optional
+        Acceleration due to gravity [m / s^2].
+    lithologies : sequence of dict, optional
+        Compaction parameters of each of a set of lithologies.
+    fractions : sequence of ndarray, optional
+        Fraction of each layer made up of each lithology.
+
+    Returns
+    -------
+    tuple of ndarray
+        Thickness and porosity of each layer, top layer first.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from compaction.compaction import compact
+    >>> from compaction.equilibrium import equilibrium_column
+
+    >>> dz, porosity = equilibrium_column(3000.0, 3, porosity_max=0.6)
+    >>> dz
+    array([1000., 1000., 1000.])
+    >>> porosity.round(6)
+    array([0.500232, 0.310496, 0.168104])
+
+    >>> compact(dz, porosity, porosity_max=0.6).round(6)
+    array([0.500232, 0.310496, 0.168104])
+    """
+    if layers < 1:
+        raise ValueError(f"number of layers must be at least 1 ({layers})")
+
+    total_thickness = np.asarray(total_thickness, dtype=float)
+    if np.any(total_thickness < 0.0):
+        raise ValueError("total_thickness must be non-negative")
+    shape = (layers,) + total_thickness.shape
+
+    if lithologies is None:
+        porosity_range = np.subtract(porosity_max, porosity_min)
+    else:
+        c, rho_grain, porosity_min, porosity_range = _mix_lithologies(
+            lithologies,
+            fractions,
+            c=c,
+            rho_grain=rho_grain,
+            porosity_min=porosity_min,
+            porosity_max=porosity_max,
+        )
+
+    k = np.multiply(np.subtract(rho_grain, rho_void), gravity)
+    ck = np.multiply(c, k)
+    a = np.subtract(1.0, porosity_min)
+    b = np.asarray(porosity_range, dtype=float)
+    dz = total_thickness / layers
+
+    if any(np.ndim(value) == len(shape) for value in (ck, a, b)):
+        solids = _solids_by_layer(dz, shape, c, k, a, b)
+    else:
+        depth = dz * np.arange(layers + 1).reshape((-1,) + (1,) * total_thickness.ndim)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            solids = np.where(
+                ck > 0.0,
+                np.diff(_scaled_load_below(a * ck * depth, a, b), axis=0) / ck,
+                (a - b) * dz,
+            )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        porosity = np.where(dz > 0.0, 1.0 - solids / dz, np.add(porosity_min, b))
+
+    return np.broadcast_to(dz, shape).copy(), np.broadcast_to(porosity, shape).copy()
+
+
+def _scaled_load_below(x, a, b, top=1.0):
+    """Increase in ``c`` times the load over a depth, given ``exp(-c s)`` at the top.
+
+    *x* is ``a c k`` times the depth below the top.
+    """
+    return x + np.log1p(-b * top * -np.expm1(-x) / a)
+
+
+def _solids_by_layer(dz, shape, c, k, a, b):
+    """Thickness of solids in each layer, stepping down from the top layer."""
+    c, k, a, b = (np.broadcast_to(value, shape) for value in (c, k, a, b))
+
+    solids = np.empty(shape)
+    load = np.zeros(shape[1:])
+    for layer in range(shape[0]):
+        c_, k_, a_, b_ = c[layer], k[layer], a[layer], b[layer]
+        ck = c_ * k_
+        with np.errstate(divide="ignore", invalid="ignore"):
+            solids[layer] = np.where(
+                ck > 0.0,
+                _scaled_load_below(a_ * ck * dz, a_, b_, top=np.exp(-c_ * load)) / ck,
+                (a_ - b_) * dz,
+            )
+        load = load + k_ * solids[layer]
+
+    return solids
@@ -0,0 +1,314 @@
+"""Record how the layers of a Landlab grid change from step to step."""
+from __future__ import annotations
+
+import queue
+import threading
+
+import numpy as np  # type: ignore
+import zarr  # type: ignore
+
+FIELDS = ("dz", "porosity")
+
+_DONE = object()
+
+
+class HistoryRecorder:
+    """Record the history of a grid's *event_layers* in a compressed Zarr store.
+
+    After each step, only the values of each field that have changed by
+    more than *tolerance* since they were last recorded are stored, along
+    with every value of any newly added layers. Changes are appended to
+    chunked, compressed arrays by a background thread so that the model
+    loop is not held up by compression or disk writes. Any past step can
+    be reconstructed, with each value within *tolerance* of its actual
+    value, by replaying the changes up to that step.
+
+    For each step, the store holds, for each field, a bit mask of the
+    values of existing layers that changed (packed with
+    :func:`numpy.packbits`, bottom layer first, as in *event_layers*),
+    the changed values followed by the values of new layers, and the
+    offsets at which these start.
+
+    Parameters
+    ----------
+    store : str or MutableMapping
+        Path to, or mapping for, the Zarr store to write to. Existing
+        contents are overwritten.
+    tolerance : float, optional
+        Changes to a value no larger than this are not recorded.
+    fields : tuple of str, optional
+        Event-layer fields to record. ``"dz"`` is layer thickness.
+    chunk_size : int, optional
+        Number of changes in each chunk of the store.
+    queue_size : int, optional
+        Number of steps that can wait to be written before *record*
+        waits for the background thread.
+
+    Examples
+    --------
+    >>> from landlab import RasterModelGrid
+    >>> from compaction.history import HistoryRecorder
+    >>> from compaction.landlab import Compact
+
+    >>> grid = RasterModelGrid((3, 4))
+    >>> recorder = HistoryRecorder({}, tolerance=1e-3)
+    >>> compact = Compact(grid, porosity_max=0.6, recorder=recorder)
+    >>> for _ in range(3):
+    ...     grid.event_layers.add(1000.0, porosity=0.6)
+    ...     _ = compact.run_one_step()
+    >>> recorder.close()
+
+    >>> recorder.number_of_steps
+    3
+    >>> recorder.snapshot(1)["porosity"][:, 0].round(3)
+    array([0.434, 0.6  ])
+    >>> grid.event_layers["porosity"][:, 0].round(3)
+    array([0.314, 0.434, 0.6  ])
+    """
+
+    def __init__(
+        self,
+        store,
+        tolerance: float = 1e-6,
+        fields: tuple[str, ...] = FIELDS,
+        chunk_size: int = 1 << 16,
+        queue_size: int = 8,
+    ):
+        if tolerance < 0.0:
+            raise ValueError(f"tolerance must be non-negative ({tolerance})")
+        if queue_size < 1:
+            raise ValueError(f"queue_size must be at least 1 ({queue_size})")
+
+        self._tolerance = tolerance
+        self._fields = tuple(fields)
+        self._group = zarr.open_group(store, mode="w")
+        self._group.attrs["tolerance"] = tolerance
+        self._group.attrs["fields"] = list(self._fields)
+
+        self._group.create_dataset(
+            "number_of_layers", shape=(0,), chunks=(4096,), dtype="i8"
+        )
+        for name in self._fields:
+            field = self._group.create_group(name)
+            field.create_dataset(
+                "changed", shape=(0,), chunks=(chunk_size,), dtype="u1"
+            )
+            field.create_dataset("value", shape=(0,), chunks=(chunk_size,), dtype="f8")
+            for offset in ("changed_offset", "value_offset"):
+                field.create_dataset(offset, shape=(1,), chunks=(4096,), dtype="i8")
+
+        self._recorded: dict[str, np.ndarray] = {}
+        self._diff = np.empty(0)
+        self._number_of_layers = 0
+        self._number_of_cells: int | None = None
+        self._steps = 0
+
+        self._error: BaseException | None = None
+        self._queue: queue.Queue = queue.Queue(queue_size)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def tolerance(self) -> float:
+        return self._tolerance
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        return self._fields
+
+    @property
+    def number_of_steps(self) -> int:
+        """Number of steps recorded."""
+        return self._steps
+
+    def record(self, grid) -> None:
+        """Record the changes to a grid's layers since the last step.
+
+        Parameters
+        ----------
+        grid : ModelGrid
+            A landlab grid.
+        """
+        self._raise_if_failed()
+
+        layers = grid.event_layers
+        if self._number_of_cells is None:
+            self._number_of_cells = layers.number_of_stacks
+        elif layers.number_of_stacks != self._number_of_cells:
+            raise ValueError("number of cells has changed")
+
+        n_layers = layers.number_of_layers
+        n_old = min(n_layers, self._number_of_layers)
+
+        changes = {}
+        for name in self._fields:
+            values = np.asarray(
+                layers.dz if name == "dz" else layers[name], dtype=float
+            )
+            recorded = self._recorded_values(name, n_layers)
+
+            changes[name] = self._changes(values, recorded, n_old)
+
+        self._number_of_layers = n_layers
+        self._steps += 1
+        self._put((self._number_of_cells, n_layers, changes))
+
+    def flush(self) -> None:
+        """Wait for the steps recorded so far to be written."""
+        if self._thread is not None:
+            self._queue.put(_DONE)
+            self._thread.join()
+            self._thread = None
+        self._raise_if_failed()
+
+    def close(self) -> None:
+        """Write any remaining steps and stop the background thread."""
+        self.flush()
+
+    def __enter__(self) -> HistoryRecorder:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def snapshot(self, step: int) -> dict[str, np.ndarray]:
+        """The layers of the grid after a recorded step.
+
+        Parameters
+        ----------
+        step : int
+            Index of the step, where ``0`` is the first recorded step.
+            Negative indices count back from the last step.
+
+        Returns
+        -------
+        dict of ndarray
+            Values of each field, bottom layer first, as in *event_layers*.
+        """
+        self.flush()
+        return read_snapshot(self._group, step)
+
+    def _changes(self, values, recorded, n_old):
+        """Values that differ from those recorded, followed by new layers.
+
+        Recorded values are updated to the new values.
+        """
+        old = values[:n_old].reshape(-1)
+
+        diff = self._buffer(old.size)
+        np.subtract(old, recorded[:n_old].reshape(-1), out=diff)
+        np.abs(diff, out=diff)
+        changed = diff > self._tolerance
+        np.copyto(recorded[:n_old].reshape(-1), old, where=changed)
+        recorded[n_old:] = values[n_old:]
+
+        return np.packbits(changed), np.concatenate(
+            (old[changed], values[n_old:].reshape(-1))
+        )
+
+    def _buffer(self, size):
+        if self._diff.size < size:
+            self._diff = np.empty(max(size, 2 * self._diff.size))
+        return self._diff[:size]
+
+    def _recorded_values(self, name, n_layers):
+        """Values of a field, as last recorded, with room for *n_layers*."""
+        recorded = self._recorded.get(name, np.empty((0, self._number_of_cells)))
+        if len(recorded) < n_layers:
+            resized = np.empty(
+                (max(n_layers, 2 * len(recorded), 16), self._number_of_cells)
+            )
+            resized[: len(recorded)] = recorded
+            self._recorded[name] = recorded = resized
+        return recorded[:n_layers]
+
+    def _put(self, item) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._write, name="compaction-history", daemon=True
+            )
+            self._thread.start()
+        self._queue.put(item)
+
+    def _write(self) -> None:
+        while (item := self._queue.get()) is not _DONE:
+            # After a failure, keep taking items so that *record* never
+            # waits on a full queue.
+            if self._error is not None:
+                continue
+            try:
+                n_cells, n_layers, changes = item
+                if "number_of_cells" not in self._group.attrs:
+                    self._group.attrs["number_of_cells"] = n_cells
+                self._group["number_of_layers"].append([n_layers])
+                for name, (changed, value) in changes.items():
+                    field = self._group[name]
+                    field["changed"].append(changed)
+                    field["value"].append(value)
+                    field["changed_offset"].append([field["changed"].shape[0]])
+                    field["value_offset"].append([field["value"].shape[0]])
+            except BaseException as error:
+                self._error = error
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("unable to write history") from self._error
+
+
+def read_snapshot(store, step: int) -> dict[str, np.ndarray]:
+    """Reconstruct the layers of a grid after a step recorded in a store.
+
+    Parameters
+    ----------
+    store : str, MutableMapping or zarr.Group
+        Store written by a :class:`HistoryRecorder`.
+    step : int
+        Index of the step, where ``0`` is the first recorded step.
+        Negative indices count back from the last step.
+
+    Returns
+    -------
+    dict of ndarray
+        Values of each field, bottom layer first, as in *event_layers*.
+        Each value is within the recorder's tolerance of its value at
+        that step.
+    """
+    group = store if isinstance(store, zarr.Group) else zarr.open_group(store, "r")
+    number_of_layers = group["number_of_layers"][:]
+
+    n_steps = len(number_of_layers)
+    if not -n_steps <= step < n_steps:
+        raise IndexError(f"step out of range ({step} not in [0, {n_steps}))")
+    step %= n_steps
+
+    n_cells = group.attrs["number_of_cells"]
+    n_layers = number_of_layers[step]
+    max_layers = number_of_layers[: step + 1].max()
+
+    snapshot = {}
+    for name in group.attrs["fields"]:
+        field = group[name]
+        changed_offset = field["changed_offset"][: step + 2]
+        value_offset = field["value_offset"][: step + 2]
+        changed = field["changed"][: changed_offset[-1]]
+        value = field["value"][: value_offset[-1]]
+
+        values = np.empty(max_layers * n_cells)
+        n_before = 0
+        for i in range(step + 1):
+            n_old = min(number_of_layers[i], n_before) * n_cells
+            n_new = number_of_layers[i] * n_cells - n_old
+
+            is_changed = np.unpackbits(
+                changed[changed_offset[i] : changed_offset[i + 1]], count=n_old
+            ).view(bool)
+            step_values = value[value_offset[i] : value_offset[i + 1]]
+
+            n_changed = len(step_values) - n_new
+            values[:n_old][is_changed] = step_values[:n_changed]
+            values[n_old : n_old + n_new] = step_values[n_changed:]
+
+            n_before = number_of_layers[i]
+
+        snapshot[name] = values[: n_layers * n_cells].reshape((n_layers, n_cells))
+
+    return snapshot
@@ -1,8 +1,11 @@
 """Compact layers of sediment due to overlying load."""
+import numpy as np  # type: ignore
 from landlab import Component  # type: ignore
 from scipy.constants import g  # type: ignore
 
-from compaction import compaction
+from compaction import compaction, consolidation, profiling
+from compaction.equilibrium import equilibrium_column
+from compaction.resample import resample_to_depth
 
 
 class Compact(Component):
@@ -30,6 +33,14 @@ class Compact(Component):
         porosity_max: float = 1.0,
         rho_void: float = 1000.0,
         gravity: float = g,
+        diffusivity: float | None = None,
+        profile: bool = False,
+        mask=None,
+        lithologies: dict[str, dict[str, float]] | None = None,
+        depths=None,
+        recorder=None,
+        outputs=None,
+        tolerance=None,
     ):
         """Compact layers of sediment.
 
@@ -37,23 +48,89 @@ class Compact(Component):
         ----------
         grid : RasterModelGrid
             A landlab grid.
-        c : ndarray or number, optional
+        c : ndarray, number or str, optional
             Compaction coefficient that describes how easily the sediment is to
             compact [Pa^-1].
-        rho_grain : ndarray or number, optional
+        rho_grain : ndarray, number or str, optional
             Grain density of the sediment [kg / m^3].
-        excess_pressure : ndarray or number, optional
+        excess_pressure : ndarray, number or str, optional
             Excess pressure with depth [Pa].
-        porosity_min : ndarray or number, optional
+        porosity_min : ndarray, number or str, optional
             Minimum porosity that can be achieved by the sediment. This is the
             porosity of the sediment in its closest-compacted state [-].
-        porosity_max : ndarray or number, optional
+        porosity_max : ndarray, number or str, optional
             Maximum porosity of the sediment. This is the porosity of the sediment
             without any compaction [-].
-        rho_void : ndarray or number, optional
+        rho_void : ndarray, number or str, optional
             Density of the interstitial fluid [kg / m^3].
         gravity : float
             Acceleration due to gravity [m / s^2].
+        diffusivity : ndarray or number, optional
+            Coefficient of consolidation [m^2 / s], either a single value
+            or one value for each cell. If provided, excess pore
+            pressure generated by loading dissipates over time rather than
+            instantaneously and *run_one_step* requires a time step.
+        profile : bool, optional
+            If ``True``, record the time spent in each stage of
+            *run_one_step*, and of the compaction calculation, in *stats*.
+        mask : str or ndarray of bool, optional
+            Cells to compact, either as a boolean array or as the name of
+            a boolean at-cell field. Columns of other cells are left
+            unchanged. The default is the grid's core cells.
+        lithologies : dict, optional
+            Compaction parameters (*c*, *porosity_min*, *porosity_max* and
+            *rho_grain*) of each of a set of lithologies, keyed by the name
+            of an event-layer field that holds the fraction of each layer
+            made up of that lithology. Parameters of each layer are the
+            fraction-weighted means of those of the lithologies.
+        depths : ndarray of float, optional
+            Depths below the surface of the edges of a set of intervals
+            [m]. If provided, after each time step the porosity of the
+            layers is resampled onto these intervals (see
+            :func:`~compaction.resample.resample_to_depth`) and stored in
+            *porosity_at_depth*.
+        recorder : HistoryRecorder, optional
+            If provided, the changes to the grid's layers are recorded
+            after each time step (see
+            :class:`~compaction.history.HistoryRecorder`).
+        outputs : sequence of str, optional
+            Names of quantities derived from the compacted layers (see
+            :func:`~compaction.compaction.compact`) to calculate along
+            with each time step and store in *outputs*.
+        tolerance : float, optional
+            If provided, skip time steps that could change the porosity
+            of any layer by no more than this (see *Notes*). Cannot be
+            used with *diffusivity*.
+
+        Notes
+        -----
+        Compaction parameters other than *gravity* can be given as the
+        name of a field, either an at-cell field (one value per column)
+        or an event-layer field (one value per layer). Fields are used
+        through views of the grid's arrays, so changes to their values
+        are seen by the next time step without copying them. Values are
+        checked when a parameter is set and, for event-layer fields,
+        when new layers are added. Changes made to the existing values
+        of a field are not checked.
+
+        With *tolerance*, porosity is only compacted once the load added
+        since the last compaction is large enough to matter. Load comes
+        from the solids of layers, which compaction conserves, and so
+        the porosities of layers depend only on the load above them and
+        not on how often they are compacted. As the porosity law,
+        ``porosity_min + (porosity_max - porosity_min) exp(-c load)``,
+        changes by no more than ``(porosity_max - porosity_min) c`` per
+        unit of load, a step is skipped if that, times the largest load
+        added to any compacted cell since layers were last compacted,
+        is no more than *tolerance*. The largest values of the
+        parameters are used, so the bound holds for every layer, and
+        porosities then differ from those compacted every step by no
+        more than *tolerance*, and not at all once compacted. This
+        assumes that layers are only added to the top of columns, with
+        porosities no greater than those of the porosity law under no
+        load, and that parameters do not change between time steps.
+        While steps are skipped, *outputs* and *porosity_at_depth* are
+        those of the last step that compacted the layers.
 
         Examples
         --------
@@ -82,6 +159,8 @@ class Compact(Component):
                [False, False, False]], dtype=bool)
         """
         self._compaction_params: dict[str, float] = {}
+        self._field_params: dict[str, str] = {}
+        self._checked_layers: dict[str, int] = {}
 
         super().__init__(grid)
 
@@ -92,89 +171,661 @@ class Compact(Component):
         self.porosity_max = porosity_max
         self.rho_void = rho_void
         self.gravity = gravity
+        self.diffusivity = diffusivity
+        self.mask = mask
+        self.lithologies = lithologies
+        self.depths = depths
+        self.recorder = recorder
+        self.outputs = outputs
+        self.tolerance = tolerance
+
+        self._stats = profiling.Profile() if profile else None
+
+        self._excess_pore_pressure = np.zeros((0, self.grid.number_of_cells))
+        self._overlying_load = np.zeros((0, self.grid.number_of_cells))
+        self._buffers: dict[str, np.ndarray] = {}
+        self._core_cells: np.ndarray | None = None
+        self._status_at_node: np.ndarray | None = None
+        self._compacted_layers = 0
+        self._skipped_steps = 0
 
     def run_one_step(self, dt=None):
+        if self._tolerance is not None and self._can_skip_step():
+            self._skipped_steps += 1
+        elif self._stats is None:
+            self._run_one_step(dt)
+        else:
+            with profiling.profile(self._stats):
+                self._run_one_step(dt, timer=profiling.StageTimer([self._stats]))
+
+        if self._recorder is not None:
+            self._recorder.record(self.grid)
+
+        return self.grid
+
+    def _run_one_step(self, dt=None, timer=None):
+        self._compacted_layers = self.grid.event_layers.number_of_layers
         if self.grid.event_layers.number_of_layers == 0:
+            if self._depths is not None:
+                self._porosity_at_depth.fill(np.nan)
             return self.grid
 
+        outputs = self._output_buffers()
+
         dz = self._grid.event_layers.dz[-1::-1, :]
         porosity = self._grid.event_layers["porosity"][-1::-1, :]
+        if timer is not None:
+            timer("slice")
 
-        porosity[:] = compaction.compact(
-            dz, porosity, return_dz=dz, **self._compaction_params
-        )
+        params = self._params_for_step(dz, porosity, dt)
+        if timer is not None and self.diffusivity is not None:
+            timer("consolidate")
+
+        lithology = self._lithology_params()
+
+        cells = self.active_cells
+        if len(cells) == self.grid.number_of_cells:
+            porosity_new = compaction.compact(
+                dz,
+                porosity,
+                return_dz=dz,
+                outputs={name: buffer[::-1] for name, buffer in outputs.items()},
+                **params,
+                **lithology,
+            )
+            if timer is not None:
+                timer("compact", nbytes=porosity_new.nbytes)
+
+            porosity[:] = porosity_new
+            if timer is not None:
+                timer("store")
+        else:
+            dz_active = self._gather("dz", dz[::-1], cells)
+            porosity_active = self._gather("porosity", porosity[::-1], cells)
+            params = {
+                name: self._gather_param(value, cells) for name, value in params.items()
+            }
+            if lithology:
+                lithology["fractions"] = np.take(lithology["fractions"], cells, axis=-1)
+            if timer is not None:
+                timer("gather")
+
+            outputs_active = dict.fromkeys(outputs)
+            porosity_new = compaction.compact(
+                dz_active,
+                porosity_active,
+                return_dz=dz_active,
+                outputs=outputs_active,
+                **params,
+                **lithology,
+            )
+            if timer is not None:
+                timer("compact", nbytes=porosity_new.nbytes)
+
+            _scatter_columns(dz_active, cells, dz[::-1])
+            _scatter_columns(porosity_new, cells, porosity[::-1])
+            for name, buffer in outputs.items():
+                buffer.fill(np.nan)
+                _scatter_columns(outputs_active[name], cells, buffer)
+            if timer is not None:
+                timer("store")
+
+        if self._depths is not None:
+            resample_to_depth(dz, porosity, self._depths, out=self._porosity_at_depth)
+            if timer is not None:
+                timer("resample")
 
         return self.grid
 
+    def _can_skip_step(self):
+        """Check if compacting the layers could change porosity by no more
+        than the tolerance.
+        """
+        layers = self.grid.event_layers
+        if layers.number_of_layers < self._compacted_layers:
+            return False
+
+        cells = self.active_cells
+        if len(cells) == 0:
+            return True
+
+        new_layers = slice(self._compacted_layers, layers.number_of_layers)
+        solids = np.sum(
+            layers.dz[new_layers, cells]
+            * (1.0 - layers["porosity"][new_layers, cells]),
+            axis=0,
+        )
+        return self._max_porosity_change_per_solids() * solids.max() <= self._tolerance
+
+    def _max_porosity_change_per_solids(self):
+        """Largest change to porosity per thickness of solids added above."""
+        params = self._resolved_params()
+        lithologies = list((self._lithologies or {}).values())
+
+        def largest(name):
+            return max(
+                [np.max(params[name])]
+                + [params_.get(name, np.max(params[name])) for params_ in lithologies]
+            )
+
+        porosity_range = max(
+            [np.max(np.subtract(params["porosity_max"], params["porosity_min"]))]
+            + [
+                params_.get("porosity_max", largest("porosity_max"))
+                - params_.get("porosity_min", 0.0)
+                for params_ in lithologies
+            ]
+        )
+        return (
+            largest("c")
+            * porosity_range
+            * (largest("rho_grain") - np.min(params["rho_void"]))
+            * params["gravity"]
+        )
+
+    def _output_buffers(self):
+        """Bottom-first arrays, one for each output, with room for every layer."""
+        n_layers = self.grid.event_layers.number_of_layers
+        for name, buffer in self._outputs.items():
+            if buffer.shape[0] < n_layers:
+                self._outputs[name] = _resize_layers(buffer, n_layers)
+        return {name: buffer[:n_layers] for name, buffer in self._outputs.items()}
+
+    def _gather(self, name, array, cells):
+        """Copy the columns of active cells into a reusable buffer.
+
+        Layers of *array* are bottom-first, as stored by *event_layers*,
+        while those of the buffer are top-first, as expected by *compact*.
+        """
+        n_layers = array.shape[0]
+        buffer = self._buffers.get(name, np.empty((0, len(cells))))
+        if buffer.shape[1] != len(cells):
+            buffer = np.empty((0, len(cells)))
+        if buffer.shape[0] < n_layers:
+            buffer = np.empty((max(n_layers, 2 * buffer.shape[0]), len(cells)))
+        self._buffers[name] = buffer
+
+        return _gather_columns(array, cells, out=buffer[:n_layers])
+
+    def _gather_param(self, value, cells):
+        """Select the values of a parameter at active cells."""
+        if np.ndim(value) > 0 and np.shape(value)[-1] == self.grid.number_of_cells:
+            return np.take(value, cells, axis=-1)
+        return value
+
+    def _lithology_params(self):
+        """Lithologies, and the fraction of each layer made of each."""
+        if self._lithologies is None:
+            return {}
+        return {
+            "lithologies": list(self._lithologies.values()),
+            "fractions": [
+                self.grid.event_layers[name][-1::-1, :] for name in self._lithologies
+            ],
+        }
+
+    def _params_for_step(self, dz, porosity, dt):
+        """Compaction parameters, including any excess pore pressure."""
+        params = self._resolved_params()
+        if self.diffusivity is not None:
+            if dt is None:
+                raise ValueError("dt is required if diffusivity is provided")
+            params = params | {
+                "excess_pressure": params["excess_pressure"]
+                + self._consolidate(dz, porosity, dt, params)
+            }
+        return params
+
+    def _resolved_params(self):
+        """Compaction parameters, with the names of fields replaced by their values.
+
+        Values of at-cell fields are one-dimensional, and so broadcast to
+        each layer, while those of event-layer fields are top-first views
+        of the grid's layers.
+        """
+        if not self._field_params:
+            return self._compaction_params
+
+        params = dict(self._compaction_params)
+        for name, field in self._field_params.items():
+            params[name] = self._field_values(name, field)
+        return params
+
+    def _field_values(self, name, field):
+        """Values of the field of a parameter, checking any that are new."""
+        if field in self.grid.at_cell:
+            values = self.grid.at_cell[field]
+            if self._checked_layers.get(name) is None:
+                _check_param(name, values)
+                self._checked_layers[name] = 0
+            return values
+
+        layers = self.grid.event_layers
+        if field not in layers.tracking:
+            raise ValueError(
+                f"{field!r}: {name} is not an at-cell or event-layer field"
+            )
+
+        values = layers[field]
+        n_checked = min(self._checked_layers.get(name) or 0, len(values))
+        if n_checked < len(values):
+            _check_param(name, values[n_checked:])
+        self._checked_layers[name] = len(values)
+
+        return values[-1::-1, :]
+
+    def _set_param(self, name, new_val):
+        """Set a compaction parameter, checking its values or those of its field.
+
+        Fields that do not exist yet, because no layers have been added,
+        are checked when first used.
+        """
+        self._checked_layers.pop(name, None)
+        if not isinstance(new_val, str):
+            _check_param(name, new_val)
+            self._field_params.pop(name, None)
+        else:
+            if (
+                new_val in self.grid.at_cell
+                or self.grid.event_layers.number_of_layers > 0
+            ):
+                self._field_values(name, new_val)
+            self._field_params[name] = new_val
+        self._compaction_params[name] = new_val
+
+    def _consolidate(self, dz, porosity, dt, params):
+        """Update the excess pore pressure of each layer over a time step.
+
+        Pressure is generated by changes to the overlying load since the
+        previous time step and then diffuses within each column.
+        """
+        n_layers = self.grid.event_layers.number_of_layers
+        if self._excess_pore_pressure.shape[0] < n_layers:
+            self._excess_pore_pressure = _resize_layers(
+                self._excess_pore_pressure, n_layers
+            )
+            self._overlying_load = _resize_layers(self._overlying_load, n_layers)
+
+        pressure = self._excess_pore_pressure[n_layers - 1 :: -1]
+        load_before = self._overlying_load[n_layers - 1 :: -1]
+
+        load = consolidation.overlying_load(
+            dz,
+            porosity,
+            rho_grain=params["rho_grain"],
+            rho_void=params["rho_void"],
+            gravity=params["gravity"],
+        )
+        pressure += load - load_before
+        load_before[:] = load
+
+        return consolidation.diffuse_excess_pressure(
+            pressure, dz, dt, self.diffusivity, out=pressure
+        )
+
     def calculate(self):
         return self.run_one_step()
 
+    def calc_compacted_thickness(self):
+        """Calculate the thickness of sediment at each cell after compaction.
+
+        The layers of the grid are left unchanged, and the per-layer
+        porosities and thicknesses are not stored. Use this if only the
+        change in surface elevation due to compaction is needed.
+
+        Returns
+        -------
+        ndarray
+            Thickness of sediment at each cell after compaction [m].
+
+        Examples
+        --------
+        >>> from landlab import RasterModelGrid
+
+        >>> grid = RasterModelGrid((3, 5))
+        >>> for layer in range(5):
+        ...     grid.event_layers.add(100.0, porosity=0.7)
+
+        >>> compact = Compact(grid, porosity_min=0.1, porosity_max=0.7)
+        >>> subsidence = (
+        ...     grid.event_layers.thickness - compact.calc_compacted_thickness()
+        ... )
+        >>> subsidence.round(6)
+        array([41.163241, 41.163241, 41.163241])
+        >>> grid.event_layers.thickness
+        array([500., 500., 500.])
+        """
+        if self.grid.event_layers.number_of_layers == 0:
+            return np.zeros(self.grid.number_of_cells)
+
+        dz = self._grid.event_layers.dz[-1::-1, :]
+        porosity = self._grid.event_layers["porosity"][-1::-1, :]
+
+        lithology = self._lithology_params()
+
+        params = self._resolved_params()
+
+        cells = self.active_cells
+        if len(cells) == self.grid.number_of_cells:
+            return compaction.compacted_thickness(
+                dz,
+                porosity,
+                **params,
+                **lithology,
+            )
+
+        if lithology:
+            lithology["fractions"] = np.take(lithology["fractions"], cells, axis=-1)
+
+        thickness = dz.sum(axis=0)
+        thickness[cells] = compaction.compacted_thickness(
+            np.take(dz, cells, axis=1),
+            np.take(porosity, cells, axis=1),
+            **lithology,
+            **{
+                name: self._gather_param(value, cells) for name, value in params.items()
+            },
+        )
+        return thickness
+
     @property
     def params(self):
         return tuple(self._compaction_params.items())
 
     @property
-    def c(self) -> float:
+    def stats(self) -> dict | None:
+        """Time spent, and bytes allocated, by each stage of *run_one_step*.
+
+        Stages of the component (*slice*, *consolidate*, *compact* and
+        *store*) are recorded along with the stages of the compaction
+        calculation itself (*load*, *cumsum*, *exp* and *dz*), which are
+        part of the *compact* stage. If the component was not created
+        with *profile* set, this is ``None``.
+
+        Examples
+        --------
+        >>> from landlab import RasterModelGrid
+
+        >>> grid = RasterModelGrid((3, 5))
+        >>> for layer in range(5):
+        ...     grid.event_layers.add(100.0, porosity=0.7)
+
+        >>> compact = Compact(grid, porosity_max=0.7, profile=True)
+        >>> _ = compact.run_one_step()
+        >>> compact.stats["calls"], compact.stats["layers"], compact.stats["columns"]
+        (1, 5, 3)
+        >>> sorted(compact.stats["stages"])
+        ['compact', 'cumsum', 'dz', 'exp', 'load', 'slice', 'store']
+        """
+        return None if self._stats is None else self._stats.as_dict()
+
+    @property
+    def excess_pore_pressure(self):
+        """Excess pore pressure of each layer [Pa].
+
+        Layers are ordered as they are in the grid's *event_layers*, with
+        the first row being the bottom layer.
+        """
+        return self._excess_pore_pressure[: self.grid.event_layers.number_of_layers]
+
+    @property
+    def diffusivity(self) -> float | None:
+        return self._diffusivity
+
+    @diffusivity.setter
+    def diffusivity(self, new_val: float | None):
+        if new_val is not None and getattr(self, "_tolerance", None) is not None:
+            raise ValueError("diffusivity cannot be used with tolerance")
+        if new_val is not None and np.ndim(new_val) > 0:
+            if np.shape(new_val) != (self.grid.number_of_cells,):
+                raise ValueError(
+                    "diffusivity must be a number or have one value per cell"
+                )
+        if new_val is None or np.all(np.asarray(new_val) > 0.0):
+            self._diffusivity = new_val
+        else:
+            raise ValueError("diffusivity must be positive")
+
+    @property
+    def tolerance(self) -> float | None:
+        """Largest change to porosity allowed by skipping a time step."""
+        return self._tolerance
+
+    @tolerance.setter
+    def tolerance(self, new_val: float | None):
+        if new_val is not None:
+            if self.diffusivity is not None:
+                raise ValueError("tolerance cannot be used with diffusivity")
+            if not new_val >= 0.0:
+                raise ValueError(f"tolerance must be non-negative ({new_val})")
+        self._tolerance = new_val
+
+    @property
+    def skipped_steps(self) -> int:
+        """Number of time steps skipped because of *tolerance*.
+
+        Examples
+        --------
+        >>> from landlab import RasterModelGrid
+
+        >>> grid = RasterModelGrid((3, 4))
+        >>> compact = Compact(grid, porosity_max=0.6, tolerance=5e-3)
+        >>> for _ in range(10):
+        ...     grid.event_layers.add(10.0, porosity=0.6)
+        ...     _ = compact.run_one_step()
+        >>> compact.skipped_steps
+        7
+        """
+        return self._skipped_steps
+
+    @property
+    def mask(self):
+        """Cells to compact, or ``None`` for the grid's core cells."""
+        return self._mask
+
+    @mask.setter
+    def mask(self, new_val):
+        if isinstance(new_val, str):
+            if new_val not in self.grid.at_cell:
+                raise ValueError(f"{new_val!r}: mask is not an at-cell field")
+        elif new_val is not None:
+            new_val = np.asarray(new_val)
+            if new_val.dtype != bool or new_val.shape != (self.grid.number_of_cells,):
+                raise ValueError("mask must be a boolean array with one value per cell")
+        self._mask = new_val
+
+    @property
+    def active_cells(self) -> np.ndarray:
+        """Ids of the cells that are compacted."""
+        if self._mask is None:
+            status = self.grid.status_at_node
+            if (
+                self._core_cells is None
+                or self._status_at_node is None
+                or not np.array_equal(status, self._status_at_node)
+            ):
+                self._status_at_node = status.copy()
+                self._core_cells = self.grid.core_cells
+            return self._core_cells
+        elif isinstance(self._mask, str):
+            return np.flatnonzero(self.grid.at_cell[self._mask])
+        else:
+            return np.flatnonzero(self._mask)
+
+    @property
+    def lithologies(self) -> dict[str, dict[str, float]] | None:
+        """Compaction parameters of each lithology, keyed by field name."""
+        return self._lithologies
+
+    @lithologies.setter
+    def lithologies(self, new_val: dict[str, dict[str, float]] | None):
+        if new_val is not None:
+            new_val = {name: dict(params) for name, params in new_val.items()}
+            for params in new_val.values():
+                unknown = set(params) - {
+                    "c",
+                    "porosity_min",
+                    "porosity_max",
+                    "rho_grain",
+                }
+                if unknown:
+                    raise ValueError(
+                        f"{', '.join(sorted(unknown))}: unknown lithology parameters"
+                    )
+        self._lithologies = new_val
+
+    @property
+    def recorder(self):
+        """Recorder of the history of the grid's layers, if any."""
+        return self._recorder
+
+    @recorder.setter
+    def recorder(self, new_val):
+        if new_val is not None and not callable(getattr(new_val, "record", None)):
+            raise ValueError("recorder must have a record method")
+        self._recorder = new_val
+
+    @property
+    def outputs(self) -> dict[str, np.ndarray]:
+        """Quantities derived from the layers compacted by the last time step.
+
+        Layers are ordered as they are in the grid's *event_layers*, with
+        the first row being the bottom layer. Values at cells that are
+        not compacted are NaN.
+
+        Examples
+        --------
+        >>> from landlab import RasterModelGrid
+
+        >>> grid = RasterModelGrid((3, 4))
+        >>> for layer in range(3):
+        ...     grid.event_layers.add(1000.0, porosity=0.5)
+
+        >>> compact = Compact(
+        ...     grid, porosity_max=0.5, outputs=["bulk_density", "depth_to_top"]
+        ... )
+        >>> _ = compact.run_one_step()
+        >>> compact.outputs["bulk_density"].round(1)
+        array([[2282.6, 2282.6],
+               [2099.5, 2099.5],
+               [1825. , 1825. ]])
+        >>> compact.outputs["depth_to_top"].round(3)
+        array([[1750.353, 1750.353],
+               [1000.   , 1000.   ],
+               [   0.   ,    0.   ]])
+        """
+        n_layers = min(self._compacted_layers, self.grid.event_layers.number_of_layers)
+        return {name: buffer[:n_layers] for name, buffer in self._outputs.items()}
+
+    @outputs.setter
+    def outputs(self, new_val):
+        new_val = () if new_val is None else tuple(new_val)
+        unknown = set(new_val) - set(compaction.OUTPUTS)
+        if unknown:
+            raise ValueError(
+                f"{', '.join(sorted(unknown))}: unknown outputs"
+                f" (not one of {', '.join(compaction.OUTPUTS)})"
+            )
+        self._outputs = {
+            name: np.full(
+                (self.grid.event_layers.number_of_layers, self.grid.number_of_cells),
+                np.nan,
+            )
+            for name in new_val
+        }
+
+    @property
+    def depths(self) -> np.ndarray | None:
+        """Depths of the edges of the intervals to resample porosity onto."""
+        return self._depths
+
+    @depths.setter
+    def depths(self, new_val):
+        if new_val is not None:
+            new_val = np.array(new_val, dtype=float)
+            if new_val.ndim not in (1, 2) or new_val.shape[0] < 2:
+                raise ValueError("depths must have at least two edges")
+            if new_val.ndim == 2 and new_val.shape[1] != self.grid.number_of_cells:
+                raise ValueError("depths must have one column for each cell")
+            if np.any(np.diff(new_val, axis=0) < 0.0):
+                raise ValueError("depths must increase down the column")
+            self._porosity_at_depth = np.full(
+                (new_val.shape[0] - 1, self.grid.number_of_cells), np.nan
+            )
+        self._depths = new_val
+
+    @property
+    def porosity_at_depth(self) -> np.ndarray | None:
+        """Porosity of the layers resampled onto the intervals of *depths*.
+
+        Intervals are rows, top interval first, and cells are columns.
+        Intervals that contain no sediment are NaN. If the component was
+        not created with *depths*, this is ``None``.
+
+        Examples
+        --------
+        >>> from landlab import RasterModelGrid
+
+        >>> grid = RasterModelGrid((3, 4))
+        >>> for porosity in (0.2, 0.4, 0.6):
+        ...     grid.event_layers.add(10.0, porosity=porosity)
+
+        >>> compact = Compact(grid, c=0.0, depths=[0.0, 5.0, 15.0, 40.0])
+        >>> _ = compact.run_one_step()
+        >>> compact.porosity_at_depth.round(6)
+        array([[0.6     , 0.6     ],
+               [0.5     , 0.5     ],
+               [0.266667, 0.266667]])
+        """
+        return None if self._depths is None else self._porosity_at_depth
+
+    @property
+    def c(self):
         return self._compaction_params["c"]
 
     @c.setter
-    def c(self, new_val: float):
-        if new_val >= 0.0:
-            self._compaction_params["c"] = new_val
-        else:
-            raise ValueError("c must be >= 0.")
+    def c(self, new_val):
+        self._set_param("c", new_val)
 
     @property
-    def rho_grain(self) -> float:
+    def rho_grain(self):
         return self._compaction_params["rho_grain"]
 
     @rho_grain.setter
-    def rho_grain(self, new_val: float):
-        if new_val > 0.0:
-            self._compaction_params["rho_grain"] = new_val
-        else:
-            raise ValueError("rho_grain must be positive")
+    def rho_grain(self, new_val):
+        self._set_param("rho_grain", new_val)
 
     @property
-    def excess_pressure(self) -> float:
+    def excess_pressure(self):
         return self._compaction_params["excess_pressure"]
 
     @excess_pressure.setter
-    def excess_pressure(self, new_val: float):
-        self._compaction_params["excess_pressure"] = new_val
+    def excess_pressure(self, new_val):
+        self._set_param("excess_pressure", new_val)
 
     @property
-    def porosity_min(self) -> float:
+    def porosity_min(self):
         return self._compaction_params["porosity_min"]
 
     @porosity_min.setter
-    def porosity_min(self, new_val: float):
-        if 0.0 <= new_val <= 1.0:
-            self._compaction_params["porosity_min"] = new_val
-        else:
-            raise ValueError("porosity_min must be between [0, 1]")
+    def porosity_min(self, new_val):
+        self._set_param("porosity_min", new_val)
 
     @property
-    def porosity_max(self) -> float:
+    def porosity_max(self):
         return self._compaction_params["porosity_max"]
 
     @porosity_max.setter
-    def porosity_max(self, new_val: float):
-        if 0.0 <= new_val <= 1.0:
-            self._compaction_params["porosity_max"] = new_val
-        else:
-            raise ValueError("porosity_max must be between [0, 1]")
+    def porosity_max(self, new_val):
+        self._set_param("porosity_max", new_val)
 
     @property
-    def rho_void(self) -> float:
+    def rho_void(self):
         return self._compaction_params["rho_void"]
 
     @rho_void.setter
-    def rho_void(self, new_val: float):
-        if new_val > 0.0:
-            self._compaction_params["rho_void"] = new_val
-        else:
-            raise ValueError("rho_void must be positive")
+    def rho_void(self, new_val):
+        self._set_param("rho_void", new_val)
 
     @property
     def gravity(self) -> float:
@@ -182,7 +833,334 @@ class Compact(Component):
 
     @gravity.setter
     def gravity(self, new_val: float):
-        if new_val > 0.0:
-            self._compaction_params["gravity"] = new_val
-        else:
-            raise ValueError("gravity must be positive")
+        _check_param("gravity", new_val)
+        self._compaction_params["gravity"] = new_val
+
+
+class CompactEnsemble:
+    """Compact the layers of many grids together.
+
+    Each grid is given its own :class:`Compact` component but, rather than
+    compacting each grid separately, the columns of all grids are copied
+    into a single array of layers and compacted with one call. Grids with
+    fewer layers are padded with empty layers. This removes most of the
+    per-call overhead when stepping many small grids. Grids whose
+    components use options that a batch does not support (mixtures of
+    lithologies, *profile*, *depths*, *outputs* or *tolerance*) are
+    compacted on their own, with :meth:`Compact.run_one_step`.
+
+    Parameters
+    ----------
+    batch_size : int, optional
+        Grids are compacted in batches of about this many values so that
+        each batch fits in cache.
+
+    Examples
+    --------
+    >>> from landlab import RasterModelGrid
+    >>> from compaction.landlab import CompactEnsemble
+
+    >>> ensemble = CompactEnsemble()
+    >>> for n_layers, porosity_max in [(3, 0.5), (5, 0.6)]:
+    ...     grid = RasterModelGrid((3, 4))
+    ...     for _ in range(n_layers):
+    ...         grid.event_layers.add(100.0, porosity=porosity_max)
+    ...     _ = ensemble.add(grid, porosity_max=porosity_max)
+    >>> len(ensemble)
+    2
+
+    >>> ensemble.run_one_step()
+    >>> ensemble.components[0].grid.event_layers["porosity"][:, 0].round(6)
+    array([0.461141, 0.480177, 0.5     ])
+    """
+
+    def __init__(self, batch_size: int = 8192):
+        self._components: list[Compact] = []
+        self._buffers: dict[str, np.ndarray] = {}
+        self._batch_size = batch_size
+
+    def __len__(self) -> int:
+        return len(self._components)
+
+    @property
+    def components(self) -> tuple[Compact, ...]:
+        """The component of each grid in the ensemble."""
+        return tuple(self._components)
+
+    def add(self, grid, **kwds) -> Compact:
+        """Add a grid to the ensemble.
+
+        Parameters
+        ----------
+        grid : ModelGrid
+            A landlab grid.
+        **kwds
+            Compaction parameters for the grid, as for :class:`Compact`.
+
+        Returns
+        -------
+        Compact
+            The component that holds the grid's parameters.
+        """
+        compact = Compact(grid, **kwds)
+        self._components.append(compact)
+        return compact
+
+    def run_one_step(self, dt=None) -> None:
+        """Compact the layers of every grid in the ensemble."""
+        batched: list[Compact] = []
+        batch: list[tuple[Compact, np.ndarray | slice, int]] = []
+        n_layers = n_columns = 0
+        for compact in self._components:
+            if _runs_alone(compact):
+                compact.run_one_step(dt)
+                continue
+
+            batched.append(compact)
+            if compact.grid.event_layers.number_of_layers == 0:
+                continue
+
+            active_cells = compact.active_cells
+            n_cells = len(active_cells)
+            cells: np.ndarray | slice = (
+                slice(None) if n_cells == compact.grid.number_of_cells else active_cells
+            )
+
+            n_layers = max(n_layers, compact.grid.event_layers.number_of_layers)
+            if batch and n_layers * (n_columns + n_cells) > self._batch_size:
+                self._run_batch(batch, dt)
+                batch, n_columns = [], 0
+                n_layers = compact.grid.event_layers.number_of_layers
+            batch.append((compact, cells, n_cells))
+            n_columns += n_cells
+        if batch:
+            self._run_batch(batch, dt)
+
+        for compact in batched:
+            compact._compacted_layers = compact.grid.event_layers.number_of_layers
+            if compact.recorder is not None:
+                compact.recorder.record(compact.grid)
+
+    def _run_batch(self, batch, dt) -> None:
+        n_layers = max(c.grid.event_layers.number_of_layers for c, _, _ in batch)
+        n_columns = sum(n_cells for _, _, n_cells in batch)
+
+        dz = self._buffer("dz", n_layers, n_columns)
+        porosity = self._buffer("porosity", n_layers, n_columns)
+
+        columns, params = [], []
+        start = 0
+        for compact, cells, n_cells in batch:
+            layers = compact.grid.event_layers
+            n, stop = layers.number_of_layers, start + n_cells
+            dz_top_first = layers.dz[::-1]
+            porosity_top_first = layers["porosity"][::-1]
+
+            params.append(
+                compact._params_for_step(dz_top_first, porosity_top_first, dt)
+            )
+            dz[:n, start:stop] = dz_top_first[:, cells]
+            dz[n:, start:stop] = 0.0
+            porosity[:n, start:stop] = porosity_top_first[:, cells]
+            porosity[n:, start:stop] = 0.0
+
+            columns.append((start, stop, cells, n, dz_top_first, porosity_top_first))
+            start = stop
+
+        porosity_new = compaction.compact(
+            dz,
+            porosity,
+            return_dz=dz,
+            **_batched_params(params, columns, dz.shape),
+        )
+
+        for start, stop, cells, n, dz_top_first, porosity_top_first in columns:
+            dz_top_first[:, cells] = dz[:n, start:stop]
+            porosity_top_first[:, cells] = porosity_new[:n, start:stop]
+
+    def _buffer(self, name, n_layers, n_columns):
+        """A reusable array of layers for the columns of a batch of grids."""
+        buffer = self._buffers.get(name, np.empty(0))
+        if buffer.size < n_layers * n_columns:
+            buffer = np.empty(max(n_layers * n_columns, 2 * buffer.size))
+            self._buffers[name] = buffer
+        return buffer[: n_layers * n_columns].reshape((n_layers, n_columns))
+
+
+def add_equilibrium_layers(
+    grid,
+    thickness,
+    n_layers: int,
+    lithologies: dict[str, dict[str, float]] | None = None,
+    fractions: dict | None = None,
+    **kwds,
+):
+    """Add layers of sediment, compacted to equilibrium, to a grid.
+
+    Rather than depositing layers and compacting them until they stop
+    changing, calculate the equilibrium state directly (see
+    :func:`~compaction.equilibrium.equilibrium_column`) and add it to
+    the grid's *event_layers*. Compacting the new layers with a
+    :class:`Compact` component that has the same parameters leaves them
+    unchanged.
+
+    Parameters
+    ----------
+    grid : ModelGrid
+        A landlab grid.
+    thickness : ndarray or number
+        Total thickness of the new layers at each cell [m].
+    n_layers : int
+        Number of layers to add.
+    lithologies : dict, optional
+        Compaction parameters of each lithology, keyed by the name of an
+        event-layer field, as for :class:`Compact`.
+    fractions : dict, optional
+        Fraction of each layer made up of each lithology, keyed by the
+        same names as *lithologies*. Values for each layer are ordered
+        top layer first. Fractions are added as event-layer fields.
+    **kwds
+        Compaction parameters. Values for each layer are ordered top
+        layer first.
+
+    Returns
+    -------
+    ModelGrid
+        The grid.
+
+    Examples
+    --------
+    >>> from landlab import RasterModelGrid
+    >>> from compaction.landlab import Compact, add_equilibrium_layers
+
+    >>> grid = RasterModelGrid((3, 4))
+    >>> _ = add_equilibrium_layers(grid, 3000.0, 3, porosity_max=0.6)
+    >>> grid.event_layers["porosity"][:, 0].round(6)
+    array([0.168104, 0.310496, 0.500232])
+
+    >>> _ = Compact(grid, porosity_max=0.6).run_one_step()
+    >>> grid.event_layers["porosity"][:, 0].round(6)
+    array([0.168104, 0.310496, 0.500232])
+    """
+    shape = (n_layers, grid.number_of_cells)
+    thickness = np.broadcast_to(thickness, shape[1:])
+
+    if lithologies is None:
+        layer_fields = {}
+    else:
+        if fractions is None or set(fractions) != set(lithologies):
+            raise ValueError("fractions must be given for each lithology")
+        layer_fields = {
+            name: np.broadcast_to(fractions[name], shape) for name in lithologies
+        }
+        kwds |= {
+            "lithologies": list(lithologies.values()),
+            "fractions": list(layer_fields.values()),
+        }
+
+    dz, porosity = equilibrium_column(thickness, n_layers, **kwds)
+
+    for layer in range(n_layers - 1, -1, -1):
+        grid.event_layers.add(
+            dz[layer],
+            porosity=porosity[layer],
+            **{name: values[layer] for name, values in layer_fields.items()},
+        )
+
+    return grid
+
+
+def _runs_alone(compact: Compact) -> bool:
+    """Check if a component uses options that an ensemble cannot batch."""
+    return (
+        compact.lithologies is not None
+        or compact._stats is not None
+        or compact.depths is not None
+        or bool(compact._outputs)
+        or compact.tolerance is not None
+    )
+
+
+def _batched_params(params, columns, shape):
+    """Combine the parameters of each grid into parameters for a batch.
+
+    Parameters that are the same number for every grid are left as is.
+    Otherwise, values are arranged by column and, if any grid has values
+    for each layer, by layer.
+    """
+    batched = {}
+    for name in params[0]:
+        values = [p[name] for p in params]
+        if all(
+            isinstance(value, (int, float)) and value == values[0] for value in values
+        ):
+            batched[name] = values[0]
+            continue
+
+        by_layer = any(np.ndim(value) == 2 for value in values)
+        batched[name] = np.zeros((shape[0] if by_layer else 1, shape[1]))
+        for value, (start, stop, cells, n_layers, *_) in zip(values, columns):
+            value = np.asarray(value)
+            if value.ndim == 2:
+                batched[name][:n_layers, start:stop] = value[:, cells]
+            elif value.ndim == 1:
+                batched[name][:, start:stop] = value[cells]
+            else:
+                batched[name][:, start:stop] = value
+    return batched
+
+
+def _gather_columns(array, cells, out):
+    """Copy columns of bottom-first layers into top-first layers.
+
+    Copying a layer at a time, from and to contiguous rows, is faster than
+    indexing the reversed array for grids with more cells than layers.
+    """
+    n_layers = array.shape[0]
+    if n_layers > len(cells):
+        return np.take(array[::-1], cells, axis=1, out=out)
+
+    for layer in range(n_layers):
+        np.take(array[layer], cells, out=out[n_layers - layer - 1])
+    return out
+
+
+def _scatter_columns(values, cells, array):
+    """Copy top-first layers into columns of bottom-first layers."""
+    n_layers = array.shape[0]
+    if n_layers > len(cells):
+        array[::-1, cells] = values
+    else:
+        for layer in range(n_layers):
+            array[layer, cells] = values[n_layers - layer - 1]
+
+
+_VALID_PARAMS = {
+    "c": (lambda value: value >= 0.0, "c must be >= 0."),
+    "rho_grain": (lambda value: value > 0.0, "rho_grain must be positive"),
+    "excess_pressure": (np.isfinite, "excess_pressure must be finite"),
+    "porosity_min": (
+        lambda value: (value >= 0.0) & (value <= 1.0),
+        "porosity_min must be between [0, 1]",
+    ),
+    "porosity_max": (
+        lambda value: (value >= 0.0) & (value <= 1.0),
+        "porosity_max must be between [0, 1]",
+    ),
+    "rho_void": (lambda value: value > 0.0, "rho_void must be positive"),
+    "gravity": (lambda value: value > 0.0, "gravity must be positive"),
+}
+
+
+def _check_param(name, value):
+    """Check that every value of a compaction parameter is valid."""
+    is_valid, message = _VALID_PARAMS[name]
+    if not np.all(is_valid(np.asarray(value, dtype=float))):
+        raise ValueError(message)
+
+
+def _resize_layers(array, n_layers):
+    """Grow an array of layers, filling new layers with zeros."""
+    resized = np.zeros((max(n_layers, 2 * array.shape[0]),) + array.shape[1:])
+    resized[: array.shape[0]] = array
+    return resized
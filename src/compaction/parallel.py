@@ -0,0 +1,252 @@
+"""Compact columns of sediment in parallel."""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, NamedTuple
+
+import numpy as np  # type: ignore
+from scipy.constants import g  # type: ignore
+
+from compaction.compaction import compact as _compact
+
+EXECUTORS = ("serial", "thread", "process")
+
+
+def compact(
+    dz: np.ndarray,
+    porosity: np.ndarray,
+    c: float = 5e-8,
+    rho_grain: float = 2650.0,
+    excess_pressure: float = 0.0,
+    porosity_min: float = 0.0,
+    porosity_max: float = 1.0,
+    rho_void: float = 1000.0,
+    gravity: float = g,
+    return_dz: np.ndarray | None = None,
+    executor: str = "process",
+    workers: int | None = None,
+) -> np.ndarray:
+    """Compact columns of sediment using a pool of workers.
+
+    Columns are split into contiguous ranges, one for each worker. With
+    the *process* executor, inputs and outputs are placed in shared memory
+    blocks so that workers compact their range of columns through views
+    of those blocks rather than through pickled copies of the arrays.
+
+    Parameters
+    ----------
+    dz : ndarray of float
+        Array of sediment thicknesses with depth (the first element is
+        the top of the sediment column) [meters].
+    porosity : ndarray or number
+        Sediment porosity [-].
+    c : ndarray or number, optional
+        Compaction coefficient that describes how easily the sediment is to
+        compact [Pa^-1].
+    rho_grain : ndarray or number, optional
+        Grain density of the sediment [kg / m^3].
+    excess_pressure : ndarray or number, optional
+        Excess pressure with depth [Pa].
+    porosity_min : ndarray or number, optional
+        Minimum porosity that can be achieved by the sediment. This is the
+        porosity of the sediment in its closest-compacted state [-].
+    porosity_max : ndarray or number, optional
+        Maximum porosity of the sediment. This is the porosity of the sediment
+        without any compaction [-].
+    rho_void : ndarray or number, optional
+        Density of the interstitial fluid [kg / m^3].
+    gravity : float, optional
+        Acceleration due to gravity [m / s^2].
+    return_dz : ndarray of float, optional
+        If provided, an output array into which to place the calculated
+        compacted layer thicknesses.
+    executor : {"process", "thread", "serial"}, optional
+        How to run the workers.
+    workers : int, optional
+        Number of workers. The default is the number of CPUs.
+
+    Returns
+    -------
+    porosity : ndarray
+        New porosities after compaction.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from compaction.compaction import compact
+    >>> from compaction import parallel
+
+    >>> dz = np.full((100, 8), 1.0)
+    >>> porosity = np.full((100, 8), 0.5)
+    >>> porosity_new = parallel.compact(
+    ...     dz, porosity, porosity_max=0.5, executor="thread", workers=2
+    ... )
+    >>> np.allclose(porosity_new, compact(dz, porosity, porosity_max=0.5))
+    True
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(
+            f"{executor!r}: executor not understood (not one of {', '.join(EXECUTORS)})"
+        )
+
+    dz, porosity = np.asarray(dz, dtype=float), np.asarray(porosity, dtype=float)
+    if return_dz is not None and (
+        return_dz.dtype is not dz.dtype or return_dz.shape != dz.shape
+    ):
+        raise TypeError(
+            "size and shape of return_dz ({}, {}) must be that of dz ({}, {})".format(
+                return_dz.dtype, return_dz.shape, dz.dtype, dz.shape
+            )
+        )
+
+    params: dict[str, Any] = {
+        "c": c,
+        "rho_grain": rho_grain,
+        "excess_pressure": excess_pressure,
+        "porosity_min": porosity_min,
+        "porosity_max": porosity_max,
+        "rho_void": rho_void,
+        "gravity": gravity,
+    }
+
+    n_columns = dz.shape[-1] if dz.ndim > 1 else 1
+    workers = min(workers or os.cpu_count() or 1, n_columns)
+    if executor == "serial" or workers == 1:
+        return _compact(dz, porosity, return_dz=return_dz, **params)
+
+    bounds = np.linspace(0, n_columns, workers + 1, dtype=int)
+    ranges = list(zip(bounds[:-1], bounds[1:]))
+
+    if executor == "thread":
+        porosity_new = np.empty(np.broadcast_shapes(dz.shape, porosity.shape))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for future in [
+                pool.submit(
+                    _compact_columns,
+                    {"dz": dz, "porosity": porosity, **params},
+                    {"porosity": porosity_new, "dz": return_dz},
+                    start,
+                    stop,
+                )
+                for start, stop in ranges
+            ]:
+                future.result()
+        return porosity_new
+
+    with _SharedArrays() as shared:
+        inputs = {
+            name: shared.copy_of(value) if np.ndim(value) > 0 else value
+            for name, value in ({"dz": dz, "porosity": porosity} | params).items()
+        }
+        outputs = {
+            "porosity": shared.empty(np.broadcast_shapes(dz.shape, porosity.shape))
+        }
+        if return_dz is not None:
+            outputs["dz"] = shared.empty(dz.shape)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in [
+                pool.submit(_compact_shared_columns, inputs, outputs, start, stop)
+                for start, stop in ranges
+            ]:
+                future.result()
+
+        porosity_new = shared.as_array(outputs["porosity"]).copy()
+        if return_dz is not None:
+            return_dz[...] = shared.as_array(outputs["dz"])
+
+    return porosity_new
+
+
+def _compact_columns(inputs, outputs, start, stop):
+    """Compact a range of columns, writing the results to *outputs*."""
+    shape = np.broadcast_shapes(inputs["dz"].shape, inputs["porosity"].shape)
+    kwds = {
+        name: _columns(np.broadcast_to(value, shape), start, stop)
+        if np.ndim(value) > 0
+        else value
+        for name, value in inputs.items()
+    }
+    dz, porosity = kwds.pop("dz"), kwds.pop("porosity")
+
+    porosity_new = _columns(outputs["porosity"], start, stop)
+    if outputs.get("dz") is not None:
+        porosity_new[...] = _compact(
+            dz, porosity, return_dz=_columns(outputs["dz"], start, stop), **kwds
+        )
+    else:
+        porosity_new[...] = _compact(dz, porosity, **kwds)
+
+
+def _compact_shared_columns(inputs, outputs, start, stop):
+    """Compact a range of columns of arrays stored in shared memory."""
+    blocks: list[shared_memory.SharedMemory] = []
+    try:
+        _compact_columns(
+            {name: _attach(value, blocks) for name, value in inputs.items()},
+            {name: _attach(value, blocks) for name, value in outputs.items()},
+            start,
+            stop,
+        )
+    finally:
+        for block in blocks:
+            block.close()
+
+
+def _columns(array, start, stop):
+    """Slice a range of columns from an array."""
+    return array[..., start:stop]
+
+
+def _attach(value, blocks):
+    """Attach to an array stored in shared memory from a worker process."""
+    if not isinstance(value, _SharedArray):
+        return value
+    block = shared_memory.SharedMemory(name=value.name)
+    blocks.append(block)
+    return np.ndarray(value.shape, dtype=float, buffer=block.buf)
+
+
+class _SharedArray(NamedTuple):
+    """Name and shape of an array of floats stored in shared memory."""
+
+    name: str
+    shape: tuple[int, ...]
+
+
+class _SharedArrays:
+    """Blocks of shared memory that are released on exit."""
+
+    def __init__(self):
+        self._blocks: dict[str, shared_memory.SharedMemory] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+    def empty(self, shape) -> _SharedArray:
+        """Allocate a block of shared memory to hold an array."""
+        shape = tuple(shape)
+        block = shared_memory.SharedMemory(
+            create=True, size=max(int(np.prod(shape)) * np.dtype(float).itemsize, 1)
+        )
+        self._blocks[block.name] = block
+        return _SharedArray(block.name, shape)
+
+    def copy_of(self, array) -> _SharedArray:
+        """Copy an array into a new block of shared memory."""
+        array = np.asarray(array, dtype=float)
+        spec = self.empty(array.shape)
+        self.as_array(spec)[...] = array
+        return spec
+
+    def as_array(self, spec: _SharedArray) -> np.ndarray:
+        """View a block of shared memory as an array."""
+        return np.ndarray(spec.shape, dtype=float, buffer=self._blocks[spec.name].buf)
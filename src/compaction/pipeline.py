@@ -0,0 +1,257 @@
+"""Overlap reading, compacting and writing the layers of many files."""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import NamedTuple
+
+from compaction.stages import compute_stage, read_stage, run_metrics, write_stage
+
+STAGES = ("read", "compute", "write")
+
+_DONE = object()
+
+
+class PipelineReport(NamedTuple):
+    """Metrics of a pipelined batch of runs.
+
+    Attributes
+    ----------
+    metrics : list of dict
+        Metrics of each run, in the order of the input files, as
+        returned by :func:`~compaction.cli.run_compaction`.
+    utilization : dict
+        For each stage, the number of workers and the seconds they spent
+        working (*busy*), waiting for something to work on (*starved*)
+        and waiting for space in the queue to the next stage
+        (*blocked*). *utilization* is the fraction of the workers' time
+        that was spent working.
+    seconds : float
+        Wall-clock time of the batch.
+    """
+
+    metrics: list[dict]
+    utilization: dict[str, dict[str, float]]
+    seconds: float
+
+
+class _Stage:
+    """Workers that take items from one queue and put results on another."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        workers: int,
+        inbox: queue.Queue,
+        outbox: queue.Queue | None,
+        failed: threading.Event,
+    ):
+        if workers < 1:
+            raise ValueError(
+                f"{name}: number of workers must be at least 1 ({workers})"
+            )
+
+        self.name = name
+        self.func = func
+        self.inbox = inbox
+        self.outbox = outbox
+        self.failed = failed
+        self.errors: list[BaseException] = []
+        self.busy = self.starved = self.blocked = 0.0
+
+        self._lock = threading.Lock()
+        self._running = workers
+        self._next: _Stage | None = None
+        self._threads = [
+            threading.Thread(target=self._work, name=f"compaction-{name}-{i}")
+            for i in range(workers)
+        ]
+
+    @property
+    def workers(self) -> int:
+        return len(self._threads)
+
+    def feeds(self, stage: _Stage) -> None:
+        """Tell the workers of another stage when this one is done."""
+        self._next = stage
+
+    def start(self) -> None:
+        for thread in self._threads:
+            thread.start()
+
+    def join(self) -> None:
+        for thread in self._threads:
+            thread.join()
+
+    def _work(self) -> None:
+        busy = starved = blocked = 0.0
+
+        while True:
+            start = time.perf_counter()
+            item = self.inbox.get()
+            starved += time.perf_counter() - start
+            if item is _DONE:
+                break
+
+            # After a failure, keep taking items so that no queue stays
+            # full and the workers of every stage get to finish.
+            if self.failed.is_set():
+                continue
+
+            start = time.perf_counter()
+            try:
+                result = self.func(*item)
+            except BaseException as error:
+                with self._lock:
+                    self.errors.append(error)
+                self.failed.set()
+                continue
+            finally:
+                busy += time.perf_counter() - start
+
+            if self.outbox is not None:
+                start = time.perf_counter()
+                self.outbox.put(result)
+                blocked += time.perf_counter() - start
+
+        with self._lock:
+            self.busy += busy
+            self.starved += starved
+            self.blocked += blocked
+            self._running -= 1
+            is_last = self._running == 0
+
+        if is_last and self._next is not None:
+            for _ in range(self._next.workers):
+                self._next.inbox.put(_DONE)
+
+    def utilization(self, seconds: float) -> dict[str, float]:
+        return {
+            "workers": self.workers,
+            "busy": self.busy,
+            "starved": self.starved,
+            "blocked": self.blocked,
+            "utilization": (
+                self.busy / (self.workers * seconds) if seconds > 0.0 else 0.0
+            ),
+        }
+
+
+def run_pipeline(
+    srcs: Iterable[str],
+    dests: Iterable[str],
+    readers: int = 1,
+    workers: int = 1,
+    writers: int = 1,
+    queue_size: int = 2,
+    lithologies: dict | None = None,
+    **kwds,
+) -> PipelineReport:
+    """Compact the layers of many files, overlapping reading, compacting and writing.
+
+    Each stage has its own pool of worker threads, connected to the next
+    stage by a queue. While one file is compacted, the next can be read
+    and the last written. Queues hold at most *queue_size* files so that,
+    if one stage falls behind, the stages before it wait rather than
+    read every file into memory. At most about
+    ``readers + workers + writers + 2 * queue_size`` files are held in
+    memory at once.
+
+    Parameters
+    ----------
+    srcs : iterable of str
+        Paths to input files.
+    dests : iterable of str
+        Paths to output files, one for each input file.
+    readers : int, optional
+        Number of workers that read files.
+    workers : int, optional
+        Number of workers that compact layers.
+    writers : int, optional
+        Number of workers that write files.
+    queue_size : int, optional
+        Number of files that can wait between stages.
+    lithologies : dict, optional
+        Compaction parameters of each lithology, keyed by name (see
+        :func:`~compaction.cli.run_compaction`).
+    **kwds
+        Compaction parameters.
+
+    Returns
+    -------
+    PipelineReport
+        Metrics of each run and the utilization of each stage.
+    """
+    srcs, dests = list(srcs), list(dests)
+    if len(srcs) != len(dests):
+        raise ValueError("number of input and output files must match")
+    if queue_size < 1:
+        raise ValueError(f"queue_size must be at least 1 ({queue_size})")
+
+    def read(index):
+        start = time.perf_counter()
+        data, params = read_stage(srcs[index], lithologies)
+        return index, data, params, time.perf_counter() - start
+
+    def compute(index, data, params, read_time):
+        start = time.perf_counter()
+        result = compute_stage(data, **params, **kwds)
+        return index, data.shape, result, read_time, time.perf_counter() - start
+
+    def write(index, shape, result, read_time, compute_time):
+        start = time.perf_counter()
+        write_stage(dests[index], result, lithologies)
+        metrics[index] = run_metrics(
+            srcs[index],
+            shape[:1] + shape[2:],
+            read_time,
+            compute_time,
+            time.perf_counter() - start,
+        )
+
+    metrics: list[dict] = [{}] * len(srcs)
+    failed = threading.Event()
+
+    funcs: tuple[Callable, ...] = (read, compute, write)
+    inboxes: list[queue.Queue] = [
+        queue.Queue(),
+        queue.Queue(queue_size),
+        queue.Queue(queue_size),
+    ]
+    stages = [
+        _Stage(name, func, n_workers, inbox, outbox, failed)
+        for name, func, n_workers, inbox, outbox in zip(
+            STAGES,
+            funcs,
+            (readers, workers, writers),
+            inboxes,
+            inboxes[1:] + [None],
+        )
+    ]
+    for stage, next_stage in zip(stages, stages[1:]):
+        stage.feeds(next_stage)
+
+    for index in range(len(srcs)):
+        inboxes[0].put((index,))
+    for _ in range(readers):
+        inboxes[0].put(_DONE)
+
+    start = time.perf_counter()
+    for stage in stages:
+        stage.start()
+    for stage in stages:
+        stage.join()
+    seconds = time.perf_counter() - start
+
+    for stage in stages:
+        if stage.errors:
+            raise stage.errors[0]
+
+    return PipelineReport(
+        metrics=metrics,
+        utilization={stage.name: stage.utilization(seconds) for stage in stages},
+        seconds=seconds,
+    )
@@ -0,0 +1,264 @@
+"""Plan how to compact layers of sediment within a memory budget."""
+from __future__ import annotations
+
+import math
+import re
+from typing import NamedTuple
+
+import numpy as np  # type: ignore
+
+STRATEGIES = ("whole", "columns", "layers")
+
+# Bytes used by a call to compact in addition to arrays the size of the layers.
+_OVERHEAD = 1 << 16
+
+_UNITS = {
+    "": 1,
+    "b": 1,
+    "k": 1000,
+    "kb": 1000,
+    "m": 1000**2,
+    "mb": 1000**2,
+    "g": 1000**3,
+    "gb": 1000**3,
+    "t": 1000**4,
+    "tb": 1000**4,
+    "kib": 1024,
+    "mib": 1024**2,
+    "gib": 1024**3,
+    "tib": 1024**4,
+}
+
+
+class MemoryBudgetError(ValueError):
+    """A memory budget is too small to compact a set of layers."""
+
+
+class Plan(NamedTuple):
+    """How to compact layers of sediment.
+
+    Attributes
+    ----------
+    strategy : {"whole", "columns", "layers"}
+        Compact all layers at once (*whole*), blocks of columns (along
+        the last axis), or blocks of layers from the top down, carrying
+        the load of the layers above each block (*layers*).
+    block_size : int
+        Number of columns or layers in each block.
+    n_blocks : int
+        Number of blocks.
+    peak_memory : int
+        Estimate of the peak memory, in bytes, used to compact the layers,
+        including the array of new porosities.
+    max_memory : int or None
+        The memory budget, in bytes.
+    """
+
+    strategy: str
+    block_size: int
+    n_blocks: int
+    peak_memory: int
+    max_memory: int | None
+
+
+def parse_memory(value: int | str) -> int:
+    """Parse an amount of memory, in bytes, that may have units.
+
+    Examples
+    --------
+    >>> from compaction.planning import parse_memory
+    >>> parse_memory(1024), parse_memory("2 MB"), parse_memory("1.5GiB")
+    (1024, 2000000, 1610612736)
+    """
+    if isinstance(value, str):
+        match = re.fullmatch(r"\s*([0-9.]+(?:[eE][0-9]+)?)\s*([a-zA-Z]*)\s*", value)
+        if match is None or match.group(2).lower() not in _UNITS:
+            raise ValueError(f"{value!r}: unable to parse amount of memory")
+        n_bytes = float(match.group(1)) * _UNITS[match.group(2).lower()]
+    else:
+        n_bytes = value
+    if n_bytes < 0:
+        raise ValueError(f"amount of memory must be non-negative ({value})")
+    return int(n_bytes)
+
+
+def estimate_memory(
+    shape: tuple[int, ...],
+    dtype=float,
+    return_dz: bool = False,
+    lithologies: bool = False,
+    outputs: tuple[str, ...] = (),
+) -> int:
+    """Estimate the peak memory used by :func:`~compaction.compaction.compact`.
+
+    The estimate counts the temporary arrays that are created while
+    compacting the layers, and the array of new porosities, but not the
+    input arrays, nor *return_dz*, which are provided by the caller.
+
+    Parameters
+    ----------
+    shape : tuple of int
+        Shape of the layers.
+    dtype : data-type, optional
+        Data type of the layers. Layers that are not double precision are
+        first converted.
+    return_dz : bool, optional
+        If new layer thicknesses are also calculated.
+    lithologies : bool, optional
+        If layers are mixtures of lithologies. Their parameters are
+        weighted by their fractions within the expressions for the load
+        and the porosity, and so need no more memory than those of a
+        single lithology.
+    outputs : tuple of str, optional
+        Names of derived quantities that are also calculated (see
+        :func:`~compaction.compaction.compact`). Their arrays are not
+        counted.
+
+    Returns
+    -------
+    int
+        Peak memory, in bytes.
+
+    Examples
+    --------
+    >>> from compaction.planning import estimate_memory
+    >>> estimate_memory((1000, 1000))
+    32065536
+    >>> estimate_memory((1000, 1000), return_dz=True)
+    42065536
+    """
+    # Number of arrays the size of the layers, measured with tracemalloc:
+    # the load, its cumulative sum, the porosity law and the new porosities.
+    arrays = 4.0
+    if return_dz:
+        arrays += 1.25
+    if np.dtype(dtype) != np.float64:
+        arrays += 2.0
+    # Depths need compacted thicknesses and the depths to both the top
+    # and the bottom of layers, whether or not each is an output.
+    depths = {"depth_to_top", "depth_to_bottom"}.intersection(outputs)
+    if depths and not return_dz:
+        arrays += 1.25
+    if len(depths) == 1:
+        arrays += 1.0
+
+    return _OVERHEAD + int(
+        math.ceil(arrays * math.prod(shape) * np.dtype(np.float64).itemsize)
+    )
+
+
+def plan(
+    shape: tuple[int, ...],
+    max_memory: int | str | None = None,
+    dtype=float,
+    return_dz: bool = False,
+    lithologies: bool = False,
+    outputs: tuple[str, ...] = (),
+) -> Plan:
+    """Choose how to compact layers so that they fit within a memory budget.
+
+    If compacting all the layers at once would use more than *max_memory*,
+    the layers are split into blocks. Blocks of columns are preferred, as
+    columns are independent and so results are the same as if compacted
+    all at once. If even a single column does not fit (for example, a
+    single, very deep column), layers are split into blocks of layers
+    compacted from the top down, carrying the load of the layers above
+    from one block to the next. The array of new porosities is always
+    allocated in full.
+
+    Parameters
+    ----------
+    shape : tuple of int
+        Shape of the layers.
+    max_memory : int or str, optional
+        Memory budget in bytes, or a string with units (for example,
+        ``"2 GiB"``). If not given, all layers are compacted at once.
+    dtype, return_dz, lithologies, outputs : optional
+        See :func:`estimate_memory`.
+
+    Returns
+    -------
+    Plan
+        The chosen strategy.
+
+    Raises
+    ------
+    MemoryBudgetError
+        If the budget cannot hold the new porosities and a single layer.
+
+    Examples
+    --------
+    >>> from compaction.planning import plan
+    >>> plan((1000, 1000)).strategy
+    'whole'
+
+    >>> memory_plan = plan((1000, 1000), max_memory="16 MB")
+    >>> memory_plan.strategy, memory_plan.block_size, memory_plan.n_blocks
+    ('columns', 200, 5)
+    >>> memory_plan.peak_memory <= memory_plan.max_memory
+    True
+
+    A single, deep column is split into blocks of layers.
+
+    >>> plan((1000000,), max_memory="16 MB")[:3]
+    ('layers', 200000, 5)
+    """
+    shape = tuple(shape)
+    kwds = {
+        "dtype": dtype,
+        "return_dz": return_dz,
+        "lithologies": lithologies,
+        "outputs": outputs,
+    }
+
+    n_layers = shape[0] if shape else 1
+    peak_memory = estimate_memory(shape, **kwds)
+    if max_memory is None:
+        return Plan("whole", n_layers, 1, peak_memory, None)
+
+    max_memory = parse_memory(max_memory)
+    if peak_memory <= max_memory:
+        return Plan("whole", n_layers, 1, peak_memory, max_memory)
+
+    output = math.prod(shape) * np.dtype(np.float64).itemsize + _OVERHEAD
+    available = max_memory - output
+
+    if len(shape) > 1:
+        n_columns = shape[-1]
+        per_column = estimate_memory(shape[:-1] + (1,), **kwds) - _OVERHEAD
+        block_size = min(available // per_column, n_columns) if available > 0 else 0
+        if block_size >= 1:
+            n_blocks, block_size = _balanced_blocks(n_columns, block_size)
+            return Plan(
+                "columns",
+                block_size,
+                n_blocks,
+                output + block_size * per_column,
+                max_memory,
+            )
+
+    per_layer = estimate_memory((1,) + shape[1:], **kwds) - _OVERHEAD
+    # The load carried from one block to the next, its compensation, and
+    # the load of the block.
+    carried = 3 * math.prod(shape[1:]) * np.dtype(np.float64).itemsize
+    block_size = (available - carried) // per_layer if available > carried else 0
+    if block_size < 1:
+        raise MemoryBudgetError(
+            f"max_memory is too small to compact layers of shape {shape}"
+            f" (needs at least {output + carried + per_layer} bytes, not {max_memory})"
+        )
+    n_blocks, block_size = _balanced_blocks(n_layers, block_size)
+
+    return Plan(
+        "layers",
+        block_size,
+        n_blocks,
+        output + carried + block_size * per_layer,
+        max_memory,
+    )
+
+
+def _balanced_blocks(n: int, max_block_size: int) -> tuple[int, int]:
+    """Fewest blocks of at most a given size, with sizes as equal as possible."""
+    n_blocks = max(1, -(-n // max(1, min(max_block_size, n))))
+    return n_blocks, max(1, -(-n // n_blocks))
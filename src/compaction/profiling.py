@@ -0,0 +1,175 @@
+"""Record where time is spent compacting sediment."""
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from types import ModuleType
+
+resource: ModuleType | None
+try:
+    import resource
+except ModuleNotFoundError:  # pragma: no cover
+    resource = None
+
+_ACTIVE: list[Profile] = []
+
+
+class Profile:
+    """Timings, allocations and sizes of instrumented calls.
+
+    Examples
+    --------
+    >>> from compaction.profiling import Profile
+
+    >>> stats = Profile()
+    >>> stats.add_call(layers=10, columns=5)
+    >>> stats.add("load", 0.25, nbytes=400)
+    >>> stats.add("load", 0.5, nbytes=400)
+    >>> stats.as_dict()
+    {'calls': 1, 'layers': 10, 'columns': 5, 'stages': {'load': {'calls': 2, 'seconds': 0.75, 'bytes': 800}}}
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.layers = 0
+        self.columns = 0
+        self.stages: dict[str, dict[str, float]] = {}
+
+    def add_call(self, layers: int, columns: int) -> None:
+        """Record a call that processed a number of layers and columns."""
+        with self._lock:
+            self.calls += 1
+            self.layers += layers
+            self.columns += columns
+
+    def add(self, stage: str, seconds: float, nbytes: int = 0) -> None:
+        """Record the time spent, and bytes allocated, by a stage."""
+        with self._lock:
+            totals = self.stages.setdefault(
+                stage, {"calls": 0, "seconds": 0.0, "bytes": 0}
+            )
+            totals["calls"] += 1
+            totals["seconds"] += seconds
+            totals["bytes"] += nbytes
+
+    def clear(self) -> None:
+        """Discard everything that has been recorded."""
+        with self._lock:
+            self.calls = self.layers = self.columns = 0
+            self.stages.clear()
+
+    def as_dict(self) -> dict:
+        """Everything that has been recorded, as plain-old-python objects."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "layers": self.layers,
+                "columns": self.columns,
+                "stages": {name: dict(totals) for name, totals in self.stages.items()},
+            }
+
+    def to_json(self) -> str:
+        """Everything that has been recorded, as a JSON string."""
+        return json.dumps(self.as_dict())
+
+
+class StageTimer:
+    """Time consecutive stages of a single instrumented call."""
+
+    __slots__ = ("_profiles", "_last")
+
+    def __init__(self, profiles: list[Profile]):
+        self._profiles = profiles
+        self._last = time.perf_counter()
+
+    def __call__(self, stage: str, nbytes: int = 0) -> None:
+        """Record the stage that ends now and began when the last one ended."""
+        now = time.perf_counter()
+        for profile in self._profiles:
+            profile.add(stage, now - self._last, nbytes=nbytes)
+        self._last = time.perf_counter()
+
+
+def peak_rss() -> int | None:
+    """Peak resident set size of the current process, in bytes.
+
+    Returns ``None`` on platforms without the :mod:`resource` module.
+
+    Examples
+    --------
+    >>> from compaction.profiling import peak_rss
+    >>> peak_rss() > 0
+    True
+    """
+    if resource is None:  # pragma: no cover
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def start(shape: tuple[int, ...]) -> StageTimer | None:
+    """Start timing a call that processes an array of a given shape.
+
+    Returns ``None``, and so costs almost nothing, if no profile is
+    active.
+    """
+    if not _ACTIVE:
+        return None
+
+    layers = shape[0] if len(shape) > 0 else 1
+    columns = 1
+    for dim in shape[1:]:
+        columns *= dim
+    for profile in _ACTIVE:
+        profile.add_call(layers=layers, columns=columns)
+
+    return StageTimer(list(_ACTIVE))
+
+
+def timer() -> StageTimer | None:
+    """Start timing stages without recording a call.
+
+    Returns ``None``, and so costs almost nothing, if no profile is
+    active.
+    """
+    return StageTimer(list(_ACTIVE)) if _ACTIVE else None
+
+
+@contextmanager
+def profile(stats: Profile | None = None) -> Iterator[Profile]:
+    """Record instrumented calls made within a context.
+
+    Parameters
+    ----------
+    stats : Profile, optional
+        Add records to an existing profile rather than a new one.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from compaction.compaction import compact
+    >>> from compaction.profiling import profile
+
+    >>> dz = np.full((100, 10), 1.0)
+    >>> porosity = np.full((100, 10), 0.5)
+    >>> with profile() as stats:
+    ...     _ = compact(dz, porosity, return_dz=np.empty_like(dz))
+    >>> stats.calls, stats.layers, stats.columns
+    (1, 100, 10)
+    >>> sorted(stats.stages)
+    ['cumsum', 'dz', 'exp', 'load']
+    """
+    if stats is None:
+        stats = Profile()
+
+    _ACTIVE.append(stats)
+    try:
+        yield stats
+    finally:
+        _ACTIVE.remove(stats)
@@ -0,0 +1,232 @@
+"""Resample layers of sediment onto a fixed grid of depths."""
+from __future__ import annotations
+
+import numpy as np  # type: ignore
+
+_BLOCK_SIZE = 1 << 16
+
+
+def resample_to_depth(dz, porosity, depths, out: np.ndarray | None = None):
+    """Resample the porosity of layers onto intervals of a depth grid.
+
+    The porosity of each interval is the thickness-weighted mean porosity
+    of the layers, or parts of layers, that lie within it. Depths of the
+    layer boundaries come from the cumulative thickness of each column,
+    as does the cumulative thickness of pore space, which changes
+    linearly within a layer. A single ``searchsorted`` over a block of
+    columns, offset from one another so that they are sorted end to end,
+    finds the layer that contains each depth of the grid. Blocks are
+    small enough that their temporary arrays stay in cache. Intervals that lie
+    partly below the bottom of a column are averaged over the part that
+    contains sediment. Intervals that contain no sediment are NaN.
+
+    Parameters
+    ----------
+    dz : ndarray of float
+        Array of sediment thicknesses with depth (the first element is
+        the top of the sediment column) [meters].
+    porosity : ndarray or number
+        Sediment porosity [-].
+    depths : ndarray of float
+        Depths of the edges of the intervals, increasing down the
+        column, measured from the top of each column [meters]. Either
+        the same depths for every column, or an array with one more
+        dimension for depths that differ from column to column (for
+        example, a grid of elevations subtracted from the elevation of
+        each column's surface).
+    out : ndarray of float, optional
+        If provided, an output array into which to place the porosities.
+
+    Returns
+    -------
+    ndarray of float
+        Porosity of each interval, with one fewer element along the first
+        axis than *depths*.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from compaction.resample import resample_to_depth
+
+    >>> dz = np.array([1.0, 3.0, 2.0])
+    >>> porosity = np.array([0.5, 0.3, 0.1])
+    >>> resample_to_depth(dz, porosity, [0.0, 2.0, 4.0, 8.0])
+    array([0.4, 0.3, 0.1])
+
+    Intervals below the sediment have no porosity.
+
+    >>> resample_to_depth(dz, porosity, [5.0, 6.0, 7.0])
+    array([0.1, nan])
+    """
+    dz = np.asarray(dz, dtype=float)
+    porosity = np.broadcast_to(porosity, dz.shape)
+    depths = np.asarray(depths, dtype=float)
+
+    n_layers, columns = dz.shape[0], dz.shape[1:]
+    n_columns = int(np.prod(columns))
+    if depths.ndim != 1:
+        depths = np.broadcast_to(depths, depths.shape[:1] + columns)
+
+    if depths.shape[0] < 2:
+        raise ValueError("depths must have at least two edges")
+    if np.any(np.diff(depths, axis=0) < 0.0):
+        raise ValueError("depths must increase down the column")
+
+    if out is None:
+        out = np.empty((depths.shape[0] - 1,) + columns)
+    elif out.shape != (depths.shape[0] - 1,) + columns:
+        raise ValueError(
+            f"out has the wrong shape ({out.shape} != "
+            f"{(depths.shape[0] - 1,) + columns})"
+        )
+
+    if n_layers == 0 or n_columns == 0:
+        out.fill(np.nan)
+        return out
+
+    dz = dz.reshape((n_layers, n_columns))
+    porosity = porosity.reshape((n_layers, n_columns))
+    depths = depths.reshape((depths.shape[0], -1))
+    resampled = out.reshape((out.shape[0], n_columns))
+    if not np.shares_memory(resampled, out):
+        resampled = np.empty_like(resampled)
+
+    # Resample blocks of columns small enough that temporary arrays
+    # stay in cache.
+    block_size = max(16, _BLOCK_SIZE // (n_layers + len(depths)))
+    for start in range(0, n_columns, block_size):
+        block = slice(start, start + block_size)
+        _resample_columns(
+            dz[:, block],
+            porosity[:, block],
+            depths if depths.shape[1] == 1 else depths[:, block],
+            resampled[:, block],
+        )
+
+    if not np.shares_memory(resampled, out):
+        out[...] = resampled.reshape(out.shape)
+
+    return out
+
+
+def resample_to_depth_by_chunk(
+    dz, porosity, depths, out: np.ndarray | None = None, chunk_size: int = 4096
+):
+    """Resample layers onto a depth grid, a chunk of columns at a time.
+
+    Each chunk of *chunk_size* columns is read from the input arrays
+    into memory, resampled, and written to *out* before the next chunk
+    is read. This suits stacks of layers that are larger than memory,
+    such as memory-mapped arrays (for example, from
+    ``np.load(path, mmap_mode="r")``), which are then read from disk
+    once, a chunk at a time. *out* can likewise be memory-mapped (for
+    example, from ``np.lib.format.open_memmap``).
+
+    Parameters
+    ----------
+    dz : ndarray of float
+        Array of sediment thicknesses with depth (the first element is
+        the top of the sediment column) [meters].
+    porosity : ndarray or number
+        Sediment porosity [-].
+    depths : ndarray of float
+        Depths of the edges of the intervals (see
+        :func:`resample_to_depth`) [meters].
+    out : ndarray of float, optional
+        If provided, an output array into which to place the porosities.
+    chunk_size : int, optional
+        Number of columns to resample at a time.
+
+    Returns
+    -------
+    ndarray of float
+        Porosity of each interval.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from compaction.resample import resample_to_depth_by_chunk
+
+    >>> dz = np.full((4, 5), 1.0)
+    >>> resample_to_depth_by_chunk(dz, 0.5, [0.0, 2.0, 4.0], chunk_size=2)
+    array([[0.5, 0.5, 0.5, 0.5, 0.5],
+           [0.5, 0.5, 0.5, 0.5, 0.5]])
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1 ({chunk_size})")
+
+    n_layers, columns = dz.shape[0], dz.shape[1:]
+    n_columns = int(np.prod(columns))
+    depths = np.asarray(depths, dtype=float)
+    if depths.ndim != 1:
+        depths = np.broadcast_to(depths, depths.shape[:1] + columns)
+
+    if out is None:
+        out = np.empty((depths.shape[0] - 1,) + columns)
+
+    porosity = np.broadcast_to(porosity, dz.shape).reshape((n_layers, n_columns))
+    dz = dz.reshape((n_layers, n_columns))
+    if depths.ndim != 1:
+        depths = depths.reshape((depths.shape[0], n_columns))
+
+    resampled = out.reshape((out.shape[0], n_columns))
+    if not np.shares_memory(resampled, out):
+        raise ValueError("out must be a contiguous array")
+
+    for start in range(0, n_columns, chunk_size):
+        chunk = slice(start, start + chunk_size)
+        resample_to_depth(
+            np.array(dz[:, chunk], dtype=float),
+            np.array(porosity[:, chunk], dtype=float),
+            depths if depths.ndim == 1 else depths[:, chunk],
+            out=resampled[:, chunk],
+        )
+
+    return out
+
+
+def _resample_columns(dz, porosity, depths, out):
+    """Resample columns of layers, given as 2D arrays, onto depths."""
+    n_layers, n_columns = dz.shape
+
+    top = np.zeros((n_layers + 1, n_columns))
+    np.cumsum(dz, axis=0, out=top[1:])
+    pores = np.zeros((n_layers + 1, n_columns))
+    np.multiply(dz, porosity, out=pores[1:])
+    np.cumsum(pores[1:], axis=0, out=pores[1:])
+
+    depth = np.clip(depths, 0.0, top[-1])
+
+    layer = _searchsorted_by_column(top, depth)
+    np.clip(layer, 0, n_layers - 1, out=layer)
+
+    columns = np.arange(n_columns)
+    pores_above = pores[layer, columns] + porosity[layer, columns] * (
+        depth - top[layer, columns]
+    )
+
+    sediment = np.diff(depth, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[...] = np.where(
+            sediment > 0.0, np.diff(pores_above, axis=0) / sediment, np.nan
+        )
+
+
+def _searchsorted_by_column(sorted_columns, values):
+    """Index of the last element of each column that is no greater than each value.
+
+    Columns are offset from one another so that, end to end, they form a
+    single sorted array that can be searched at once.
+    """
+    n_rows, n_columns = sorted_columns.shape
+    span = 2.0 * max(np.abs(sorted_columns).max(), np.abs(values).max()) + 1.0
+    offset = span * np.arange(n_columns)
+
+    index = np.searchsorted(
+        (sorted_columns.T + offset.reshape((-1, 1))).reshape(-1),
+        (values + offset).T.reshape(-1),
+        side="right",
+    )
+    index -= 1 + n_rows * np.repeat(np.arange(n_columns), values.shape[0])
+
+    return index.reshape((n_columns, -1)).T
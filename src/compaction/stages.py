@@ -0,0 +1,170 @@
+"""Read, compact and write the layers of a file, one stage at a time."""
+from __future__ import annotations
+
+import os
+
+import numpy as np  # type: ignore
+
+from compaction import profiling
+from compaction.compaction import compact as _compact
+
+
+def example_layers() -> np.ndarray:
+    """Layers of the example input file written by ``compaction generate``.
+
+    Returns
+    -------
+    ndarray of shape (n_layers, 2)
+        Thickness and porosity of each layer, top layer first.
+
+    Examples
+    --------
+    >>> from compaction.stages import example_layers
+    >>> example_layers()
+    array([[100. ,   0.5],
+           [100. ,   0.5],
+           [100. ,   0.5]])
+    """
+    return np.array([[100.0, 0.5], [100.0, 0.5], [100.0, 0.5]])
+
+
+def load_table(src) -> np.ndarray:
+    """Load the columns of a file of layers.
+
+    The first two columns are layer thickness and porosity. Any others
+    are the fraction of each layer made up of each lithology.
+
+    Parameters
+    ----------
+    src : str or file-like
+        Path to, or opened, CSV file with one row for each layer (the
+        first row is the top of the column). Paths that end with *.npy*
+        are read as binary NumPy files.
+
+    Returns
+    -------
+    ndarray of shape (n_layers, n_columns)
+        Columns of the file.
+    """
+    if is_binary(src):
+        return np.load(src)
+
+    return np.loadtxt(src, dtype=float, delimiter=",", comments="#", ndmin=2)
+
+
+def save_table(dest, data: np.ndarray, header: str) -> None:
+    """Write the columns of layers to a CSV file.
+
+    Values are written with :func:`repr` and so can be read back
+    exactly.
+
+    Parameters
+    ----------
+    dest : str
+        Path to the output file.
+    data : ndarray of shape (n_layers, n_columns)
+        Columns to write.
+    header : str
+        Comment written as the first line of the file.
+    """
+    columns = [map(repr, column) for column in data.T.tolist()]
+    with open(dest, "w") as fp:
+        print(f"# {header}", file=fp)
+        fp.write("".join(line + "\n" for line in map(",".join, zip(*columns))))
+
+
+def is_binary(path) -> bool:
+    """Check if a path is to a binary NumPy file."""
+    return isinstance(path, (str, os.PathLike)) and str(path).endswith(".npy")
+
+
+def read_stage(src, lithologies: dict | None = None) -> tuple[np.ndarray, dict]:
+    """Read the layers of a file and the parameters to compact them with.
+
+    Parameters
+    ----------
+    src : str or file-like
+        File of layers, as read by :func:`load_table`.
+    lithologies : dict, optional
+        Compaction parameters of each lithology, keyed by name, that
+        match the fraction columns of the file.
+
+    Returns
+    -------
+    tuple of (ndarray, dict)
+        Columns of the file and the keywords to pass to
+        :func:`compute_stage`.
+    """
+    data = load_table(src)
+    if not lithologies:
+        return data, {}
+
+    fractions = data[:, 2:].T
+    if len(fractions) != len(lithologies):
+        raise ValueError(
+            f"{src}: expected a fraction column for each of {len(lithologies)}"
+            f" lithologies (found {len(fractions)})"
+        )
+    return data, {"lithologies": list(lithologies.values()), "fractions": fractions}
+
+
+def compute_stage(data: np.ndarray, **kwds) -> np.ndarray:
+    """Compact layers read by :func:`read_stage` into columns to write."""
+    dz, porosity = data[:, 0], data[:, 1]
+
+    dz_new = np.empty_like(dz)
+    porosity_new = _compact(dz, porosity, return_dz=dz_new, **kwds)
+
+    return np.column_stack((dz_new, porosity_new) + tuple(data[:, 2:].T))
+
+
+def write_stage(dest, result: np.ndarray, lithologies: dict | None = None) -> None:
+    """Write the columns of compacted layers to a file."""
+    if is_binary(dest):
+        np.save(dest, result)
+    else:
+        save_table(
+            dest,
+            result,
+            header=", ".join(
+                ["Layer Thickness [m]", "Porosity [-]"]
+                + [f"{name.capitalize()} Fraction [-]" for name in lithologies or ()]
+            ),
+        )
+
+
+def run_metrics(
+    src, shape: tuple[int, ...], read: float, compute: float, write: float
+) -> dict:
+    """Metrics of a run from the time spent in each of its stages.
+
+    Parameters
+    ----------
+    src : str or file-like
+        Input file of the run.
+    shape : tuple of int
+        Number of layers followed by the shape of the columns.
+    read, compute, write : float
+        Seconds spent in each stage.
+
+    Returns
+    -------
+    dict
+        Metrics of the run, as returned by
+        :func:`~compaction.cli.run_compaction`.
+    """
+    seconds = read + compute + write
+    n_layers = shape[0]
+
+    return {
+        "src": str(src),
+        "bytes": os.path.getsize(src) if isinstance(src, (str, os.PathLike)) else None,
+        "layers": n_layers,
+        "columns": int(np.prod(shape[1:])),
+        "read": read,
+        "compute": compute,
+        "write": write,
+        "seconds": seconds,
+        "layers_per_second": n_layers / seconds if seconds > 0.0 else None,
+        "peak_rss": profiling.peak_rss(),
+    }
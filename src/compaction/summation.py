@@ -0,0 +1,142 @@
+"""Cumulative sums of layer loads that stay accurate for deep columns."""
+from __future__ import annotations
+
+import numpy as np  # type: ignore
+
+METHODS = ("cumsum", "pairwise", "kahan")
+
+
+def exclusive_cumsum(
+    x: np.ndarray,
+    method: str = "pairwise",
+    block_size: int = 128,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """Sum the elements that come before each element along the first axis.
+
+    The *cumsum* method subtracts each element from the inclusive
+    cumulative sum calculated by :func:`numpy.cumsum`. For deep columns,
+    that is a large number minus a small one, and the rounding error of
+    the running sum grows with the number of elements.
+
+    The *pairwise* and *kahan* methods calculate the exclusive sum
+    directly, in blocks. Within a block, elements are summed with
+    :func:`numpy.cumsum` and so errors are limited to the size of a
+    block. Block totals are then carried from one block to the next
+    either by summing them recursively in the same way (*pairwise*) or
+    with compensated (Kahan) summation (*kahan*). Either way, the error
+    no longer grows with the number of elements, which makes single
+    precision storage usable for deep columns.
+
+    Parameters
+    ----------
+    x : ndarray
+        Values to sum. The sum is along the first axis.
+    method : {"pairwise", "kahan", "cumsum"}, optional
+        Summation method.
+    block_size : int, optional
+        Number of elements in each block.
+    out : ndarray, optional
+        If provided, an output array into which to place the sums.
+
+    Returns
+    -------
+    ndarray
+        The sum of the elements before each element. The first element
+        is always zero.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from compaction.summation import exclusive_cumsum
+
+    >>> exclusive_cumsum(np.arange(1.0, 6.0), block_size=2)
+    array([ 0.,  1.,  3.,  6., 10.])
+
+    Sum ten million values in single precision (the exact sum of the
+    values that come before the last is one million).
+
+    >>> x = np.full(10_000_000, 0.1, dtype=np.float32)
+    >>> int(exclusive_cumsum(x, method="cumsum")[-1])
+    1087936
+    >>> int(exclusive_cumsum(x, method="pairwise")[-1])
+    1000002
+    >>> int(exclusive_cumsum(x, method="kahan")[-1])
+    1000000
+    """
+    if method not in METHODS:
+        raise ValueError(
+            f"{method!r}: summation method not understood (not one of {', '.join(METHODS)})"
+        )
+    if block_size < 2:
+        raise ValueError(f"block_size must be at least 2 ({block_size})")
+
+    x = np.asarray(x)
+    if out is None:
+        out = np.empty_like(x, order="C")
+
+    if x.ndim == 0 or x.shape[0] == 0:
+        out[...] = 0
+        return out
+
+    if method == "cumsum":
+        np.cumsum(x, axis=0, out=out)
+        out -= x
+    elif x.shape[0] <= block_size:
+        _exclusive_cumsum_of_block(x, out)
+    elif out.flags.c_contiguous:
+        _blocked_exclusive_cumsum(x, out, method, block_size)
+    else:
+        out[...] = _blocked_exclusive_cumsum(
+            x, np.empty(x.shape, dtype=out.dtype), method, block_size
+        )
+
+    return out
+
+
+def _exclusive_cumsum_of_block(x: np.ndarray, out: np.ndarray) -> None:
+    """Exclusive cumulative sum of a small number of elements."""
+    out[0] = 0
+    np.cumsum(x[:-1], axis=0, out=out[1:])
+
+
+def _blocked_exclusive_cumsum(
+    x: np.ndarray, out: np.ndarray, method: str, block_size: int
+) -> np.ndarray:
+    """Exclusive cumulative sum, in blocks, into a C-contiguous array."""
+    n_blocks = x.shape[0] // block_size
+    n_blocked = n_blocks * block_size
+
+    blocks = x[:n_blocked].reshape((n_blocks, block_size) + x.shape[1:])
+    out_blocks = out[:n_blocked].reshape(blocks.shape)
+
+    np.cumsum(blocks, axis=1, out=out_blocks)
+    totals = out_blocks[:, -1].copy()
+    out_blocks -= blocks
+
+    if method == "pairwise":
+        offsets = exclusive_cumsum(totals, method="pairwise", block_size=block_size)
+    else:
+        offsets = _kahan_exclusive_cumsum(totals)
+    out_blocks += offsets[:, np.newaxis]
+
+    if n_blocked < x.shape[0]:
+        tail = out[n_blocked:]
+        _exclusive_cumsum_of_block(x[n_blocked:], tail)
+        tail += offsets[-1] + totals[-1]
+
+    return out
+
+
+def _kahan_exclusive_cumsum(x: np.ndarray) -> np.ndarray:
+    """Exclusive cumulative sum with compensated (Kahan) summation."""
+    out = np.empty_like(x)
+    total = np.zeros_like(x[0])
+    compensation = np.zeros_like(x[0])
+    for i in range(x.shape[0]):
+        out[i] = total
+        value = x[i] - compensation
+        new_total = total + value
+        compensation = (new_total - total) - value
+        total = new_total
+    return out
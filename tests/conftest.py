@@ -0,0 +1,21 @@
+"""Fixtures shared by the unit tests."""
+import numpy as np  # type: ignore
+from pytest import fixture  # type: ignore
+
+
+@fixture()
+def layers_shape():
+    """Shape of the random layers of :func:`layers`.
+
+    Override this fixture in a module, or parametrize a test with it, for
+    layers of another shape.
+    """
+    return (100, 30)
+
+
+@fixture()
+def layers(layers_shape):
+    """Thicknesses and porosities of random layers of sediment."""
+    rng = np.random.default_rng(1945)
+    dz = rng.uniform(0.5, 2.0, layers_shape)
+    return dz, rng.uniform(0.3, 0.6, layers_shape)
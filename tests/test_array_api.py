@@ -0,0 +1,108 @@
+"""Unit tests for compacting arrays of array API libraries."""
+import numpy as np  # type: ignore
+from pytest import approx, fixture, importorskip, mark, raises  # type: ignore
+
+from compaction.array_api import compacted_layers, is_array_api_obj
+from compaction.compaction import compact
+
+xp = importorskip("array_api_strict")
+
+
+@fixture()
+def layers_shape():
+    return (50, 4)
+
+
+def test_is_array_api_obj():
+    assert is_array_api_obj(xp.ones(3))
+    assert not is_array_api_obj(np.ones(3))
+    assert not is_array_api_obj(1.0)
+
+
+@mark.parametrize("layers_shape", ((50,), (50, 4)))
+def test_matches_numpy(layers, layers_shape):
+    dz, phi = layers
+    dz_expected = np.empty_like(dz)
+    phi_expected = compact(dz, phi, porosity_max=0.6, return_dz=dz_expected)
+
+    dz_actual = xp.empty(layers_shape, dtype=xp.float64)
+    phi_actual = compact(
+        xp.asarray(dz), xp.asarray(phi), porosity_max=0.6, return_dz=dz_actual
+    )
+
+    assert is_array_api_obj(phi_actual)
+    assert np.asarray(phi_actual) == approx(phi_expected)
+    assert np.asarray(dz_actual) == approx(dz_expected)
+
+
+def test_array_params(layers):
+    dz, phi = layers
+    params = {
+        "c": np.linspace(1e-8, 1e-7, 4),
+        "porosity_min": np.full((50, 1), 0.1),
+        "excess_pressure": np.full(dz.shape, 1e3),
+    }
+    phi_expected = compact(dz, phi, porosity_max=0.6, **params)
+
+    phi_actual = compact(
+        xp.asarray(dz),
+        xp.asarray(phi),
+        porosity_max=0.6,
+        **{name: xp.asarray(value) for name, value in params.items()},
+    )
+    assert np.asarray(phi_actual) == approx(phi_expected)
+
+
+def test_all_void():
+    phi_new, dz_new = compacted_layers(
+        xp.full(10, 1000.0), xp.full(10, 1.0), porosity_max=1.0
+    )
+    assert np.all(np.asarray(dz_new) == 0.0)
+    assert np.all(np.asarray(phi_new) == 1.0)
+
+
+def test_lithologies(layers):
+    dz, phi = layers
+    sand = {"c": 1e-8, "porosity_max": 0.45}
+    shale = {"c": 5e-8, "porosity_max": 0.65}
+    fraction = np.linspace(0.0, 1.0, 50).reshape((-1, 1)) * np.ones(4)
+    fractions = np.stack((fraction, 1.0 - fraction))
+
+    phi_expected = compact(dz, phi, lithologies=[sand, shale], fractions=fractions)
+    phi_actual = compact(
+        xp.asarray(dz),
+        xp.asarray(phi),
+        lithologies=[sand, shale],
+        fractions=xp.asarray(fractions),
+    )
+    assert np.asarray(phi_actual) == approx(phi_expected)
+
+
+@mark.parametrize("kwds", ({"summation": "kahan"}, {"axis": 1}))
+def test_numpy_only_options(layers, kwds):
+    dz, phi = layers
+    with raises(ValueError):
+        compact(xp.asarray(dz), xp.asarray(phi), **kwds)
+
+
+def test_bad_return_dz(layers):
+    dz, phi = layers
+    with raises(TypeError):
+        compact(xp.asarray(dz), xp.asarray(phi), return_dz=xp.empty(3))
+
+
+class _ImmutableArray:
+    """An array that, like a JAX array, does not support item assignment."""
+
+    def __init__(self, array):
+        self.dtype, self.shape = array.dtype, array.shape
+
+    def __setitem__(self, key, value):
+        raise TypeError("does not support item assignment")
+
+
+def test_immutable_return_dz(layers):
+    dz, phi = layers
+    return_dz = _ImmutableArray(xp.empty(dz.shape, dtype=xp.float64))
+    with raises(TypeError, match="return_dz must be an array that can be written to"):
+        compact(xp.asarray(dz), xp.asarray(phi), return_dz=return_dz)
@@ -0,0 +1,133 @@
+"""Unit tests for the compaction Basic Model Interface."""
+import shutil
+
+import numpy as np  # type: ignore
+from numpy.testing import assert_array_almost_equal  # type: ignore
+from pytest import approx, importorskip, raises  # type: ignore
+
+from compaction.cli import load_config, load_layers
+from compaction.compaction import compact
+
+importorskip("bmipy")
+from compaction.bmi import BmiCompaction  # noqa: E402
+
+
+class StubCoupler:
+    """A framework that exchanges data with a model through pointers."""
+
+    def __init__(self, model):
+        self.model = model
+        self.dz = model.get_value_ptr("sediment_layer__thickness")
+        self.porosity = model.get_value_ptr("sediment_layer__porosity")
+
+    def step(self, top_porosity):
+        self.model.set_value_at_indices(
+            "sediment_layer__porosity", np.array([0]), np.array([top_porosity])
+        )
+        self.model.update()
+        return self.dz.sum()
+
+
+def test_initialize_from_file(tmpdir, datadir):
+    with tmpdir.as_cwd():
+        shutil.copy(datadir / "compaction.toml", ".")
+        shutil.copy(datadir / "porosity.csv", ".")
+
+        model = BmiCompaction()
+        model.initialize(str(tmpdir / "compaction.toml"))
+
+        dz, porosity = load_layers("porosity.csv")
+
+    assert_array_almost_equal(model.get_value_ptr("sediment_layer__thickness"), dz)
+    assert_array_almost_equal(model.get_value_ptr("sediment_layer__porosity"), porosity)
+
+
+def test_stub_coupler_many_steps(tmpdir, datadir):
+    with tmpdir.as_cwd():
+        shutil.copy(datadir / "compaction.toml", ".")
+        shutil.copy(datadir / "porosity.csv", ".")
+
+        model = BmiCompaction()
+        model.initialize("compaction.toml")
+
+        with open("compaction.toml") as fp:
+            params = load_config(fp)["constants"]
+        dz, porosity = load_layers("porosity.csv")
+
+    coupler = StubCoupler(model)
+    dz_ptr, porosity_ptr = coupler.dz, coupler.porosity
+
+    for step in range(100):
+        top_porosity = 0.6 - step * 1e-3
+        thickness = coupler.step(top_porosity)
+
+        porosity[0] = top_porosity
+        porosity[:] = compact(dz, porosity, return_dz=dz, **params)
+
+        assert model.get_value_ptr("sediment_layer__thickness") is dz_ptr
+        assert model.get_value_ptr("sediment_layer__porosity") is porosity_ptr
+        assert thickness == approx(dz.sum())
+        assert_array_almost_equal(porosity_ptr, porosity)
+        assert_array_almost_equal(dz_ptr, dz)
+
+    assert model.get_current_time() == approx(100.0)
+
+
+def test_set_value_is_in_place():
+    model = BmiCompaction()
+    model.initialize()
+
+    ptr = model.get_value_ptr("sediment_layer__porosity")
+    model.set_value("sediment_layer__porosity", np.array([0.3, 0.2, 0.1]))
+
+    assert model.get_value_ptr("sediment_layer__porosity") is ptr
+    assert_array_almost_equal(ptr, [0.3, 0.2, 0.1])
+
+
+def test_get_value():
+    model = BmiCompaction()
+    model.initialize()
+
+    dest = np.empty(model.get_grid_size(0))
+    model.get_value("sediment_layer__thickness", dest)
+    assert_array_almost_equal(dest, [100.0, 100.0, 100.0])
+
+    dest = np.empty(2)
+    model.get_value_at_indices("sediment_layer__thickness", dest, np.array([0, 2]))
+    assert_array_almost_equal(dest, [100.0, 100.0])
+
+
+def test_var_info():
+    model = BmiCompaction()
+    model.initialize()
+
+    for name in model.get_output_var_names():
+        assert model.get_var_grid(name) == 0
+        assert model.get_var_type(name) == "float64"
+        assert model.get_var_itemsize(name) == 8
+        assert model.get_var_nbytes(name) == 8 * model.get_grid_size(0)
+        assert model.get_var_location(name) == "node"
+    assert model.get_var_units("sediment_layer__thickness") == "m"
+
+    with raises(KeyError):
+        model.get_var_grid("not_a_var")
+
+
+def test_grid_info():
+    model = BmiCompaction()
+    model.initialize()
+
+    assert model.get_grid_rank(0) == 1
+    assert model.get_grid_type(0) == "rectilinear"
+    assert model.get_grid_shape(0, np.empty(1, dtype=int)) == approx([3])
+    assert model.get_grid_x(0, np.empty(3)) == approx([50.0, 150.0, 250.0])
+
+
+def test_update_until():
+    model = BmiCompaction()
+    model.initialize()
+    model.update_until(10.0)
+
+    assert model.get_current_time() == approx(10.0)
+    assert model.get_start_time() == approx(0.0)
+    assert model.get_time_step() == approx(1.0)
@@ -1,5 +1,7 @@
 #!/usr/bin/env python
+import json
 import shutil
+from io import StringIO
 
 import numpy as np  # type: ignore
 import pandas  # type: ignore
@@ -148,3 +150,360 @@ def test_generate_porosity(tmpdir):
     )
     assert np.all(data.dz.values > 0.0)
     assert np.all(data.porosity.values >= 0.0)
+
+
+@pytest.mark.parametrize("executor", ("serial", "thread", "process", "pipeline"))
+def test_batch(tmpdir, datadir, executor):
+    data = pandas.read_csv(
+        datadir / "porosity.csv", names=("dz", "porosity"), dtype=float
+    )
+    phi_expected = compact(data["dz"], data["porosity"], porosity_max=0.6)
+    with tmpdir.as_cwd():
+        shutil.copy(datadir / "compaction.toml", ".")
+        for name in ("a.csv", "b.csv", "c.csv"):
+            shutil.copy(datadir / "porosity.csv", name)
+
+        runner = CliRunner(mix_stderr=False)
+        result = runner.invoke(
+            cli.batch,
+            ["--executor", executor, "-j", "2", "--out-dir", "out"]
+            + ["a.csv", "b.csv", "c.csv"],
+        )
+        assert result.exit_code == 0
+
+        for name in ("a-out.csv", "b-out.csv", "c-out.csv"):
+            phi_actual = pandas.read_csv(
+                tmpdir / "out" / name,
+                names=("dz", "porosity"),
+                dtype=float,
+                comment="#",
+            )
+            assert_array_almost_equal(phi_actual["porosity"], phi_expected)
+
+
+def test_batch_dry_run(tmpdir, datadir):
+    with tmpdir.as_cwd():
+        shutil.copy(datadir / "porosity.csv", ".")
+
+        result = CliRunner().invoke(cli.batch, ["--dry-run", "porosity.csv"])
+        assert result.exit_code == 0
+        assert "Nothing to do" in result.output
+        assert not (tmpdir / "porosity-out.csv").exists()
+
+
+def test_batch_without_config(tmpdir, datadir):
+    with tmpdir.as_cwd():
+        shutil.copy(datadir / "porosity.csv", ".")
+
+        result = CliRunner().invoke(cli.batch, ["--executor=serial", "porosity.csv"])
+        assert result.exit_code == 0
+        assert (tmpdir / "porosity-out.csv").exists()
+
+
+def test_load_config_file_is_cached(tmpdir):
+    with tmpdir.as_cwd():
+        with open("compaction.toml", "w") as fp:
+            print("[compaction.constants]\nc = 3.14", file=fp)
+
+        params = cli.load_config_file("compaction.toml")
+        assert params["constants"]["c"] == pytest.approx(3.14)
+
+        params["constants"]["c"] = 0.0
+        assert cli.load_config_file("compaction.toml")["constants"][
+            "c"
+        ] == pytest.approx(3.14)
+
+        with open("compaction.toml", "w") as fp:
+            print("[compaction.constants]\nc = 2.718", file=fp)
+        assert cli.load_config_file("compaction.toml")["constants"][
+            "c"
+        ] == pytest.approx(2.718)
+
+
+@pytest.mark.parametrize(
+    "module",
+    ["pandas", "tomlkit", "compaction.parallel", "multiprocessing", "concurrent"],
+)
+def test_cli_does_not_import(module):
+    import subprocess
+    import sys
+
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys, compaction.cli; assert {module!r} not in sys.modules",
+        ],
+        check=True,
+    )
+
+
+def test_batch_executors():
+    from compaction.parallel import EXECUTORS
+
+    assert cli.BATCH_EXECUTORS == EXECUTORS + ("pipeline",)
+
+
+METRICS_KEYS = {
+    "src",
+    "bytes",
+    "layers",
+    "columns",
+    "read",
+    "compute",
+    "write",
+    "seconds",
+    "layers_per_second",
+    "peak_rss",
+}
+
+
+def test_run_metrics(tmpdir, datadir):
+    with tmpdir.as_cwd():
+        shutil.copy(datadir / "compaction.toml", ".")
+        shutil.copy(datadir / "porosity.csv", ".")
+
+        result = CliRunner(mix_stderr=False).invoke(cli.run, ["--metrics"])
+        assert result.exit_code == 0
+
+    lines = result.stdout.splitlines()
+    assert len(lines) == 1
+
+    metrics = json.loads(lines[0])
+    assert set(metrics) == METRICS_KEYS
+    assert metrics["src"] == "porosity.csv"
+    assert metrics["layers"] == len(cli.load_layers(datadir / "porosity.csv")[0])
+    assert metrics["seconds"] >= metrics["read"] + metrics["compute"]
+    assert metrics["peak_rss"] > 0
+
+
+def test_run_profile_with_metrics(tmpdir, datadir):
+    with tmpdir.as_cwd():
+        shutil.copy(datadir / "compaction.toml", ".")
+        shutil.copy(datadir / "porosity.csv", ".")
+
+        result = CliRunner(mix_stderr=False).invoke(cli.run, ["--profile", "--metrics"])
+        assert result.exit_code == 0
+
+    stats, metrics = [json.loads(line) for line in result.stdout.splitlines()]
+    assert stats["calls"] == 1
+    assert set(metrics) == METRICS_KEYS
+    assert "Output written to porosity-out.csv" in result.stderr
+
+
+def test_write_metrics_newlines(tmpdir):
+    with tmpdir.as_cwd():
+        cli._write_metrics([{"a": 1}, {"b": 2}], path="metrics.jsonl")
+        with open("metrics.jsonl", "rb") as fp:
+            assert fp.read() == b'{"a": 1}\n{"b": 2}\n'
+
+
+@pytest.mark.parametrize("executor", ("serial", "thread", "process"))
+def test_batch_metrics_summary(tmpdir, datadir, executor):
+    with tmpdir.as_cwd():
+        shutil.copy(datadir / "compaction.toml", ".")
+        for name in ("a.csv", "b.csv"):
+            shutil.copy(datadir / "porosity.csv", name)
+
+        result = CliRunner(mix_stderr=False).invoke(
+            cli.batch,
+            [f"--executor={executor}", "--metrics", "--summary", "a.csv", "b.csv"],
+        )
+        assert result.exit_code == 0
+
+    lines = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [line["src"] for line in lines[:-1]] == ["a.csv", "b.csv"]
+
+    summary = lines[-1]
+    assert summary["summary"] is True
+    assert summary["runs"] == 2
+    assert summary["layers"] == lines[0]["layers"] + lines[1]["layers"]
+
+
+def test_metrics_from_config(tmpdir, datadir):
+    with tmpdir.as_cwd():
+        shutil.copy(datadir / "porosity.csv", ".")
+        with open("compaction.toml", "w") as fp:
+            print('[compaction.metrics]\npath = "metrics.jsonl"', file=fp)
+
+        for _ in range(2):
+            result = CliRunner(mix_stderr=False).invoke(cli.run)
+            assert result.exit_code == 0
+        assert result.stdout == ""
+
+        with open("metrics.jsonl") as fp:
+            lines = [json.loads(line) for line in fp]
+
+    assert len(lines) == 2
+    assert set(lines[0]) == METRICS_KEYS
+
+
+def test_batch_pipeline(tmpdir, datadir):
+    with tmpdir.as_cwd():
+        shutil.copy(datadir / "compaction.toml", ".")
+        for name in ("a.csv", "b.csv", "c.csv"):
+            shutil.copy(datadir / "porosity.csv", name)
+
+        result = CliRunner(mix_stderr=False).invoke(
+            cli.batch,
+            [
+                "--executor=pipeline",
+                "--readers=2",
+                "--writers=2",
+                "--queue-size=1",
+                "-j",
+                "2",
+                "--metrics",
+                "--summary",
+                "a.csv",
+                "b.csv",
+                "c.csv",
+            ],
+        )
+        assert result.exit_code == 0
+
+        cli.run_compaction("a.csv", "expected.csv", porosity_max=0.6)
+        expected = cli.load_layers("expected.csv")
+        for name in ("a-out.csv", "b-out.csv", "c-out.csv"):
+            assert_array_almost_equal(cli.load_layers(name)[1], expected[1])
+
+    summary = json.loads(result.stdout.splitlines()[-1])
+    assert summary["runs"] == 3
+    assert summary["utilization"]["read"]["workers"] == 2
+
+
+@pytest.mark.parametrize("where", ("option", "config"))
+def test_max_memory(tmpdir, where):
+    dz = np.linspace(1.0, 2.0, 20000)
+    porosity = np.full_like(dz, 0.6)
+    phi_expected = compact(dz, porosity, porosity_max=0.6)
+    with tmpdir.as_cwd():
+        np.savetxt("porosity.csv", np.column_stack((dz, porosity)), delimiter=",")
+        with open("compaction.toml", "w") as fp:
+            if where == "config":
+                print('[compaction]\nmax_memory = "400 KB"', file=fp)
+            print("[compaction.constants]\nporosity_max = 0.6", file=fp)
+
+        result = CliRunner(mix_stderr=False).invoke(
+            cli.run, ["--max-memory=400KB"] if where == "option" else []
+        )
+        assert result.exit_code == 0
+        _, phi_actual = cli.load_layers("porosity-out.csv")
+
+    assert phi_actual == pytest.approx(phi_expected)
+
+
+def test_bad_max_memory(tmpdir, datadir):
+    with tmpdir.as_cwd():
+        shutil.copy(datadir / "compaction.toml", ".")
+        shutil.copy(datadir / "porosity.csv", ".")
+
+        result = CliRunner(mix_stderr=False).invoke(cli.run, ["--max-memory=1"])
+        assert result.exit_code == 2
+        assert "Invalid value for '--max-memory'" in result.stderr
+        assert "max_memory is too small" in result.stderr
+
+        result = CliRunner(mix_stderr=False).invoke(
+            cli.batch, ["--max-memory=1", "porosity.csv"]
+        )
+        assert result.exit_code == 2
+        assert "max_memory is too small" in result.stderr
+
+        result = CliRunner(mix_stderr=False).invoke(cli.run, ["--max-memory=lots"])
+        assert result.exit_code == 2
+
+
+def test_bad_max_memory_in_config(tmpdir, datadir):
+    with pytest.raises(ValueError, match="max_memory"):
+        cli.load_config(StringIO('[compaction]\nmax_memory = "lots"'))
+
+    with tmpdir.as_cwd():
+        shutil.copy(datadir / "porosity.csv", ".")
+        with open("compaction.toml", "w") as fp:
+            print('[compaction]\nmax_memory = "lots"', file=fp)
+
+        for command, args in ((cli.run, []), (cli.batch, ["porosity.csv"])):
+            result = CliRunner(mix_stderr=False).invoke(command, args)
+            assert result.exit_code == 2
+            assert "compaction.toml: max_memory" in result.stderr
+
+
+SAND = {"c": 1e-8, "porosity_min": 0.05, "porosity_max": 0.45, "rho_grain": 2650.0}
+SHALE = {"c": 5e-8, "porosity_min": 0.1, "porosity_max": 0.65, "rho_grain": 2700.0}
+
+
+def test_load_config_lithology():
+    config = cli.load_config(
+        StringIO(
+            """[compaction.lithology.sand]
+            c = 1e-8
+            porosity_max = 0.45
+            [compaction.lithology.shale]
+            c = 5e-8
+            """
+        )
+    )
+    assert config["lithology"] == {
+        "sand": {"c": 1e-8, "porosity_max": 0.45},
+        "shale": {"c": 5e-8},
+    }
+
+
+def test_run_lithology(tmpdir):
+    dz_0 = np.full(100, 1.0)
+    phi_0 = np.full(100, 0.5)
+    sand = np.linspace(0.0, 1.0, 100)
+    phi_1 = compact(
+        dz_0, phi_0, lithologies=[SAND, SHALE], fractions=[sand, 1.0 - sand]
+    )
+
+    with tmpdir.as_cwd():
+        df = pandas.DataFrame.from_dict(
+            {"dz": dz_0, "porosity": phi_0, "sand": sand, "shale": 1.0 - sand}
+        )
+        df.to_csv("porosity.csv", index=False, header=False)
+
+        cli.run_compaction(
+            "porosity.csv",
+            "porosity-out.csv",
+            lithologies={"sand": SAND, "shale": SHALE},
+        )
+        data = pandas.read_csv("porosity-out.csv", header=None, comment="#").values
+
+        with pytest.raises(ValueError):
+            cli.run_compaction(
+                "porosity.csv",
+                "porosity-out.csv",
+                lithologies={"sand": SAND, "shale": SHALE, "silt": SAND},
+            )
+
+    assert data.shape == (100, 4)
+    assert data[:, 1] == pytest.approx(phi_1)
+    assert data[:, 2] == pytest.approx(sand)
+
+
+def test_run_lithology_within_budget(tmpdir):
+    dz = np.full(200_000, 0.1)
+    phi = np.full_like(dz, 0.5)
+    sand = np.linspace(0.0, 1.0, dz.size)
+    phi_expected = compact(
+        dz, phi, lithologies=[SAND, SHALE], fractions=[sand, 1.0 - sand]
+    )
+
+    with tmpdir.as_cwd():
+        np.savetxt(
+            "porosity.csv", np.column_stack((dz, phi, sand, 1.0 - sand)), delimiter=","
+        )
+        with open("compaction.toml", "w") as fp:
+            print('[compaction]\nmax_memory = "8 MB"', file=fp)
+            print("[compaction.constants]", file=fp)
+            for name, params in (("sand", SAND), ("shale", SHALE)):
+                print(f"[compaction.lithology.{name}]", file=fp)
+                for key, value in params.items():
+                    print(f"{key} = {value!r}", file=fp)
+
+        result = CliRunner(mix_stderr=False).invoke(cli.run)
+        assert result.exit_code == 0, result.stderr
+        _, phi_actual = cli.load_layers("porosity-out.csv")
+
+    assert phi_actual == pytest.approx(phi_expected, rel=1e-12)
@@ -0,0 +1,108 @@
+"""Unit tests for the growable column of sediment."""
+import numpy as np  # type: ignore
+from pytest import approx, mark, raises  # type: ignore
+
+from compaction import SedimentColumn
+from compaction.compaction import compact
+
+
+def test_empty_column() -> None:
+    column = SedimentColumn()
+    assert column.number_of_layers == len(column) == 0
+    assert column.dz.shape == (0,)
+    assert column.lithology is None
+    assert column.thickness == approx(0.0)
+
+    column.compact()
+    column.erode(10.0)
+    assert column.number_of_layers == 0
+
+
+def test_add_grows_capacity() -> None:
+    column = SedimentColumn(capacity=2)
+    for layer in range(100):
+        column.add(float(layer), porosity=0.5)
+
+    assert column.number_of_layers == 100
+    assert 100 <= column.capacity < 200
+    assert column.dz == approx(np.arange(100.0)[::-1])
+    assert column.porosity == approx(0.5)
+
+
+def test_add_does_not_reallocate_within_capacity() -> None:
+    column = SedimentColumn(capacity=10)
+    column.add(1.0, porosity=0.5)
+    dz = column.dz
+
+    for _ in range(9):
+        column.add(1.0, porosity=0.5)
+
+    assert np.shares_memory(dz, column.dz)
+
+
+def test_views_are_live() -> None:
+    column = SedimentColumn(shape=3)
+    column.add(1.0, porosity=0.5)
+    column.dz[0, 1] = 2.0
+
+    assert column.dz[0] == approx([1.0, 2.0, 1.0])
+    assert column.thickness == approx([1.0, 2.0, 1.0])
+
+
+@mark.parametrize("layers_shape", ((50, 4),))
+def test_compact_matches_module(layers) -> None:
+    dz, phi = layers
+
+    column = SedimentColumn(shape=(4,), capacity=1)
+    for layer in range(50):
+        column.add(dz[layer], porosity=phi[layer])
+    column.compact(porosity_max=0.5, c=np.full((50, 4), 5e-8))
+
+    dz_expected = np.empty_like(dz)
+    phi_expected = compact(dz[::-1], phi[::-1], porosity_max=0.5, return_dz=dz_expected)
+
+    assert column.porosity == approx(phi_expected)
+    assert column.dz == approx(dz_expected)
+
+
+def test_compact_with_lithology() -> None:
+    c = np.array([1e-8, 1e-7])
+
+    column = SedimentColumn(lithology=True)
+    for layer in range(10):
+        column.add(100.0, porosity=0.5, lithology=layer % 2)
+    column.compact(porosity_max=0.5, c=c[column.lithology])
+
+    expected = compact(np.full(10, 100.0), 0.5, porosity_max=0.5, c=c[column.lithology])
+    assert column.porosity == approx(expected)
+
+
+def test_lithology_required() -> None:
+    with raises(ValueError):
+        SedimentColumn(lithology=True).add(1.0, porosity=0.5)
+    with raises(ValueError):
+        SedimentColumn().add(1.0, porosity=0.5, lithology=1)
+
+
+def test_erode() -> None:
+    column = SedimentColumn(shape=2)
+    for _ in range(3):
+        column.add(1.0, porosity=0.5)
+
+    column.erode([0.5, 1.5])
+    assert column.number_of_layers == 3
+    assert column.dz == approx(np.array([[0.5, 0.0], [1.0, 0.5], [1.0, 1.0]]))
+
+    column.erode([0.5, 0.0])
+    assert column.number_of_layers == 2
+    assert column.thickness == approx([2.0, 1.5])
+
+    column.erode(100.0)
+    assert column.number_of_layers == 0
+
+
+def test_erode_negative() -> None:
+    column = SedimentColumn()
+    column.add(1.0, porosity=0.5)
+    with raises(ValueError):
+        column.erode(-1.0)
@@ -1,12 +1,13 @@
 """Unit tests for compaction."""
 from io import StringIO
+from typing import Any
 
 import numpy as np  # type: ignore
 import pandas  # type: ignore
 from pytest import approx, mark, raises  # type: ignore
 
 from compaction.cli import load_config, run_compaction
-from compaction.compaction import compact
+from compaction.compaction import compact, compacted_thickness
 
 
 def test_to_analytical() -> None:
@@ -246,3 +247,260 @@ def test_run(tmpdir) -> None:
         )
 
         assert np.all(data.porosity.values == approx(phi_1))
+
+
+def test_run_binary(tmpdir) -> None:
+    dz_0 = np.full(100, 1.0)
+    phi_0 = np.full(100, 0.5)
+    dz_1 = np.empty_like(dz_0)
+    phi_1 = compact(dz_0, phi_0, porosity_max=0.5, return_dz=dz_1)
+
+    with tmpdir.as_cwd():
+        np.save("porosity.npy", np.column_stack((dz_0, phi_0)))
+
+        run_compaction("porosity.npy", "porosity-out.npy", porosity_max=0.5)
+
+        data = np.load("porosity-out.npy")
+
+    assert data.shape == (100, 2)
+    assert np.all(data[:, 0] == approx(dz_1))
+    assert np.all(data[:, 1] == approx(phi_1))
+
+
+@mark.parametrize("block_size", (None, 1, 7, 100, 1000))
+def test_compacted_thickness(layers, block_size) -> None:
+    dz, phi = layers
+
+    dz_new = np.empty_like(dz)
+    compact(dz, phi, porosity_max=0.5, return_dz=dz_new)
+
+    thickness = compacted_thickness(dz, phi, porosity_max=0.5, block_size=block_size)
+    assert thickness.shape == (30,)
+    assert thickness == approx(dz_new.sum(axis=0))
+
+
+def test_compacted_thickness_one_column() -> None:
+    dz = np.full(100, 1.0)
+    phi = np.full(100, 0.5)
+
+    dz_new = np.empty_like(dz)
+    compact(dz, phi, porosity_max=0.5, return_dz=dz_new)
+
+    thickness = compacted_thickness(dz, phi, porosity_max=0.5, block_size=9)
+    assert thickness.shape == ()
+    assert thickness == approx(dz_new.sum())
+
+
+def test_compacted_thickness_with_array_params() -> None:
+    dz = np.full((100, 10), 1.0)
+    phi = np.full((100, 10), 0.5)
+    params: dict[str, Any] = {
+        "c": np.linspace(1e-8, 1e-6, 10),
+        "porosity_min": np.linspace(0.0, 0.2, 100).reshape((-1, 1)),
+        "excess_pressure": np.full((100, 10), 1e3),
+    }
+
+    dz_new = np.empty_like(dz)
+    compact(dz, phi, porosity_max=0.5, return_dz=dz_new, **params)
+
+    thickness = compacted_thickness(dz, phi, porosity_max=0.5, block_size=8, **params)
+    assert thickness == approx(dz_new.sum(axis=0))
+
+
+def test_compacted_thickness_all_void() -> None:
+    dz = np.full(100, 1000.0)
+    phi = np.full(100, 1.0)
+
+    assert compacted_thickness(dz, phi) == approx(0.0)
+
+
+def test_compacted_thickness_memory() -> None:
+    import tracemalloc
+
+    dz = np.full((1000, 1000), 1.0)
+    phi = np.full((1000, 1000), 0.5)
+
+    tracemalloc.start()
+    try:
+        compacted_thickness(dz, phi, porosity_max=0.5, block_size=10)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak < dz.nbytes / 10
+
+
+SAND: dict[str, Any] = {
+    "c": 1e-8,
+    "porosity_min": 0.05,
+    "porosity_max": 0.45,
+    "rho_grain": 2650.0,
+}
+SHALE: dict[str, Any] = {
+    "c": 5e-8,
+    "porosity_min": 0.1,
+    "porosity_max": 0.65,
+    "rho_grain": 2700.0,
+}
+
+
+@mark.parametrize("as_array", (True, False))
+def test_lithology_mixture(as_array) -> None:
+    rng = np.random.default_rng(1973)
+    dz = np.full((50, 4), 10.0)
+    phi = np.full((50, 4), 0.5)
+    sand = rng.uniform(0.0, 1.0, size=dz.shape)
+    fractions = [sand, 1.0 - sand]
+    if as_array:
+        fractions = np.stack(fractions)
+
+    mixed = {
+        key: sand * SAND[key] + (1.0 - sand) * SHALE[key]
+        for key in ("c", "porosity_min", "rho_grain")
+    }
+    mixed["porosity_range"] = sand * 0.4 + (1.0 - sand) * 0.55
+    phi_expected = compact(
+        dz,
+        phi,
+        c=mixed["c"],
+        porosity_min=mixed["porosity_min"],
+        porosity_max=mixed["porosity_min"] + mixed["porosity_range"],
+        rho_grain=mixed["rho_grain"],
+    )
+
+    phi_actual = compact(dz, phi, lithologies=[SAND, SHALE], fractions=fractions)
+    assert phi_actual == approx(phi_expected)
+
+
+def test_lithology_pure_matches_params() -> None:
+    dz = np.full(100, 10.0)
+    phi = np.full(100, 0.5)
+
+    phi_actual = compact(
+        dz, phi, lithologies=[SAND, SHALE], fractions=[np.ones(100), np.zeros(100)]
+    )
+    assert phi_actual == approx(compact(dz, phi, **SAND))
+
+
+def test_lithology_compacted_thickness() -> None:
+    dz = np.full((100, 3), 10.0)
+    phi = np.full((100, 3), 0.5)
+    sand = np.linspace(0.0, 1.0, 100).reshape((-1, 1))
+    fractions = np.stack(np.broadcast_arrays(sand, 1.0 - sand))
+
+    dz_new = np.empty_like(dz)
+    compact(dz, phi, return_dz=dz_new, lithologies=[SAND, SHALE], fractions=fractions)
+    thickness = compacted_thickness(
+        dz, phi, block_size=7, lithologies=[SAND, SHALE], fractions=fractions
+    )
+    assert thickness == approx(dz_new.sum(axis=0))
+
+
+@mark.parametrize("fractions", (None, [np.ones(10)]))
+def test_lithology_bad_fractions(fractions) -> None:
+    dz = np.full(10, 1.0)
+    phi = np.full(10, 0.5)
+    with raises(ValueError):
+        compact(dz, phi, lithologies=[SAND, SHALE], fractions=fractions)
+    with raises(ValueError):
+        compacted_thickness(dz, phi, lithologies=[SAND, SHALE], fractions=fractions)
+
+
+@mark.parametrize(
+    "layers_shape,axis,order",
+    (
+        ((6, 8, 300), -1, "C"),
+        ((6, 300, 8), 1, "C"),
+        ((6, 8, 300), 2, "F"),
+        ((300, 6, 40), 0, "F"),
+        ((4, 30, 5, 6), 1, "C"),
+        ((2, 3, 70000), 2, "C"),
+    ),
+)
+@mark.parametrize("stacked", (False, True))
+def test_layer_axis(layers, axis, order, stacked) -> None:
+    dz, phi = (np.asarray(value, order=order) for value in layers)
+    shape = dz.shape
+    rng = np.random.default_rng(1973)
+    c = rng.uniform(1e-8, 5e-8, shape[axis]).reshape(
+        [-1 if dim == axis % len(shape) else 1 for dim in range(len(shape))]
+    )
+    sand = rng.uniform(0.0, 1.0, shape)
+    fractions = [sand, 1.0 - sand]
+
+    dz_new = np.empty_like(dz)
+    phi_new = compact(
+        dz,
+        phi,
+        c=c,
+        excess_pressure=100.0,
+        return_dz=dz_new,
+        lithologies=[SAND, SHALE],
+        fractions=np.stack(fractions) if stacked else fractions,
+        axis=axis,
+    )
+
+    def layers_first(value):
+        return np.moveaxis(np.broadcast_to(value, shape), axis, 0).copy()
+
+    dz_expected = np.empty(layers_first(dz).shape)
+    phi_expected = compact(
+        layers_first(dz),
+        layers_first(phi),
+        c=layers_first(c),
+        excess_pressure=100.0,
+        return_dz=dz_expected,
+        lithologies=[SAND, SHALE],
+        fractions=[layers_first(sand), layers_first(1.0 - sand)],
+    )
+
+    assert np.all(phi_new == np.moveaxis(phi_expected, 0, axis))
+    assert np.all(dz_new == np.moveaxis(dz_expected, 0, axis))
+    assert phi_new.strides == dz.strides
+
+
+def test_layer_axis_out_of_bounds() -> None:
+    with raises(ValueError):
+        compact(np.full((10, 100), 1.0), 0.5, axis=2)
+    with raises(TypeError):
+        compact(np.full((10, 100), 1.0), 0.5, axis=1, return_dz=np.empty((100, 10)))
+
+
+@mark.parametrize("layers_shape", ((200, 30),))
+def test_outputs(layers) -> None:
+    dz, phi = layers
+    sand = np.random.default_rng(1973).uniform(0.0, 1.0, dz.shape)
+    kwds: dict[str, Any] = {
+        "excess_pressure": 100.0,
+        "lithologies": [SAND, SHALE],
+        "fractions": [sand, 1.0 - sand],
+    }
+
+    buffer = np.empty_like(dz)
+    outputs: dict[str, Any] = {"bulk_density": None, "overburden_stress": buffer}
+    outputs |= {"depth_to_top": None, "depth_to_bottom": None}
+    dz_new = np.empty_like(dz)
+    phi_new = compact(dz, phi, return_dz=dz_new, outputs=outputs, **kwds)
+
+    rho_grain = sand * SAND["rho_grain"] + (1.0 - sand) * SHALE["rho_grain"]
+    load = (rho_grain - 1000.0) * dz * (1.0 - phi) * 9.80665
+    assert outputs["overburden_stress"] is buffer
+    assert buffer == approx(np.cumsum(load, axis=0) - load - 100.0)
+    assert outputs["bulk_density"] == approx(
+        rho_grain * (1.0 - phi_new) + 1000.0 * phi_new
+    )
+    assert outputs["depth_to_bottom"] == approx(np.cumsum(dz_new, axis=0))
+    assert outputs["depth_to_top"] == approx(outputs["depth_to_bottom"] - dz_new)
+
+    for name in ("depth_to_top", "depth_to_bottom"):
+        alone: dict[str, Any] = {name: None}
+        assert np.all(compact(dz, phi, outputs=alone, **kwds) == phi_new)
+        assert alone[name] == approx(outputs[name])
+
+
+def test_bad_outputs() -> None:
+    dz = np.full((10, 100), 1.0)
+    with raises(ValueError):
+        compact(dz, 0.5, outputs={"porosity": None})
+    with raises(TypeError):
+        compact(dz, 0.5, outputs={"bulk_density": np.empty((10, 10))})
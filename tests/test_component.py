@@ -6,6 +6,7 @@ from pytest import approx, fixture, mark, raises  # type: ignore
 
 from compaction import compaction
 from compaction.landlab import Compact
+from compaction.resample import resample_to_depth
 
 
 @fixture()
@@ -114,3 +115,343 @@ def test_property_getter_setter(grid, property, value):
     setattr(compact, property, value)
     assert getattr(compact, property) == approx(value)
     assert dict(compact.params)[property] == approx(value)
+
+
+def test_compacted_thickness(grid):
+    for _ in range(100):
+        grid.event_layers.add(1.0, porosity=0.5)
+    compact = Compact(grid, porosity_min=0.0, porosity_max=0.5)
+
+    dz_before = grid.event_layers.dz.copy()
+    thickness = compact.calc_compacted_thickness()
+    assert np.all(grid.event_layers.dz == dz_before)
+
+    compact.run_one_step()
+    assert thickness == approx(grid.event_layers.thickness)
+
+
+def test_compacted_thickness_without_layers(grid):
+    compact = Compact(grid)
+    assert np.all(compact.calc_compacted_thickness() == 0.0)
+
+
+def test_default_mask_is_core_cells():
+    grid = RasterModelGrid((4, 5))
+    grid.status_at_node[grid.node_at_cell[1]] = grid.BC_NODE_IS_CLOSED
+    for _ in range(10):
+        grid.event_layers.add(100.0, porosity=0.5)
+
+    compact = Compact(grid, porosity_max=0.5)
+    assert np.all(compact.active_cells == grid.core_cells)
+    compact.run_one_step()
+
+    assert np.all(grid.event_layers["porosity"][:, 1] == approx(0.5))
+    assert np.all(grid.event_layers.dz[:, 1] == approx(100.0))
+    assert np.all(grid.event_layers["porosity"][:-1, grid.core_cells] < 0.5)
+
+
+@mark.parametrize("n_layers", (3, 20))
+@mark.parametrize("as_field", (True, False))
+def test_mask_matches_module(as_field, n_layers):
+    grid = RasterModelGrid((4, 5))
+    rng = np.random.default_rng(1945)
+    for _ in range(n_layers):
+        grid.event_layers.add(
+            rng.uniform(10.0, 100.0, size=6), porosity=rng.uniform(0.3, 0.5, size=6)
+        )
+    excess_pressure = np.linspace(0.0, 1e5, 6)
+    dz = grid.event_layers.dz[::-1].copy()
+    phi = grid.event_layers["porosity"][::-1].copy()
+
+    mask = np.array([True, False, True, True, False, True])
+    if as_field:
+        grid.at_cell["active"] = mask
+    compact = Compact(
+        grid,
+        porosity_max=0.5,
+        excess_pressure=excess_pressure,
+        mask="active" if as_field else mask,
+    )
+    thickness = compact.calc_compacted_thickness()
+    compact.run_one_step()
+
+    dz_expected = np.empty_like(dz)
+    phi_expected = compaction.compact(
+        dz,
+        phi,
+        porosity_max=0.5,
+        excess_pressure=excess_pressure,
+        return_dz=dz_expected,
+    )
+    dz_expected[:, ~mask] = dz[:, ~mask]
+    phi_expected[:, ~mask] = phi[:, ~mask]
+
+    assert_array_almost_equal(grid.event_layers.dz[::-1], dz_expected)
+    assert_array_almost_equal(grid.event_layers["porosity"][::-1], phi_expected)
+    assert thickness == approx(grid.event_layers.thickness)
+
+
+@mark.parametrize("mask", ("not-a-field", [True, False], np.ones(6)))
+def test_bad_mask(grid, mask):
+    with raises(ValueError):
+        Compact(grid, mask=mask)
+
+
+def test_lithology_fields_match_module(grid):
+    sand = {"c": 1e-8, "porosity_max": 0.45}
+    shale = {"c": 5e-8, "porosity_max": 0.65}
+    fraction = np.linspace(0.0, 1.0, 50)
+
+    for f in fraction[::-1]:
+        grid.event_layers.add(10.0, porosity=0.5, sand=f, shale=1.0 - f)
+    compact = Compact(grid, lithologies={"sand": sand, "shale": shale})
+    compact.calculate()
+
+    phi_expected = compaction.compact(
+        np.full(50, 10.0),
+        np.full(50, 0.5),
+        lithologies=[sand, shale],
+        fractions=[fraction, 1.0 - fraction],
+    )
+    assert grid.event_layers["porosity"][-1::-1, 0] == approx(phi_expected)
+
+
+def test_bad_lithology(grid):
+    with raises(ValueError):
+        Compact(grid, lithologies={"sand": {"not_a_param": 1.0}})
+
+
+def test_array_params_match_module(grid):
+    c = np.array([1e-8, 5e-8, 1e-7])
+    for _ in range(20):
+        grid.event_layers.add(100.0, porosity=0.5)
+    Compact(grid, c=c, porosity_max=0.5).calculate()
+
+    phi_expected = compaction.compact(
+        np.full((20, 3), 100.0), np.full((20, 3), 0.5), c=c, porosity_max=0.5
+    )
+    assert grid.event_layers["porosity"][::-1] == approx(phi_expected)
+
+
+@mark.parametrize("before_layers", (True, False))
+def test_at_cell_field_param(grid, before_layers):
+    grid.add_field("compaction_coefficient", [1e-8, 5e-8, 1e-7], at="cell")
+    if before_layers:
+        compact = Compact(grid, c="compaction_coefficient", porosity_max=0.5)
+    for _ in range(20):
+        grid.event_layers.add(100.0, porosity=0.5)
+    if not before_layers:
+        compact = Compact(grid, c="compaction_coefficient", porosity_max=0.5)
+
+    params = compact._resolved_params()
+    assert np.shares_memory(params["c"], grid.at_cell["compaction_coefficient"])
+
+    compact.calculate()
+
+    phi_expected = compaction.compact(
+        np.full((20, 3), 100.0),
+        np.full((20, 3), 0.5),
+        c=grid.at_cell["compaction_coefficient"],
+        porosity_max=0.5,
+    )
+    assert compact.c == "compaction_coefficient"
+    assert grid.event_layers["porosity"][::-1] == approx(phi_expected)
+
+
+def test_event_layer_field_param(grid):
+    porosity_max = np.linspace(0.4, 0.6, 20)
+    for value in porosity_max:
+        grid.event_layers.add(100.0, porosity=0.6, porosity_max=value)
+    compact = Compact(grid, porosity_max="porosity_max")
+
+    params = compact._resolved_params()
+    assert np.shares_memory(params["porosity_max"], grid.event_layers["porosity_max"])
+
+    compact.calculate()
+
+    phi_expected = compaction.compact(
+        np.full((20, 3), 100.0),
+        np.full((20, 3), 0.6),
+        porosity_max=porosity_max[::-1].reshape((-1, 1)),
+    )
+    assert grid.event_layers["porosity"][::-1] == approx(phi_expected)
+
+
+def test_field_param_with_mask():
+    grid = RasterModelGrid((4, 5))
+    grid.add_field("rho_grain", np.linspace(2600.0, 2700.0, 6), at="cell")
+    for _ in range(10):
+        grid.event_layers.add(100.0, porosity=0.5, c=np.linspace(1e-8, 1e-7, 6))
+    mask = np.array([True, False, True, True, False, True])
+    Compact(grid, c="c", rho_grain="rho_grain", porosity_max=0.5, mask=mask).calculate()
+
+    phi_expected = compaction.compact(
+        np.full((10, 6), 100.0),
+        np.full((10, 6), 0.5),
+        c=np.linspace(1e-8, 1e-7, 6),
+        rho_grain=np.linspace(2600.0, 2700.0, 6),
+        porosity_max=0.5,
+    )
+    phi_actual = grid.event_layers["porosity"][::-1]
+    assert phi_actual[:, mask] == approx(phi_expected[:, mask])
+    assert np.all(phi_actual[:, ~mask] == 0.5)
+
+
+def test_bad_field_param(grid):
+    grid.add_field("c", [1e-8, -1.0, 1e-7], at="cell")
+    with raises(ValueError):
+        Compact(grid, c="c")
+
+    grid.event_layers.add(100.0, porosity=0.5)
+    with raises(ValueError):
+        Compact(grid, c="not_a_field")
+
+
+def test_bad_values_in_new_layers(grid):
+    grid.event_layers.add(100.0, porosity=0.5, porosity_max=0.5)
+    compact = Compact(grid, porosity_max="porosity_max")
+    compact.run_one_step()
+
+    grid.event_layers.add(100.0, porosity=0.5, porosity_max=1.5)
+    with raises(ValueError):
+        compact.run_one_step()
+
+
+def test_bad_array_param_is_not_set(grid):
+    compact = Compact(grid, c=1e-8)
+    with raises(ValueError):
+        compact.c = np.array([1e-8, -1e-8, 1e-8])
+    assert compact.c == 1e-8
+
+
+def test_porosity_at_depth(grid):
+    for _ in range(20):
+        grid.event_layers.add(5.0, porosity=0.6)
+    depths = np.linspace(0.0, 80.0, 9)
+
+    compact = Compact(grid, porosity_max=0.6, depths=depths)
+    assert np.all(np.isnan(compact.porosity_at_depth))
+
+    compact.run_one_step()
+    expected = resample_to_depth(
+        grid.event_layers.dz[::-1], grid.event_layers["porosity"][::-1], depths
+    )
+    assert compact.porosity_at_depth == approx(expected)
+    assert np.all(np.diff(compact.porosity_at_depth, axis=0) < 0.0)
+
+
+def test_porosity_at_depth_without_depths(grid):
+    assert Compact(grid).porosity_at_depth is None
+
+
+@mark.parametrize("depths", ([0.0], [1.0, 0.0], np.zeros((2, 4))))
+def test_bad_depths(grid, depths):
+    with raises(ValueError):
+        Compact(grid, depths=depths)
+
+
+@mark.parametrize("with_mask", (False, True))
+def test_outputs_match_module(with_mask):
+    grid = RasterModelGrid((4, 5))
+    mask = np.array([True, False, True, True, False, True])
+    compact = Compact(
+        grid,
+        porosity_max=0.5,
+        mask=mask if with_mask else None,
+        outputs=compaction.OUTPUTS,
+    )
+
+    rng = np.random.default_rng(1945)
+    for n_layers in (1, 2, 3, 10):
+        while grid.event_layers.number_of_layers < n_layers:
+            grid.event_layers.add(
+                rng.uniform(10.0, 100.0, size=6), porosity=rng.uniform(0.3, 0.5, size=6)
+            )
+        dz = grid.event_layers.dz[::-1].copy()
+        phi = grid.event_layers["porosity"][::-1].copy()
+        compact.run_one_step()
+
+        expected = dict.fromkeys(compaction.OUTPUTS)
+        compaction.compact(dz, phi, porosity_max=0.5, outputs=expected)
+        for name, values in compact.outputs.items():
+            values = values[::-1]
+            assert values.shape == (n_layers, 6)
+            if with_mask:
+                assert np.all(np.isnan(values[:, ~mask]))
+                assert values[:, mask] == approx(expected[name][:, mask])
+            else:
+                assert values == approx(expected[name])
+
+
+def test_outputs_without_layers(grid):
+    compact = Compact(grid, outputs=["bulk_density"])
+    compact.run_one_step()
+    assert compact.outputs["bulk_density"].shape == (0, 3)
+    assert Compact(grid).outputs == {}
+
+
+def test_bad_outputs(grid):
+    with raises(ValueError):
+        Compact(grid, outputs=["porosity", "bulk_density"])
+
+
+@mark.parametrize("tolerance", (1e-4, 1e-3, 3e-3))
+@mark.parametrize("with_lithologies", (False, True))
+def test_tolerance_error_bound(tolerance, with_lithologies):
+    grids = [RasterModelGrid((4, 5)) for _ in range(2)]
+    kwds = {"porosity_min": 0.1, "porosity_max": 0.6, "c": np.linspace(1e-8, 5e-8, 6)}
+    if with_lithologies:
+        kwds["lithologies"] = {
+            "sand": {"c": 1e-8, "porosity_max": 0.45},
+            "shale": {"c": 5e-8},
+        }
+    every_step = Compact(grids[0], **kwds)
+    adaptive = Compact(grids[1], tolerance=tolerance, **kwds)
+
+    rng = np.random.default_rng(1945)
+    for _ in range(200):
+        dz = rng.uniform(0.0, 0.2, size=6)
+        sand = rng.uniform(0.0, 1.0, size=6) if with_lithologies else np.zeros(6)
+        # Layers are deposited with the porosity of the porosity law under
+        # no load.
+        porosity = 0.45 * sand + 0.6 * (1.0 - sand)
+        for grid in grids:
+            grid.event_layers.add(dz, porosity=porosity, sand=sand, shale=1.0 - sand)
+        skipped_steps = adaptive.skipped_steps
+        every_step.run_one_step()
+        adaptive.run_one_step()
+
+        actual = grids[1].event_layers["porosity"]
+        expected = grids[0].event_layers["porosity"]
+        assert np.abs(actual - expected).max() <= tolerance
+        if adaptive.skipped_steps == skipped_steps:
+            assert actual == approx(expected, rel=1e-12)
+
+    assert 0 < adaptive.skipped_steps < 200
+
+
+def test_tolerance_compacts_after_erosion(grid):
+    compact = Compact(grid, porosity_max=0.6, tolerance=0.0)
+    for _ in range(5):
+        grid.event_layers.add(100.0, porosity=0.6)
+    compact.run_one_step()
+    assert compact.skipped_steps == 0
+
+    compact.tolerance = 1.0
+    grid.event_layers.reduce(0, 4, porosity=np.mean)
+    compact.run_one_step()
+    assert compact.skipped_steps == 0
+
+    grid.event_layers.add(100.0, porosity=0.6)
+    compact.run_one_step()
+    assert compact.skipped_steps == 1
+
+
+def test_bad_tolerance(grid):
+    with raises(ValueError):
+        Compact(grid, tolerance=-1.0)
+    with raises(ValueError):
+        Compact(grid, tolerance=1e-3, diffusivity=1.0)
+    compact = Compact(grid, tolerance=1e-3)
+    with raises(ValueError):
+        compact.diffusivity = 1.0
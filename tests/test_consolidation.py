@@ -0,0 +1,168 @@
+"""Unit tests for the dissipation of excess pore pressure."""
+import numpy as np  # type: ignore
+from landlab import RasterModelGrid  # type: ignore
+from numpy.testing import assert_array_almost_equal  # type: ignore
+from pytest import approx, mark, raises  # type: ignore
+
+from compaction.compaction import compact
+from compaction.consolidation import diffuse_excess_pressure, overlying_load
+from compaction.landlab import Compact
+
+
+def test_overlying_load():
+    dz = np.full((10, 3), 2.0)
+    phi = np.full((10, 3), 0.5)
+    load = overlying_load(dz, phi, rho_grain=2000.0, rho_void=1000.0, gravity=10.0)
+
+    assert load[0] == approx(0.0)
+    assert np.diff(load, axis=0) == approx(1e4)
+
+
+@mark.parametrize("time_factor", (0.05, 0.2, 0.5, 1.0))
+def test_terzaghi_degree_of_consolidation(time_factor):
+    n_layers, thickness, diffusivity = 400, 10.0, 1.0
+    dz = np.full(n_layers, thickness / n_layers)
+    pressure = np.ones(n_layers)
+
+    n_steps = 1000
+    dt = time_factor * thickness**2 / diffusivity / n_steps
+    for _ in range(n_steps):
+        pressure = diffuse_excess_pressure(pressure, dz, dt, diffusivity)
+
+    m = (2 * np.arange(500) + 1) * np.pi / 2
+    expected = 1.0 - np.sum(2.0 / m**2 * np.exp(-(m**2) * time_factor))
+
+    assert 1.0 - pressure.mean() == approx(expected, rel=1e-2)
+
+
+def test_batched_matches_single_columns():
+    rng = np.random.default_rng(1945)
+    pressure = rng.uniform(0.0, 1e5, size=(50, 20))
+    dz = rng.uniform(0.1, 2.0, size=(50, 20))
+    diffusivity = rng.uniform(1e-3, 1.0, size=20)
+
+    actual = diffuse_excess_pressure(pressure, dz, 10.0, diffusivity)
+    for column in range(20):
+        expected = diffuse_excess_pressure(
+            pressure[:, column], dz[:, column], 10.0, diffusivity[column]
+        )
+        assert_array_almost_equal(actual[:, column], expected)
+
+
+def test_diffusivity_by_layer_is_an_error():
+    pressure = np.full((5, 3), 100.0)
+    with raises(ValueError, match="one value for each column"):
+        diffuse_excess_pressure(pressure, 1.0, 1.0, np.ones((5, 3)))
+
+
+def test_pressure_dissipates():
+    pressure = np.full((20, 5), 1e4)
+    dz = np.full((20, 5), 1.0)
+
+    new_pressure = diffuse_excess_pressure(pressure, dz, 100.0, 1e-2)
+    assert np.all(new_pressure < pressure)
+    assert np.all(np.diff(new_pressure, axis=0) > 0.0)
+
+    new_pressure = diffuse_excess_pressure(pressure, dz, 1e10, 1.0)
+    assert new_pressure == approx(0.0, abs=1e-3)
+
+
+def test_zero_thickness_layers():
+    pressure = np.full((20, 5), 1e4)
+    dz = np.full((20, 5), 1.0)
+    dz[5:10] = 0.0
+
+    new_pressure = diffuse_excess_pressure(pressure, dz, 100.0, 1e-2)
+    assert np.all(np.isfinite(new_pressure))
+    assert np.all(new_pressure < pressure)
+
+
+def test_input_is_unchanged():
+    pressure = np.full(20, 1e4)
+    diffuse_excess_pressure(pressure, np.ones(20), 100.0, 1e-2)
+    assert np.all(pressure == 1e4)
+
+
+def test_out_keyword():
+    pressure = np.full((20, 5), 1e4)
+    out = np.empty_like(pressure)
+
+    result = diffuse_excess_pressure(pressure, np.ones((20, 5)), 100.0, 1e-2, out=out)
+    assert result is out
+    assert_array_almost_equal(
+        out, diffuse_excess_pressure(pressure, np.ones((20, 5)), 100.0, 1e-2)
+    )
+
+
+def test_component_requires_dt():
+    grid = RasterModelGrid((3, 4))
+    grid.event_layers.add(100.0, porosity=0.5)
+
+    compact = Compact(grid, porosity_max=0.5, diffusivity=1e-6)
+    with raises(ValueError):
+        compact.run_one_step()
+
+
+@mark.parametrize("diffusivity", (0.0, -1.0, np.ones(5), np.ones((3, 2))))
+def test_component_bad_diffusivity(diffusivity):
+    with raises(ValueError):
+        Compact(RasterModelGrid((3, 4)), diffusivity=diffusivity)
+
+
+def test_component_fast_diffusion_matches_equilibrium():
+    grid = RasterModelGrid((3, 4))
+    for _ in range(50):
+        grid.event_layers.add(10.0, porosity=0.5)
+
+    phi_expected = compact(
+        np.full((50, 2), 10.0), np.full((50, 2), 0.5), porosity_max=0.5
+    )
+
+    component = Compact(grid, porosity_max=0.5, diffusivity=1e3)
+    component.run_one_step(dt=1e6)
+
+    assert_array_almost_equal(
+        grid.event_layers["porosity"][::-1], phi_expected, decimal=4
+    )
+    assert component.excess_pore_pressure == approx(0.0, abs=1e3)
+
+
+def test_component_consolidates_over_time():
+    grid = RasterModelGrid((3, 4))
+    for _ in range(50):
+        grid.event_layers.add(10.0, porosity=0.5)
+
+    phi_equilibrium = compact(
+        np.full((50, 2), 10.0), np.full((50, 2), 0.5), porosity_max=0.5
+    )
+
+    component = Compact(grid, porosity_max=0.5, diffusivity=1e-6)
+    component.run_one_step(dt=1e7)
+    phi_early = grid.event_layers["porosity"][::-1].copy()
+
+    assert np.all(component.excess_pore_pressure > 0.0)
+    assert np.all(phi_early[1:] > phi_equilibrium[1:])
+
+    for _ in range(100):
+        component.run_one_step(dt=1e10)
+    phi_late = grid.event_layers["porosity"][::-1]
+
+    assert np.all(phi_late[1:] < phi_early[1:])
+    assert_array_almost_equal(phi_late, phi_equilibrium, decimal=3)
+
+
+def test_component_new_layers_generate_pressure():
+    grid = RasterModelGrid((3, 4))
+    for _ in range(10):
+        grid.event_layers.add(10.0, porosity=0.5)
+
+    component = Compact(grid, porosity_max=0.5, diffusivity=1e-6)
+    for _ in range(20):
+        component.run_one_step(dt=1e12)
+    assert component.excess_pore_pressure == approx(0.0, abs=1.0)
+
+    grid.event_layers.add(100.0, porosity=0.5)
+    component.run_one_step(dt=1.0)
+
+    assert component.excess_pore_pressure.shape == (11, 2)
+    assert np.all(component.excess_pore_pressure[:-1] > 1e5)
@@ -0,0 +1,86 @@
+"""Unit tests for compacting chunked arrays with dask."""
+
+import numpy as np  # type: ignore
+from numpy.testing import assert_array_almost_equal  # type: ignore
+from pytest import importorskip, mark  # type: ignore
+
+from compaction.compaction import compact
+
+da = importorskip("dask.array")
+compaction_dask = importorskip("compaction.dask")
+
+
+@mark.parametrize("scheduler", ("threads", "processes"))
+def test_matches_numpy(layers, scheduler):
+    dz, phi = layers
+    dz_expected = np.empty_like(dz)
+    phi_expected = compact(dz, phi, porosity_max=0.5, return_dz=dz_expected)
+
+    phi_actual, dz_actual = compaction_dask.compact(
+        da.from_array(dz, chunks=(100, 7)),
+        da.from_array(phi, chunks=(100, 7)),
+        porosity_max=0.5,
+        return_dz=True,
+    )
+
+    assert_array_almost_equal(phi_actual.compute(scheduler=scheduler), phi_expected)
+    assert_array_almost_equal(dz_actual.compute(scheduler=scheduler), dz_expected)
+
+
+def test_output_is_lazy(layers):
+    dz, phi = layers
+    phi_new = compaction_dask.compact(da.from_array(dz, chunks=(10, 10)), phi)
+
+    assert isinstance(phi_new, da.Array)
+    assert phi_new.shape == dz.shape
+
+
+@mark.parametrize("chunks", ((10, 10), (33, 30), (1, 1)))
+def test_layer_axis_is_single_chunk(layers, chunks):
+    dz, phi = layers
+    phi_new = compaction_dask.compact(
+        da.from_array(dz, chunks=chunks), da.from_array(phi, chunks=chunks)
+    )
+
+    assert phi_new.chunks[0] == (100,)
+    assert phi_new.chunks[1] == da.from_array(dz, chunks=chunks).chunks[1]
+    assert_array_almost_equal(phi_new.compute(), compact(dz, phi))
+
+
+@mark.parametrize("scheduler", ("threads", "processes"))
+def test_array_params(layers, scheduler):
+    dz, phi = layers
+    c = np.linspace(1e-8, 1e-6, dz.shape[1])
+    porosity_min = np.linspace(0.0, 0.2, dz.shape[0]).reshape((-1, 1))
+
+    phi_expected = compact(dz, phi, c=c, porosity_min=porosity_min)
+    phi_actual = compaction_dask.compact(
+        da.from_array(dz, chunks=(100, 7)), phi, c=c, porosity_min=porosity_min
+    )
+
+    assert_array_almost_equal(phi_actual.compute(scheduler=scheduler), phi_expected)
+
+
+def test_one_dimensional(layers):
+    dz, phi = layers
+    phi_new = compaction_dask.compact(da.from_array(dz[:, 0], chunks=10), phi[:, 0])
+
+    assert_array_almost_equal(phi_new.compute(), compact(dz[:, 0], phi[:, 0]))
+
+
+def test_to_zarr(tmpdir, layers):
+    zarr = importorskip("zarr")
+
+    dz, phi = layers
+    dz_expected = np.empty_like(dz)
+    phi_expected = compact(dz, phi, return_dz=dz_expected)
+
+    phi_new, dz_new = compaction_dask.compact(
+        da.from_array(dz, chunks=(100, 10)), phi, return_dz=True
+    )
+    with tmpdir.as_cwd():
+        da.to_zarr(phi_new, "porosity.zarr")
+        da.to_zarr(dz_new, "dz.zarr")
+
+        assert_array_almost_equal(zarr.open("porosity.zarr")[:], phi_expected)
+        assert_array_almost_equal(zarr.open("dz.zarr")[:], dz_expected)
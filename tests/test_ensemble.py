@@ -0,0 +1,229 @@
+"""Unit tests for compacting an ensemble of landlab grids."""
+import numpy as np  # type: ignore
+from landlab import HexModelGrid, RasterModelGrid  # type: ignore
+from numpy.testing import assert_array_almost_equal  # type: ignore
+from pytest import mark  # type: ignore
+
+from compaction.landlab import Compact, CompactEnsemble
+
+
+def _grids(seed=1945):
+    rng = np.random.default_rng(seed)
+    grids = [RasterModelGrid((4, 5)), HexModelGrid((4, 4)), RasterModelGrid((3, 8))]
+    for grid, n_layers in zip(grids, (3, 10, 1)):
+        for _ in range(n_layers):
+            grid.event_layers.add(
+                rng.uniform(10.0, 100.0, size=grid.number_of_cells),
+                porosity=rng.uniform(0.3, 0.6, size=grid.number_of_cells),
+            )
+    return grids
+
+
+PARAMS = [
+    {"porosity_max": 0.6},
+    {"porosity_max": 0.65, "c": 1e-7, "excess_pressure": 1e4},
+    {"porosity_max": 0.6, "porosity_min": 0.1},
+]
+
+
+def test_empty_ensemble():
+    ensemble = CompactEnsemble()
+    ensemble.run_one_step()
+    assert len(ensemble) == 0
+
+
+@mark.parametrize("n_steps", (1, 3))
+def test_ensemble_matches_components(n_steps):
+    expected = _grids()
+    components = [Compact(grid, **params) for grid, params in zip(expected, PARAMS)]
+
+    ensemble = CompactEnsemble()
+    for grid, params in zip(_grids(), PARAMS):
+        ensemble.add(grid, **params)
+
+    for _ in range(n_steps):
+        for compact in components:
+            compact.run_one_step()
+        ensemble.run_one_step()
+
+    for actual, grid in zip(ensemble.components, expected):
+        assert_array_almost_equal(actual.grid.event_layers.dz, grid.event_layers.dz)
+        assert_array_almost_equal(
+            actual.grid.event_layers["porosity"], grid.event_layers["porosity"]
+        )
+
+
+def test_ensemble_with_cell_params():
+    expected, actual = _grids(), _grids()
+    n_cells = expected[0].number_of_cells
+    params = [
+        {"porosity_max": 0.6, "excess_pressure": np.linspace(0.0, 1e6, n_cells)},
+        {"porosity_max": 0.65, "c": 1e-7},
+        {"porosity_max": 0.6, "mask": np.arange(actual[2].number_of_cells) % 2 == 0},
+    ]
+
+    ensemble = CompactEnsemble()
+    for grid, grid_expected, kwds in zip(actual, expected, params):
+        ensemble.add(grid, **kwds)
+        Compact(grid_expected, **kwds).run_one_step()
+    ensemble.run_one_step()
+
+    for grid, grid_expected in zip(actual, expected):
+        assert_array_almost_equal(grid.event_layers.dz, grid_expected.event_layers.dz)
+
+
+def test_ensemble_with_consolidation():
+    expected, actual = _grids(), _grids()
+
+    ensemble = CompactEnsemble()
+    components = []
+    for grid, grid_expected in zip(actual, expected):
+        ensemble.add(grid, porosity_max=0.6, diffusivity=1e-7)
+        components.append(Compact(grid_expected, porosity_max=0.6, diffusivity=1e-7))
+
+    for _ in range(2):
+        ensemble.run_one_step(dt=1e9)
+        for compact in components:
+            compact.run_one_step(dt=1e9)
+
+    for member, compact in zip(ensemble.components, components):
+        assert_array_almost_equal(
+            member.grid.event_layers.dz, compact.grid.event_layers.dz
+        )
+        assert_array_almost_equal(
+            member.excess_pore_pressure, compact.excess_pore_pressure
+        )
+
+
+def test_ensemble_with_field_params():
+    expected, actual = _grids(), _grids()
+    for grids in (expected, actual):
+        grids[0].add_field(
+            "c", np.linspace(1e-8, 1e-7, grids[0].number_of_cells), at="cell"
+        )
+    params = [{"porosity_max": 0.6, "c": "c"}, PARAMS[1], PARAMS[2]]
+
+    components = [Compact(grid, **p) for grid, p in zip(expected, params)]
+    ensemble = CompactEnsemble()
+    for grid, p in zip(actual, params):
+        ensemble.add(grid, **p)
+
+    for compact in components:
+        compact.run_one_step()
+    ensemble.run_one_step()
+
+    for grid_actual, grid_expected in zip(actual, expected):
+        assert_array_almost_equal(
+            grid_actual.event_layers["porosity"], grid_expected.event_layers["porosity"]
+        )
+
+
+def test_ensemble_with_profile():
+    expected = _grids()
+    components = [Compact(grid, **params) for grid, params in zip(expected, PARAMS)]
+
+    ensemble = CompactEnsemble()
+    for grid, params in zip(_grids(), PARAMS):
+        ensemble.add(grid, profile=True, **params)
+
+    for compact in components:
+        compact.run_one_step()
+    ensemble.run_one_step()
+
+    for actual, grid in zip(ensemble.components, expected):
+        assert actual.stats["calls"] == 1
+        assert_array_almost_equal(
+            actual.grid.event_layers["porosity"], grid.event_layers["porosity"]
+        )
+
+
+def test_ensemble_with_depths():
+    expected = _grids()
+    components = [
+        Compact(grid, depths=[0.0, 50.0, 200.0], **params)
+        for grid, params in zip(expected, PARAMS)
+    ]
+
+    ensemble = CompactEnsemble()
+    for grid, params in zip(_grids(), PARAMS):
+        ensemble.add(grid, depths=[0.0, 50.0, 200.0], **params)
+
+    for compact in components:
+        compact.run_one_step()
+    ensemble.run_one_step()
+
+    for actual, compact in zip(ensemble.components, components):
+        assert not np.all(np.isnan(actual.porosity_at_depth))
+        assert_array_almost_equal(actual.porosity_at_depth, compact.porosity_at_depth)
+
+
+class _Recorder:
+    def __init__(self):
+        self.porosity = []
+
+    def record(self, grid):
+        self.porosity.append(grid.event_layers["porosity"].copy())
+
+
+def test_ensemble_with_recorder():
+    expected = _grids()
+    components = [Compact(grid, **params) for grid, params in zip(expected, PARAMS)]
+
+    ensemble = CompactEnsemble()
+    recorders = [_Recorder() for _ in PARAMS]
+    for grid, params, recorder in zip(_grids(), PARAMS, recorders):
+        ensemble.add(grid, recorder=recorder, **params)
+
+    for _ in range(2):
+        for compact in components:
+            compact.run_one_step()
+        ensemble.run_one_step()
+
+    for recorder, grid in zip(recorders, expected):
+        assert len(recorder.porosity) == 2
+        assert_array_almost_equal(recorder.porosity[-1], grid.event_layers["porosity"])
+
+
+def test_ensemble_with_outputs():
+    expected = _grids()
+    components = [
+        Compact(grid, outputs=["bulk_density"], **params)
+        for grid, params in zip(expected, PARAMS)
+    ]
+
+    ensemble = CompactEnsemble()
+    for grid, params in zip(_grids(), PARAMS):
+        ensemble.add(grid, outputs=["bulk_density"], **params)
+
+    for compact in components:
+        compact.run_one_step()
+    ensemble.run_one_step()
+
+    for actual, compact in zip(ensemble.components, components):
+        assert not np.any(np.isnan(actual.outputs["bulk_density"]))
+        assert_array_almost_equal(
+            actual.outputs["bulk_density"], compact.outputs["bulk_density"]
+        )
+
+
+def test_ensemble_with_tolerance():
+    grids = [RasterModelGrid((4, 5)) for _ in range(2)]
+    kwds = {"porosity_min": 0.1, "porosity_max": 0.6}
+    compact = Compact(grids[0], tolerance=1e-3, **kwds)
+
+    ensemble = CompactEnsemble()
+    member = ensemble.add(grids[1], tolerance=1e-3, **kwds)
+
+    rng = np.random.default_rng(1945)
+    for _ in range(50):
+        dz = rng.uniform(0.0, 0.2, size=6)
+        for grid in grids:
+            grid.event_layers.add(dz, porosity=0.6)
+        compact.run_one_step()
+        ensemble.run_one_step()
+
+    assert member.skipped_steps > 0
+    assert member.skipped_steps == compact.skipped_steps
+    assert_array_almost_equal(
+        grids[1].event_layers["porosity"], grids[0].event_layers["porosity"]
+    )
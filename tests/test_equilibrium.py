@@ -0,0 +1,116 @@
+"""Unit tests for columns compacted to equilibrium."""
+import numpy as np  # type: ignore
+from landlab import RasterModelGrid  # type: ignore
+from pytest import approx, mark, raises  # type: ignore
+
+from compaction.compaction import compact
+from compaction.equilibrium import equilibrium_column
+from compaction.landlab import Compact, add_equilibrium_layers
+
+
+@mark.parametrize("porosity_min", (0.0, 0.1))
+@mark.parametrize("total_thickness", (10.0, 5000.0, [100.0, 3000.0, 0.0]))
+def test_is_steady_state(total_thickness, porosity_min):
+    params = {"porosity_min": porosity_min, "porosity_max": 0.6, "c": 5e-8}
+    dz, porosity = equilibrium_column(total_thickness, 500, **params)
+
+    assert dz.sum(axis=0) == approx(total_thickness)
+
+    dz_new = np.empty_like(dz)
+    assert compact(dz, porosity, return_dz=dz_new, **params) == approx(porosity)
+    assert dz_new == approx(dz)
+
+
+def test_to_analytical():
+    c, rho_s, rho_w, phi_0, g = 3.68e-8, 2650.0, 1000.0, 0.6, 9.81
+    dz, porosity = equilibrium_column(
+        20000.0,
+        2000,
+        c=c,
+        rho_grain=rho_s,
+        rho_void=rho_w,
+        porosity_max=phi_0,
+        gravity=g,
+    )
+
+    z = np.cumsum(dz) - 0.5 * dz
+    phi_analytical = np.exp(-c * g * (rho_s - rho_w) * z) / (
+        np.exp(-c * g * (rho_s - rho_w) * z) + (1.0 - phi_0) / phi_0
+    )
+    assert porosity == approx(phi_analytical, rel=1e-4)
+
+
+def test_per_layer_params():
+    c = np.where(np.arange(200) % 2, 1e-8, 5e-8)
+    porosity_max = np.where(np.arange(200) % 2, 0.45, 0.65)
+    dz, porosity = equilibrium_column(4000.0, 200, c=c, porosity_max=porosity_max)
+
+    assert compact(dz, porosity, c=c, porosity_max=porosity_max) == approx(porosity)
+
+
+def test_uniform_params_by_layer_match_closed_form():
+    expected = equilibrium_column([1000.0, 2000.0], 50, porosity_max=0.6)
+    actual = equilibrium_column(
+        [1000.0, 2000.0], 50, porosity_max=np.full((50, 1), 0.6)
+    )
+    assert actual[1] == approx(expected[1])
+
+
+def test_lithologies():
+    sand = {"c": 1e-8, "porosity_max": 0.45}
+    shale = {"c": 5e-8, "porosity_max": 0.65}
+    sand_fraction = np.linspace(0.0, 1.0, 100)
+    fractions = [sand_fraction, 1.0 - sand_fraction]
+
+    dz, porosity = equilibrium_column(
+        2000.0, 100, lithologies=[sand, shale], fractions=fractions
+    )
+    assert compact(
+        dz, porosity, lithologies=[sand, shale], fractions=fractions
+    ) == approx(porosity)
+
+
+def test_no_compaction():
+    dz, porosity = equilibrium_column(100.0, 10, c=0.0, porosity_max=0.5)
+    assert porosity == approx(0.5)
+
+
+@mark.parametrize("args", ((100.0, 0), (-1.0, 10)))
+def test_bad_args(args):
+    with raises(ValueError):
+        equilibrium_column(*args)
+
+
+def test_add_equilibrium_layers():
+    grid = RasterModelGrid((3, 5))
+    thickness = np.array([100.0, 1000.0, 2000.0])
+    add_equilibrium_layers(grid, thickness, 50, porosity_min=0.1, porosity_max=0.6)
+
+    assert grid.event_layers.number_of_layers == 50
+    assert grid.event_layers.thickness == approx(thickness)
+
+    porosity = grid.event_layers["porosity"].copy()
+    Compact(grid, porosity_min=0.1, porosity_max=0.6).run_one_step()
+    assert grid.event_layers["porosity"] == approx(porosity)
+
+
+def test_add_equilibrium_layers_with_lithologies():
+    grid = RasterModelGrid((3, 5))
+    lithologies = {"sand": {"c": 1e-8, "porosity_max": 0.45}, "shale": {"c": 5e-8}}
+    sand = np.linspace(0.0, 1.0, 20).reshape((-1, 1))
+    add_equilibrium_layers(
+        grid,
+        1000.0,
+        20,
+        lithologies=lithologies,
+        fractions={"sand": sand, "shale": 1.0 - sand},
+        porosity_max=0.65,
+    )
+    assert grid.event_layers["sand"][::-1, 0] == approx(sand[:, 0])
+
+    porosity = grid.event_layers["porosity"].copy()
+    Compact(grid, lithologies=lithologies, porosity_max=0.65).run_one_step()
+    assert grid.event_layers["porosity"] == approx(porosity)
+
+    with raises(ValueError):
+        add_equilibrium_layers(grid, 1000.0, 20, lithologies=lithologies)
@@ -0,0 +1,157 @@
+"""Unit tests for recording the history of event layers."""
+import numpy as np  # type: ignore
+from landlab import RasterModelGrid  # type: ignore
+from pytest import approx, fixture, importorskip, mark, raises  # type: ignore
+
+zarr = importorskip("zarr")
+
+from compaction.history import HistoryRecorder, read_snapshot  # noqa: E402
+from compaction.landlab import Compact  # noqa: E402
+
+
+@fixture()
+def grid():
+    return RasterModelGrid((4, 5))
+
+
+def _run(grid, compact, n_steps, seed=1945):
+    rng = np.random.default_rng(seed)
+    snapshots = []
+    for _ in range(n_steps):
+        grid.event_layers.add(
+            rng.uniform(-20.0, 100.0, grid.number_of_cells),
+            porosity=rng.uniform(0.4, 0.6, grid.number_of_cells),
+        )
+        compact.run_one_step()
+        snapshots.append(
+            {
+                "dz": grid.event_layers.dz.copy(),
+                "porosity": grid.event_layers["porosity"].copy(),
+            }
+        )
+    return snapshots
+
+
+@mark.parametrize("tolerance", (0.0, 1e-6, 1e-3))
+def test_reconstructs_every_step(tmp_path, grid, tolerance):
+    recorder = HistoryRecorder(str(tmp_path / "history.zarr"), tolerance=tolerance)
+    compact = Compact(grid, porosity_max=0.6, recorder=recorder)
+    snapshots = _run(grid, compact, 20)
+    recorder.close()
+
+    assert recorder.number_of_steps == 20
+    for step, expected in enumerate(snapshots):
+        actual = recorder.snapshot(step)
+        for name in ("dz", "porosity"):
+            assert actual[name].shape == expected[name].shape
+            assert np.all(np.abs(actual[name] - expected[name]) <= tolerance)
+
+
+def test_read_snapshot_from_path(tmp_path, grid):
+    path = str(tmp_path / "history.zarr")
+    with HistoryRecorder(path) as recorder:
+        compact = Compact(grid, porosity_max=0.6, recorder=recorder)
+        snapshots = _run(grid, compact, 5)
+
+    assert read_snapshot(path, 2)["porosity"] == approx(snapshots[2]["porosity"])
+    assert read_snapshot(path, -1)["dz"] == approx(snapshots[-1]["dz"])
+
+
+def test_stores_only_changes(grid):
+    recorder = HistoryRecorder({}, tolerance=1e-3)
+    compact = Compact(grid, porosity_max=0.6, c=1e-9, recorder=recorder)
+    snapshots = _run(grid, compact, 50)
+    recorder.close()
+
+    n_values = sum(snapshot["porosity"].size for snapshot in snapshots)
+    n_changes = recorder._group["porosity/value"].shape[0]
+    assert n_changes < n_values / 4
+
+
+def test_records_new_layers_below_tolerance(grid):
+    recorder = HistoryRecorder({}, tolerance=1.0)
+    for _ in range(3):
+        grid.event_layers.add(0.5, porosity=0.5)
+        recorder.record(grid)
+
+    assert recorder.snapshot(-1)["dz"] == approx(np.full((3, 6), 0.5))
+    assert recorder.snapshot(-1)["porosity"] == approx(np.full((3, 6), 0.5))
+
+
+def test_fewer_layers(grid):
+    recorder = HistoryRecorder({}, tolerance=0.0)
+    for porosity in (0.1, 0.2, 0.3, 0.4):
+        grid.event_layers.add(1.0, porosity=porosity)
+        recorder.record(grid)
+    grid.event_layers.reduce(1, 4, porosity=np.mean)
+    recorder.record(grid)
+    grid.event_layers.add(1.0, porosity=0.5)
+    recorder.record(grid)
+
+    assert recorder.snapshot(3)["porosity"][:, 0] == approx([0.1, 0.2, 0.3, 0.4])
+    assert recorder.snapshot(4)["porosity"] == approx(grid.event_layers["porosity"][:2])
+    assert recorder.snapshot(5)["porosity"] == approx(grid.event_layers["porosity"])
+    assert recorder.snapshot(5)["dz"] == approx(grid.event_layers.dz)
+
+
+def test_fields(grid):
+    recorder = HistoryRecorder({}, fields=("porosity",))
+    grid.event_layers.add(1.0, porosity=0.5)
+    recorder.record(grid)
+
+    assert list(recorder.snapshot(0)) == ["porosity"]
+
+
+def test_step_out_of_range(grid):
+    recorder = HistoryRecorder({})
+    grid.event_layers.add(1.0, porosity=0.5)
+    recorder.record(grid)
+
+    with raises(IndexError):
+        recorder.snapshot(1)
+    with raises(IndexError):
+        recorder.snapshot(-2)
+
+
+def test_number_of_cells_changed(grid):
+    recorder = HistoryRecorder({})
+    grid.event_layers.add(1.0, porosity=0.5)
+    recorder.record(grid)
+
+    other = RasterModelGrid((3, 3))
+    other.event_layers.add(1.0, porosity=0.5)
+    with raises(ValueError):
+        recorder.record(other)
+
+
+class _FailingStore(dict):
+    fail = False
+
+    def __setitem__(self, key, value):
+        if self.fail and key.startswith("dz/value/"):
+            raise OSError("disk full")
+        super().__setitem__(key, value)
+
+
+def test_write_error(grid):
+    store = _FailingStore()
+    recorder = HistoryRecorder(store)
+    store.fail = True
+
+    grid.event_layers.add(1.0, porosity=0.5)
+    recorder.record(grid)
+    with raises(RuntimeError):
+        recorder.close()
+    with raises(RuntimeError):
+        recorder.record(grid)
+
+
+@mark.parametrize("kwds", ({"tolerance": -1.0}, {"queue_size": 0}))
+def test_bad_args(kwds):
+    with raises(ValueError):
+        HistoryRecorder({}, **kwds)
+
+
+def test_bad_recorder(grid):
+    with raises(ValueError):
+        Compact(grid, recorder=object())
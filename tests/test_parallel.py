@@ -0,0 +1,79 @@
+"""Unit tests for compacting columns in parallel."""
+import numpy as np  # type: ignore
+from numpy.testing import assert_array_almost_equal  # type: ignore
+from pytest import mark, raises  # type: ignore
+
+from compaction import parallel
+from compaction.compaction import compact
+
+
+@mark.parametrize("executor", parallel.EXECUTORS)
+@mark.parametrize("workers", (1, 2, 4, 64))
+def test_matches_serial(layers, executor, workers):
+    dz, phi = layers
+    dz_expected = np.empty_like(dz)
+    phi_expected = compact(dz, phi, porosity_max=0.5, return_dz=dz_expected)
+
+    dz_actual = np.empty_like(dz)
+    phi_actual = parallel.compact(
+        dz,
+        phi,
+        porosity_max=0.5,
+        return_dz=dz_actual,
+        executor=executor,
+        workers=workers,
+    )
+
+    assert_array_almost_equal(phi_actual, phi_expected)
+    assert_array_almost_equal(dz_actual, dz_expected)
+
+
+@mark.parametrize("executor", parallel.EXECUTORS)
+def test_array_params(layers, executor):
+    dz, phi = layers
+    c = np.linspace(1e-8, 1e-6, dz.shape[1])
+    porosity_min = np.linspace(0.0, 0.2, dz.shape[0]).reshape((-1, 1))
+    excess_pressure = np.full_like(dz, 1e3)
+
+    phi_expected = compact(
+        dz, phi, c=c, porosity_min=porosity_min, excess_pressure=excess_pressure
+    )
+    phi_actual = parallel.compact(
+        dz,
+        phi,
+        c=c,
+        porosity_min=porosity_min,
+        excess_pressure=excess_pressure,
+        executor=executor,
+        workers=3,
+    )
+
+    assert_array_almost_equal(phi_actual, phi_expected)
+
+
+@mark.parametrize("executor", parallel.EXECUTORS)
+def test_one_column(layers, executor):
+    dz, phi = layers
+    phi_actual = parallel.compact(dz[:, 0], phi[:, 0], executor=executor, workers=4)
+
+    assert_array_almost_equal(phi_actual, compact(dz[:, 0], phi[:, 0]))
+
+
+def test_inputs_are_unchanged(layers):
+    dz, phi = layers
+    dz_copy, phi_copy = dz.copy(), phi.copy()
+    parallel.compact(dz, phi, executor="process", workers=2)
+
+    assert np.all(dz == dz_copy)
+    assert np.all(phi == phi_copy)
+
+
+def test_bad_executor(layers):
+    with raises(ValueError):
+        parallel.compact(*layers, executor="gpu")
+
+
+def test_bad_return_dz(layers):
+    dz, phi = layers
+    with raises(TypeError):
+        parallel.compact(dz, phi, return_dz=np.empty((1, 30)), workers=2)
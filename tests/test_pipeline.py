@@ -0,0 +1,95 @@
+"""Unit tests for the pipelined batch executor."""
+import numpy as np  # type: ignore
+from pytest import approx, mark, raises  # type: ignore
+
+from compaction.cli import load_layers, run_compaction, run_compaction_batch
+from compaction.pipeline import STAGES, run_pipeline
+
+
+def _write_inputs(n_files, n_layers=50):
+    rng = np.random.default_rng(1945)
+    srcs = []
+    for i in range(n_files):
+        src = f"layers-{i}.csv"
+        np.savetxt(
+            src,
+            np.column_stack(
+                (rng.uniform(0.5, 2.0, n_layers), rng.uniform(0.3, 0.5, n_layers))
+            ),
+            delimiter=",",
+        )
+        srcs.append(src)
+    return srcs
+
+
+@mark.parametrize("readers,workers,writers", ((1, 1, 1), (2, 3, 2)))
+@mark.parametrize("queue_size", (1, 4))
+def test_pipeline_matches_run(tmpdir, readers, workers, writers, queue_size):
+    with tmpdir.as_cwd():
+        srcs = _write_inputs(10)
+        dests = [f"out-{i}.csv" for i in range(10)]
+        expected = [f"expected-{i}.csv" for i in range(10)]
+
+        report = run_pipeline(
+            srcs,
+            dests,
+            readers=readers,
+            workers=workers,
+            writers=writers,
+            queue_size=queue_size,
+            porosity_max=0.5,
+        )
+        for src, dest, expected_dest in zip(srcs, dests, expected):
+            run_compaction(src, expected_dest, porosity_max=0.5)
+            for actual, desired in zip(load_layers(dest), load_layers(expected_dest)):
+                assert actual == approx(desired)
+
+    assert [run["src"] for run in report.metrics] == srcs
+    assert all(run["layers"] == 50 for run in report.metrics)
+
+
+def test_pipeline_utilization(tmpdir):
+    with tmpdir.as_cwd():
+        srcs = _write_inputs(5)
+        report = run_pipeline(srcs, [f"out-{src}" for src in srcs], workers=2)
+
+    assert tuple(report.utilization) == STAGES
+    assert report.utilization["compute"]["workers"] == 2
+    for usage in report.utilization.values():
+        assert 0.0 <= usage["utilization"] <= 1.0
+        assert usage["busy"] > 0.0
+
+
+def test_pipeline_error_is_raised(tmpdir):
+    with tmpdir.as_cwd():
+        srcs = _write_inputs(6) + ["missing.csv"] + _write_inputs(6)
+        with raises(FileNotFoundError):
+            run_pipeline(srcs, [f"out-{i}.csv" for i in range(len(srcs))])
+
+
+def test_pipeline_without_files():
+    report = run_pipeline([], [])
+    assert report.metrics == []
+
+
+@mark.parametrize(
+    "kwds", ({"readers": 0}, {"workers": 0}, {"writers": 0}, {"queue_size": 0})
+)
+def test_pipeline_bad_args(kwds):
+    with raises(ValueError):
+        run_pipeline(["a.csv"], ["b.csv"], **kwds)
+
+
+def test_pipeline_mismatched_files():
+    with raises(ValueError):
+        run_pipeline(["a.csv", "b.csv"], ["c.csv"])
+
+
+def test_batch_with_pipeline_executor(tmpdir):
+    with tmpdir.as_cwd():
+        srcs = _write_inputs(4)
+        metrics = run_compaction_batch(
+            srcs, [f"out-{src}" for src in srcs], executor="pipeline", workers=2
+        )
+
+    assert [run["src"] for run in metrics] == srcs
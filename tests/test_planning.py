@@ -0,0 +1,265 @@
+"""Unit tests for compacting layers within a memory budget."""
+import tracemalloc
+
+import numpy as np  # type: ignore
+from pytest import approx, fixture, mark, raises  # type: ignore
+
+from compaction.compaction import OUTPUTS, compact
+from compaction.planning import (
+    MemoryBudgetError,
+    Plan,
+    estimate_memory,
+    parse_memory,
+    plan,
+)
+
+SAND = {"c": 1e-8, "porosity_min": 0.05, "porosity_max": 0.45}
+SHALE = {"c": 5e-8, "porosity_min": 0.02, "porosity_max": 0.65}
+
+
+@fixture()
+def layers_shape():
+    return (500, 400)
+
+
+def _peak_memory(func, *args, **kwds):
+    tracemalloc.start()
+    try:
+        result = func(*args, **kwds)
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@mark.parametrize("max_memory", (10_000_000, 4_000_000, 2_000_000))
+@mark.parametrize(
+    "kwds",
+    (
+        {},
+        {"lithologies": [SAND, SHALE]},
+        {"summation": "kahan"},
+    ),
+)
+@mark.parametrize("with_dz", (False, True))
+def test_peak_memory_within_budget(layers, max_memory, kwds, with_dz):
+    dz, porosity = layers
+    if "lithologies" in kwds:
+        sand = np.linspace(0.0, 1.0, dz.shape[0]).reshape((-1, 1))
+        kwds = kwds | {"fractions": [sand, 1.0 - sand]}
+    dz_new = np.empty_like(dz) if with_dz else None
+
+    _, peak = _peak_memory(compact, dz, porosity, max_memory=max_memory, **kwds)
+    assert peak <= max_memory
+
+    _, peak = _peak_memory(
+        compact, dz, porosity, return_dz=dz_new, max_memory=max_memory, **kwds
+    )
+    assert peak <= max_memory
+
+
+def test_estimate_is_an_upper_bound(layers):
+    dz, porosity = layers
+    for kwds in ({}, {"return_dz": np.empty_like(dz)}):
+        _, peak = _peak_memory(compact, dz, porosity, **kwds)
+        estimate = estimate_memory(dz.shape, return_dz="return_dz" in kwds)
+        assert peak <= estimate < 1.2 * peak
+
+
+@mark.parametrize("with_dz", (False, True))
+def test_estimate_with_lithologies_is_an_upper_bound(layers, with_dz):
+    dz, porosity = layers
+    sand = np.random.default_rng(1973).uniform(0.0, 1.0, dz.shape)
+    _, peak = _peak_memory(
+        compact,
+        dz,
+        porosity,
+        return_dz=np.empty_like(dz) if with_dz else None,
+        lithologies=[SAND, SHALE],
+        fractions=[sand, 1.0 - sand],
+    )
+    assert peak <= estimate_memory(dz.shape, return_dz=with_dz, lithologies=True)
+
+
+@mark.parametrize("layers_shape", ((200_000, 3),))
+def test_blocks_with_lithologies_within_budget(layers):
+    dz, porosity = layers
+    sand = np.random.default_rng(1973).uniform(0.0, 1.0, dz.shape)
+    kwds = {"lithologies": [SAND, SHALE], "fractions": [sand, 1.0 - sand]}
+    dz_expected, dz_actual = np.empty_like(dz), np.empty_like(dz)
+
+    expected = compact(dz, porosity, return_dz=dz_expected, **kwds)
+    actual, peak = _peak_memory(
+        compact, dz, porosity, return_dz=dz_actual, max_memory="8 MB", **kwds
+    )
+
+    assert peak <= 8_000_000
+    assert actual == approx(expected, rel=1e-12)
+    assert dz_actual == approx(dz_expected, rel=1e-12)
+
+
+def test_blocks_of_columns_match_whole(layers):
+    dz, porosity = layers
+    c = np.full(dz.shape, 5e-8)
+    dz_expected, dz_actual = np.empty_like(dz), np.empty_like(dz)
+
+    expected = compact(dz, porosity, c=c, return_dz=dz_expected)
+    actual = compact(dz, porosity, c=c, return_dz=dz_actual, max_memory=2_000_000)
+
+    assert plan(dz.shape, 2_000_000, return_dz=True).strategy == "columns"
+    assert np.all(actual == expected)
+    assert np.all(dz_actual == dz_expected)
+
+
+@mark.parametrize("layers_shape", ((200_000,),))
+@mark.parametrize("summation", ("cumsum", "pairwise", "kahan"))
+@mark.parametrize("in_place", (False, True))
+def test_blocks_of_layers_match_whole(layers, summation, in_place):
+    dz, porosity = layers
+    c = np.full(dz.shape, 5e-8)
+    dz_expected = np.empty_like(dz)
+    dz_actual = dz.copy() if in_place else np.empty_like(dz)
+
+    expected = compact(dz, porosity, c=c, summation=summation, return_dz=dz_expected)
+    actual, peak = _peak_memory(
+        compact,
+        dz_actual if in_place else dz,
+        porosity,
+        c=c,
+        summation=summation,
+        return_dz=dz_actual,
+        max_memory="4 MB",
+    )
+
+    assert plan(dz.shape, "4 MB", return_dz=True).strategy == "layers"
+    assert peak <= 4_000_000
+    assert actual == approx(expected, rel=1e-12)
+    assert dz_actual == approx(dz_expected, rel=1e-12)
+
+
+@mark.parametrize("stacked", (False, True))
+def test_blocks_of_layers_with_lithologies(stacked):
+    dz = np.full((20000, 2), 1.0)
+    sand = np.linspace(0.0, 1.0, dz.shape[0]).reshape((-1, 1))
+    fractions = [sand, 1.0 - sand]
+    kwds = {
+        "lithologies": [SAND, SHALE],
+        "fractions": np.stack(np.broadcast_arrays(*fractions))
+        if stacked
+        else fractions,
+    }
+
+    assert plan(dz.shape, "1 MB", lithologies=True).strategy == "layers"
+    assert compact(dz, 0.65, max_memory="1 MB", **kwds) == approx(
+        compact(dz, 0.65, **kwds), rel=1e-12
+    )
+
+
+def test_blocks_of_columns_with_stacked_fractions(layers):
+    dz, porosity = layers
+    sand = np.linspace(0.0, 1.0, dz.size).reshape(dz.shape)
+    kwds = {"lithologies": [SAND, SHALE], "fractions": np.stack([sand, 1.0 - sand])}
+
+    assert plan(dz.shape, 2_000_000, lithologies=True).strategy == "columns"
+    assert np.all(
+        compact(dz, porosity, max_memory=2_000_000, **kwds)
+        == compact(dz, porosity, **kwds)
+    )
+
+
+@mark.parametrize(
+    "layers_shape,max_memory", (((400, 500), 4_000_000), ((3, 200_000), "8 MB"))
+)
+@mark.parametrize("kwds", ({}, {"summation": "kahan"}, {"lithologies": [SAND, SHALE]}))
+def test_layer_axis_within_budget(layers, max_memory, kwds):
+    dz, porosity = layers
+    if "lithologies" in kwds:
+        sand = np.random.default_rng(1973).uniform(0.0, 1.0, dz.shape)
+        kwds = kwds | {"fractions": np.stack([sand, 1.0 - sand])}
+    dz_expected, dz_actual = np.empty_like(dz), np.empty_like(dz)
+
+    expected = compact(dz, porosity, axis=1, return_dz=dz_expected, **kwds)
+    actual, peak = _peak_memory(
+        compact,
+        dz,
+        porosity,
+        axis=1,
+        return_dz=dz_actual,
+        max_memory=max_memory,
+        **kwds,
+    )
+
+    assert peak <= parse_memory(max_memory)
+    assert actual == approx(expected, rel=1e-12)
+    assert dz_actual == approx(dz_expected, rel=1e-12)
+
+
+@mark.parametrize("max_memory", (1_000_000, 5_000_000))
+def test_layer_axis_budget_too_small(max_memory):
+    dz = np.full((3, 200_000), 1.0)
+    with raises(MemoryBudgetError):
+        compact(dz, 0.5, axis=1, return_dz=np.empty_like(dz), max_memory=max_memory)
+
+
+def test_converts_blocks(layers):
+    dz, porosity = layers
+    assert compact(dz.astype(np.float32), porosity, max_memory=2_000_000) == approx(
+        compact(dz.astype(np.float32), porosity)
+    )
+
+
+def test_plan_whole():
+    assert plan((10, 10)) == Plan("whole", 10, 1, estimate_memory((10, 10)), None)
+    assert plan((10, 10), max_memory="1 GB").strategy == "whole"
+
+
+def test_plan_blocks_fit():
+    for shape in ((1000, 1000), (1000000,), (100, 30, 40)):
+        memory_plan = plan(shape, max_memory=2_000_000 + np.prod(shape) * 8)
+        assert memory_plan.strategy != "whole"
+        assert memory_plan.peak_memory <= memory_plan.max_memory
+        assert memory_plan.n_blocks * memory_plan.block_size >= (
+            shape[0] if memory_plan.strategy == "layers" else shape[-1]
+        )
+
+
+def test_plan_budget_too_small():
+    with raises(MemoryBudgetError):
+        plan((1000, 1000), max_memory=8_000_000)
+
+
+@mark.parametrize(
+    "value,expected",
+    ((100, 100), ("100", 100), ("1kB", 1000), ("2 MiB", 2 * 1024**2), ("1e3", 1000)),
+)
+def test_parse_memory(value, expected):
+    assert parse_memory(value) == expected
+
+
+@mark.parametrize("value", ("lots", "1 parsec", -1))
+def test_parse_bad_memory(value):
+    with raises(ValueError):
+        parse_memory(value)
+
+
+@mark.parametrize("layers_shape", ((500, 400), (200_000,)))
+@mark.parametrize(
+    "names",
+    (("bulk_density", "overburden_stress"), ("depth_to_top",), OUTPUTS),
+)
+def test_outputs_within_budget(layers, names):
+    dz, porosity = layers
+    # Room for the new porosities, the outputs and about one more array.
+    max_memory = 8 * dz.size * (len(names) + 2)
+
+    expected = dict.fromkeys(names)
+    compact(dz, porosity, outputs=expected)
+
+    outputs = dict.fromkeys(names)
+    _, peak = _peak_memory(
+        compact, dz, porosity, outputs=outputs, max_memory=max_memory
+    )
+    memory_plan = plan(dz.shape, max_memory - 8 * dz.size * len(names), outputs=names)
+    assert memory_plan.strategy != "whole"
+    assert peak <= max_memory
+    for name in names:
+        assert outputs[name] == approx(expected[name], rel=1e-12, abs=1e-9)
@@ -0,0 +1,127 @@
+"""Unit tests for profiling compaction."""
+import json
+import shutil
+
+import numpy as np  # type: ignore
+from click.testing import CliRunner
+from landlab import RasterModelGrid  # type: ignore
+
+from compaction import cli, profiling
+from compaction.compaction import compact
+from compaction.landlab import Compact
+
+
+def test_disabled_by_default():
+    assert profiling.start((10, 5)) is None
+    assert profiling.timer() is None
+
+
+def test_profile_compact():
+    dz = np.full((100, 10), 1.0)
+    phi = np.full((100, 10), 0.5)
+
+    with profiling.profile() as stats:
+        compact(dz, phi)
+        compact(dz, phi, return_dz=np.empty_like(dz))
+
+    assert stats.calls == 2
+    assert stats.layers == 200
+    assert stats.columns == 20
+    assert stats.stages["load"]["calls"] == 2
+    assert stats.stages["dz"]["calls"] == 1
+    assert stats.stages["dz"]["bytes"] == dz.nbytes
+    assert stats.stages["exp"]["bytes"] == 2 * dz.nbytes
+    for totals in stats.stages.values():
+        assert totals["seconds"] >= 0.0
+
+
+def test_profile_is_inactive_outside_context():
+    dz = np.full((100, 10), 1.0)
+    with profiling.profile() as stats:
+        compact(dz, 0.5)
+    compact(dz, 0.5)
+
+    assert stats.calls == 1
+
+
+def test_nested_profiles():
+    dz = np.full(10, 1.0)
+    with profiling.profile() as outer:
+        compact(dz, 0.5)
+        with profiling.profile() as inner:
+            compact(dz, 0.5)
+
+    assert outer.calls == 2
+    assert inner.calls == 1
+
+
+def test_accumulate_into_existing_profile():
+    stats = profiling.Profile()
+    for _ in range(3):
+        with profiling.profile(stats):
+            compact(np.full(10, 1.0), 0.5)
+    assert stats.calls == 3
+
+    stats.clear()
+    assert stats.as_dict() == {"calls": 0, "layers": 0, "columns": 0, "stages": {}}
+
+
+def test_as_json():
+    with profiling.profile() as stats:
+        compact(np.full((10, 3), 1.0), 0.5)
+
+    assert json.loads(stats.to_json()) == stats.as_dict()
+
+
+def test_component_stats():
+    grid = RasterModelGrid((3, 5))
+    for _ in range(10):
+        grid.event_layers.add(1.0, porosity=0.5)
+
+    assert Compact(grid).stats is None
+
+    component = Compact(grid, porosity_max=0.5, profile=True)
+    for _ in range(4):
+        component.run_one_step()
+
+    stats = component.stats
+    assert stats["calls"] == 4
+    assert stats["layers"] == 40
+    assert stats["columns"] == 12
+    for stage in ("slice", "compact", "store", "load", "cumsum", "exp", "dz"):
+        assert stats["stages"][stage]["calls"] == 4
+    assert "consolidate" not in stats["stages"]
+
+
+def test_component_stats_with_consolidation():
+    grid = RasterModelGrid((3, 5))
+    for _ in range(10):
+        grid.event_layers.add(1.0, porosity=0.5)
+
+    component = Compact(grid, porosity_max=0.5, diffusivity=1e-6, profile=True)
+    component.run_one_step(dt=1.0)
+
+    assert component.stats["stages"]["consolidate"]["calls"] == 1
+
+
+def test_cli_profile(tmpdir, datadir):
+    with tmpdir.as_cwd():
+        shutil.copy(datadir / "compaction.toml", ".")
+        shutil.copy(datadir / "porosity.csv", ".")
+
+        result = CliRunner(mix_stderr=False).invoke(cli.run, ["--profile"])
+        assert result.exit_code == 0
+        assert (tmpdir / "porosity-out.csv").exists()
+
+    stats = json.loads(result.stdout)
+    assert stats["calls"] == 1
+    assert stats["layers"] == 5
+    assert sorted(stats["stages"]) == [
+        "compute",
+        "cumsum",
+        "dz",
+        "exp",
+        "load",
+        "read",
+        "write",
+    ]
@@ -0,0 +1,129 @@
+"""Unit tests for resampling layers onto a depth grid."""
+import numpy as np  # type: ignore
+from pytest import approx, mark, raises  # type: ignore
+
+from compaction.resample import resample_to_depth, resample_to_depth_by_chunk
+
+
+def _resample_by_column(dz, porosity, depths):
+    out = np.empty((len(depths) - 1, dz.shape[1]))
+    for column in range(dz.shape[1]):
+        top = np.concatenate(([0.0], np.cumsum(dz[:, column])))
+        pores = np.concatenate(([0.0], np.cumsum(dz[:, column] * porosity[:, column])))
+        depth = np.clip(depths, 0.0, top[-1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[:, column] = np.where(
+                np.diff(depth) > 0.0,
+                np.diff(np.interp(depth, top, pores)) / np.diff(depth),
+                np.nan,
+            )
+    return out
+
+
+def _layers(n_layers, n_columns, seed=1945):
+    rng = np.random.default_rng(seed)
+    dz = rng.uniform(0.0, 2.0, (n_layers, n_columns))
+    dz[rng.uniform(size=dz.shape) < 0.1] = 0.0
+    return dz, rng.uniform(0.05, 0.6, dz.shape)
+
+
+@mark.parametrize("depths", ([0.0, 10.0, 50.0], np.linspace(-5.0, 250.0, 33)))
+def test_matches_interp_by_column(depths):
+    dz, porosity = _layers(200, 50)
+    assert resample_to_depth(dz, porosity, depths) == approx(
+        _resample_by_column(dz, porosity, depths), nan_ok=True
+    )
+
+
+def test_conserves_pore_space():
+    dz, porosity = _layers(100, 20)
+    depths = np.linspace(0.0, dz.sum(axis=0).max(), 17)
+
+    resampled = resample_to_depth(dz, porosity, depths)
+
+    sediment = np.diff(np.clip(depths.reshape((-1, 1)), 0.0, dz.sum(axis=0)), axis=0)
+    assert np.nansum(resampled * sediment, axis=0) == approx(
+        (dz * porosity).sum(axis=0)
+    )
+
+
+def test_depths_by_column():
+    dz, porosity = _layers(100, 20)
+    depths = np.linspace(0.0, 50.0, 11).reshape((-1, 1)) + np.arange(20)
+
+    resampled = resample_to_depth(dz, porosity, depths)
+    for column in range(20):
+        assert resampled[:, column] == approx(
+            resample_to_depth(dz[:, column], porosity[:, column], depths[:, column]),
+            nan_ok=True,
+        )
+
+
+def test_nd_columns():
+    dz, porosity = _layers(30, 12)
+    depths = [0.0, 5.0, 10.0, 20.0]
+
+    expected = resample_to_depth(dz, porosity, depths)
+    actual = resample_to_depth(
+        dz.reshape((30, 3, 4)), porosity.reshape((30, 3, 4)), depths
+    )
+    assert actual.shape == (3, 3, 4)
+    assert actual.reshape((3, 12)) == approx(expected, nan_ok=True)
+
+
+def test_out_keyword():
+    dz, porosity = _layers(30, 12)
+    out = np.empty((3, 12))
+    assert resample_to_depth(dz, porosity, [0.0, 5.0, 10.0, 20.0], out=out) is out
+
+    with raises(ValueError):
+        resample_to_depth(dz, porosity, [0.0, 5.0, 10.0, 20.0], out=np.empty((4, 12)))
+
+
+def test_no_layers():
+    resampled = resample_to_depth(np.empty((0, 3)), 0.5, [0.0, 1.0])
+    assert np.all(np.isnan(resampled))
+
+
+@mark.parametrize("depths", ([0.0], [0.0, 2.0, 1.0]))
+def test_bad_depths(depths):
+    with raises(ValueError):
+        resample_to_depth(np.ones((3, 2)), 0.5, depths)
+
+
+@mark.parametrize("chunk_size", (1, 7, 100))
+def test_by_chunk(tmp_path, chunk_size):
+    dz, porosity = _layers(50, 40)
+    np.save(tmp_path / "dz.npy", dz)
+    np.save(tmp_path / "porosity.npy", porosity)
+    depths = np.linspace(0.0, 60.0, 13)
+
+    out = np.lib.format.open_memmap(
+        tmp_path / "resampled.npy", mode="w+", shape=(12, 40)
+    )
+    resample_to_depth_by_chunk(
+        np.load(tmp_path / "dz.npy", mmap_mode="r"),
+        np.load(tmp_path / "porosity.npy", mmap_mode="r"),
+        depths,
+        out=out,
+        chunk_size=chunk_size,
+    )
+    out.flush()
+
+    assert np.load(tmp_path / "resampled.npy") == approx(
+        resample_to_depth(dz, porosity, depths), nan_ok=True
+    )
+
+
+def test_by_chunk_with_depths_by_column():
+    dz, porosity = _layers(50, 40)
+    depths = np.linspace(0.0, 60.0, 13).reshape((-1, 1)) + np.arange(40) / 10.0
+
+    assert resample_to_depth_by_chunk(dz, porosity, depths, chunk_size=3) == approx(
+        resample_to_depth(dz, porosity, depths), nan_ok=True
+    )
+
+
+def test_by_chunk_bad_chunk_size():
+    with raises(ValueError):
+        resample_to_depth_by_chunk(np.ones((3, 2)), 0.5, [0.0, 1.0], chunk_size=0)
@@ -0,0 +1,50 @@
+"""Unit tests for the stages of a run."""
+import numpy as np  # type: ignore
+from pytest import mark, raises  # type: ignore
+
+from compaction.compaction import compact
+from compaction.stages import (
+    compute_stage,
+    load_table,
+    read_stage,
+    run_metrics,
+    save_table,
+    write_stage,
+)
+
+
+def test_csv_round_trip_is_exact(tmpdir):
+    data = np.random.default_rng(1945).uniform(size=(50, 2))
+    with tmpdir.as_cwd():
+        save_table("layers.csv", data, header="Layer Thickness [m], Porosity [-]")
+        actual = load_table("layers.csv")
+
+    assert np.all(actual == data)
+
+
+@mark.parametrize("layers_shape", ((20,),))
+def test_stages(tmpdir, layers):
+    data = np.column_stack(layers)
+
+    with tmpdir.as_cwd():
+        np.save("layers.npy", data)
+
+        data, params = read_stage("layers.npy")
+        result = compute_stage(data, **params)
+        write_stage("layers-out.npy", result)
+
+        actual = np.load("layers-out.npy")
+        metrics = run_metrics("layers.npy", data.shape[:1], 1.0, 2.0, 1.0)
+
+    assert params == {}
+    assert np.all(actual[:, 1] == compact(data[:, 0], data[:, 1]))
+    assert metrics["layers"] == 20
+    assert metrics["seconds"] == 4.0
+    assert metrics["layers_per_second"] == 5.0
+
+
+def test_read_stage_with_missing_fractions(tmpdir):
+    with tmpdir.as_cwd():
+        np.save("layers.npy", np.ones((5, 3)))
+        with raises(ValueError, match="fraction column for each of 2"):
+            read_stage("layers.npy", lithologies={"sand": {}, "shale": {}})
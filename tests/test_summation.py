@@ -0,0 +1,83 @@
+"""Unit tests for summation of overlying loads."""
+import math
+
+import numpy as np  # type: ignore
+from pytest import approx, mark, raises  # type: ignore
+
+from compaction.compaction import compact, compacted_thickness
+from compaction.summation import METHODS, exclusive_cumsum
+
+
+def _exact_exclusive_cumsum(x, indices):
+    """Correctly rounded exclusive sums of a 1D array at some indices."""
+    return np.array([math.fsum(x[:i]) for i in indices])
+
+
+@mark.parametrize("method", METHODS)
+@mark.parametrize("n_layers", (0, 1, 2, 5, 127, 128, 129, 1000))
+def test_exclusive_cumsum(method, n_layers) -> None:
+    rng = np.random.default_rng(1945)
+    x = rng.uniform(0.0, 1.0, size=(n_layers, 3))
+
+    sums = exclusive_cumsum(x, method=method, block_size=8)
+
+    assert sums.shape == x.shape
+    assert np.all(sums[:1] == 0.0)
+    assert sums == approx(np.cumsum(x, axis=0) - x)
+
+
+@mark.parametrize("method", METHODS)
+def test_exclusive_cumsum_of_view(method) -> None:
+    x = np.arange(200.0).reshape((50, 4))[::-1, ::2]
+    out = np.empty((2, 50)).T
+
+    sums = exclusive_cumsum(x, method=method, block_size=4, out=out)
+
+    assert sums is out
+    assert sums == approx(np.cumsum(x, axis=0) - x)
+
+
+def test_exclusive_cumsum_keeps_dtype() -> None:
+    x = np.ones(1000, dtype=np.float32)
+    assert exclusive_cumsum(x).dtype == np.float32
+
+
+@mark.parametrize("method", ("pairwise", "kahan"))
+def test_exclusive_cumsum_is_accurate(method) -> None:
+    rng = np.random.default_rng(1945)
+    x = rng.lognormal(size=100_000).astype(np.float32)
+    indices = np.arange(0, len(x), 1000)
+    expected = _exact_exclusive_cumsum(x.astype(float), indices)
+
+    naive = exclusive_cumsum(x, method="cumsum")[indices].astype(float)
+    compensated = exclusive_cumsum(x, method=method)[indices].astype(float)
+
+    naive_error = np.abs(naive - expected).max()
+    error = np.abs(compensated - expected).max()
+    assert error < naive_error / 10
+    assert error / expected[-1] < 1e-6
+
+
+def test_exclusive_cumsum_bad_method() -> None:
+    with raises(ValueError):
+        exclusive_cumsum(np.ones(10), method="not-a-method")
+    with raises(ValueError):
+        exclusive_cumsum(np.ones(10), block_size=1)
+
+
+@mark.parametrize("summation", METHODS)
+@mark.parametrize("layers_shape", ((1000, 10),))
+def test_compact_with_summation(layers, summation) -> None:
+    dz, phi = layers
+
+    dz_expected = np.empty_like(dz)
+    phi_expected = compact(dz, phi, porosity_max=0.5, return_dz=dz_expected)
+
+    dz_new = np.empty_like(dz)
+    phi_new = compact(dz, phi, porosity_max=0.5, return_dz=dz_new, summation=summation)
+
+    assert phi_new == approx(phi_expected)
+    assert dz_new == approx(dz_expected)
+    assert compacted_thickness(
+        dz, phi, porosity_max=0.5, block_size=7, summation=summation
+    ) == approx(dz_expected.sum(axis=0))